@@ -0,0 +1,121 @@
+"""
+The application factory. Importing this module has no side effects, so render
+worker processes can build their own app from it.
+"""
+from flask import Flask, jsonify, request
+import os
+import config
+from models import db, User, Role, RequestType, ApprovalWorkflow, ApprovalStep
+from flask_migrate import Migrate, stamp
+from routes import register_routes
+from utils.data_helpers import initialize_database
+from utils.db_engine import engine_options, configure_database
+from utils.msal_client import configure_msal, msal_cache_store
+from utils.pdf_build import configure_pdf_builds
+from utils.render_cache import configure_render_cache
+from utils.table_versions import track_table_versions
+from utils.workflow_registry import workflow_registry
+from form_schema import rcl_form_schema, withdrawal_form_schema
+from flask_wtf.csrf import CSRFProtect
+from datetime import timedelta
+
+def create_app():
+    """Create and configure the Flask application"""
+    app = Flask(__name__)
+    
+    # Configure the app from config.py
+    app.config['SECRET_KEY'] = config.SECRET_KEY
+    app.config['SQLALCHEMY_DATABASE_URI'] = config.SQLALCHEMY_DATABASE_URI
+    app.config['SQLITE_TUNING'] = config.SQLITE_TUNING
+    app.config['SQLITE_BUSY_TIMEOUT'] = config.SQLITE_BUSY_TIMEOUT
+    app.config['SQLITE_PRAGMAS'] = config.SQLITE_PRAGMAS
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(
+        config.SQLALCHEMY_DATABASE_URI, config.DB_POOL_SIZE, config.DB_MAX_OVERFLOW, config.DB_POOL_TIMEOUT,
+        config.SQLITE_BUSY_TIMEOUT if config.SQLITE_TUNING else None)
+    app.config['MSAL_CACHE'] = config.MSAL_CACHE
+    app.config['MSAL_CACHE_DIR'] = os.path.join(app.root_path, config.MSAL_CACHE_DIR)
+    app.config['CURRENT_USER_CACHE_TTL'] = config.CURRENT_USER_CACHE_TTL
+    app.config['RBAC_CACHE_TTL'] = config.RBAC_CACHE_TTL
+    app.config['WORKFLOW_CACHE_TTL'] = config.WORKFLOW_CACHE_TTL
+    app.config['UPLOAD_FOLDER'] = config.UPLOAD_FOLDER
+    app.config['SIGNATURE_PRINT_SIZE'] = config.SIGNATURE_PRINT_SIZE
+    app.config['SIGNATURE_DPI'] = config.SIGNATURE_DPI
+    app.config['SIGNATURE_COLORS'] = config.SIGNATURE_COLORS
+    app.config['SIGNATURE_MAX_PIXELS'] = config.SIGNATURE_MAX_PIXELS
+    app.config['DEBUG'] = config.DEBUG
+    app.config['REQUESTS_PER_PAGE'] = config.REQUESTS_PER_PAGE
+    app.config['API_PAGE_SIZE'] = config.API_PAGE_SIZE
+    app.config['API_MAX_PAGE_SIZE'] = config.API_MAX_PAGE_SIZE
+    app.config['API_STREAM_BATCH_SIZE'] = config.API_STREAM_BATCH_SIZE
+    app.config['API_GZIP_LEVEL'] = config.API_GZIP_LEVEL
+    app.config['PDF_BUILD_CONCURRENCY'] = config.PDF_BUILD_CONCURRENCY
+    app.config['PDF_FORMAT_DIR'] = os.path.join(app.root_path, config.PDF_FORMAT_DIR) if config.PDF_USE_FORMATS else None
+    app.config['PDF_RENDERERS'] = config.PDF_RENDERERS
+    app.config['PDF_INCREMENTAL_STAMPING'] = config.PDF_INCREMENTAL_STAMPING
+    app.config['PDF_BASE_DIR'] = os.path.join(app.root_path, config.PDF_BASE_DIR)
+    app.config['PDF_BASE_MAX_BYTES'] = config.PDF_BASE_MAX_BYTES
+    app.config['DOCUMENT_STORE'] = config.DOCUMENT_STORE
+    app.config['DOCUMENT_RECONCILE_INTERVAL'] = config.DOCUMENT_RECONCILE_INTERVAL
+    app.config['DOCUMENT_ORPHAN_GRACE'] = config.DOCUMENT_ORPHAN_GRACE
+    app.config['PDF_CACHE_DIR'] = os.path.join(app.root_path, config.PDF_CACHE_DIR)
+    app.config['PDF_CACHE_MAX_BYTES'] = config.PDF_CACHE_MAX_BYTES
+    app.config['RENDER_WORKERS'] = config.RENDER_WORKERS
+    app.config['RENDER_JOB_MAX_ATTEMPTS'] = config.RENDER_JOB_MAX_ATTEMPTS
+    app.config['RENDER_JOB_RETRY_DELAY'] = config.RENDER_JOB_RETRY_DELAY
+    app.config['RENDER_JOB_TIMEOUT'] = config.RENDER_JOB_TIMEOUT
+    
+    # Session configuration
+    app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=24)
+    app.config['SESSION_COOKIE_SECURE'] = True
+    app.config['SESSION_COOKIE_HTTPONLY'] = True
+    app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
+    
+    # Initialize CSRF protection
+    csrf = CSRFProtect()
+    csrf.init_app(app)
+    
+    # Initialize database and schema migrations (batch mode lets SQLite alter tables)
+    db.init_app(app)
+    configure_database(app, db)
+    # Version the users table for the ETags of /api/users, and the workflow tables so each
+    # process's workflow registry notices changes made by others
+    track_table_versions(User, Role, RequestType, ApprovalWorkflow, ApprovalStep)
+    Migrate(app, db, directory=os.path.join(app.root_path, 'migrations'), render_as_batch=True)
+    
+    # Limit concurrent LaTeX builds and enable precompiled preambles
+    configure_pdf_builds(app.config['PDF_BUILD_CONCURRENCY'], app.config['PDF_FORMAT_DIR'])
+    configure_render_cache(app.config['PDF_CACHE_DIR'], app.config['PDF_CACHE_MAX_BYTES'])
+    
+    # One MSAL client per process, with its discovery cache shared by all workers
+    configure_msal(msal_cache_store(app, app.config['MSAL_CACHE'], app.config['MSAL_CACHE_DIR']))
+    
+    # Create uploads directory if it doesn't exist
+    if not os.path.exists(app.config['UPLOAD_FOLDER']):
+        os.makedirs(app.config['UPLOAD_FOLDER'])
+    
+    # Register all routes
+    register_routes(app)
+    
+    # Add CORS headers to API responses
+    @app.after_request
+    def add_cors_headers(response):
+        if request.path.startswith('/api/'):
+            response.headers['Access-Control-Allow-Origin'] = '*'
+            response.headers['Access-Control-Allow-Methods'] = 'GET'
+        return response
+    
+    # Initialize database with required data if it doesn't exist
+    with app.app_context():
+        if not db.inspect(db.engine).has_table('users'):
+            print("Initializing database...")
+            db.create_all()
+            # A new database already has the latest schema
+            stamp()
+            initialize_database(rcl_form_schema, withdrawal_form_schema)
+            print("Database initialization complete.")
+        # Load request types and workflows before the first request needs them, once the
+        # database has been migrated to have table versions
+        if db.inspect(db.engine).has_table('table_versions'):
+            workflow_registry()
+    
+    return app
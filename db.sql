@@ -1,12 +1,15 @@
+-- Reference schema (SQLite). The Alembic migrations in migrations/ are authoritative.
+
 CREATE TABLE users (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
-  email TEXT NOT NULL,
+  email TEXT UNIQUE NOT NULL,
   full_name TEXT,
   status TEXT DEFAULT 'active',
   created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
   provider_user_id TEXT,
   provider TEXT,
   role_id INTEGER,
+  signature_path TEXT,
   FOREIGN KEY (role_id) REFERENCES roles(id)
 );
 
@@ -34,11 +37,14 @@ CREATE TABLE user_signatures (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
   user_id INTEGER NOT NULL,
   signature_image_path TEXT NOT NULL,
+  sha256 TEXT,
   uploaded_at DATETIME DEFAULT CURRENT_TIMESTAMP,
   is_active BOOLEAN NOT NULL,
   FOREIGN KEY (user_id) REFERENCES users(id)
 );
 
+CREATE INDEX ix_user_signatures_user_active_uploaded ON user_signatures (user_id, is_active, uploaded_at);
+
 
 CREATE TABLE request_types (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -49,6 +55,8 @@ CREATE TABLE request_types (
   created_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE INDEX ix_request_types_name ON request_types (name);
+
 CREATE TABLE requests (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
   type_id INTEGER NOT NULL,
@@ -59,10 +67,20 @@ CREATE TABLE requests (
   final_document_path TEXT,
   created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
   updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  current_step_id INTEGER,
+  current_role_id INTEGER,
   FOREIGN KEY (type_id) REFERENCES request_types(id),
-  FOREIGN KEY (requester_id) REFERENCES users(id)
+  FOREIGN KEY (requester_id) REFERENCES users(id),
+  FOREIGN KEY (current_step_id) REFERENCES approval_steps(id),
+  FOREIGN KEY (current_role_id) REFERENCES roles(id)
 );
 
+CREATE INDEX ix_requests_requester_status ON requests (requester_id, status);
+CREATE INDEX ix_requests_status ON requests (status);
+CREATE INDEX ix_requests_current_role_id ON requests (current_role_id);
+-- PostgreSQL only: form_data and request_types.form_schema are JSONB there, and
+-- CREATE INDEX ix_requests_form_data ON requests USING gin (form_data jsonb_path_ops);
+
 CREATE TABLE approval_workflows (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
   request_type_id INTEGER NOT NULL,
@@ -71,6 +89,8 @@ CREATE TABLE approval_workflows (
   FOREIGN KEY (request_type_id) REFERENCES request_types(id)
 );
 
+CREATE INDEX ix_approval_workflows_request_type_id ON approval_workflows (request_type_id);
+
 CREATE TABLE approval_steps (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
   workflow_id INTEGER NOT NULL,
@@ -81,6 +101,8 @@ CREATE TABLE approval_steps (
   FOREIGN KEY (approver_role_id) REFERENCES roles(id)
 );
 
+CREATE INDEX ix_approval_steps_workflow_order ON approval_steps (workflow_id, step_order);
+
 CREATE TABLE request_approvals (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
   request_id INTEGER NOT NULL,
@@ -90,7 +112,63 @@ CREATE TABLE request_approvals (
   comments TEXT,
   approved_at DATETIME,
   created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+  pdf_path TEXT,
   FOREIGN KEY (request_id) REFERENCES requests(id),
   FOREIGN KEY (step_id) REFERENCES approval_steps(id),
   FOREIGN KEY (approver_id) REFERENCES users(id)
 );
+
+CREATE INDEX ix_request_approvals_request_step ON request_approvals (request_id, step_id);
+
+CREATE TABLE approval_documents (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  filename TEXT,
+  size INTEGER,
+  pdf_data BLOB NOT NULL,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE document_records (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  storage_key TEXT UNIQUE NOT NULL,
+  request_id INTEGER,
+  approval_id INTEGER,
+  size INTEGER,
+  sha256 TEXT,
+  created_at DATETIME NOT NULL,
+  FOREIGN KEY (request_id) REFERENCES requests(id),
+  FOREIGN KEY (approval_id) REFERENCES request_approvals(id)
+);
+
+CREATE INDEX ix_document_records_request_created ON document_records (request_id, created_at);
+CREATE INDEX ix_document_records_approval_id ON document_records (approval_id);
+
+CREATE TABLE render_jobs (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  request_id INTEGER NOT NULL,
+  approval_id INTEGER,
+  status TEXT NOT NULL DEFAULT 'queued',
+  attempts INTEGER NOT NULL DEFAULT 0,
+  last_error TEXT,
+  pdf_filename TEXT,
+  created_at DATETIME NOT NULL,
+  available_at DATETIME NOT NULL,
+  started_at DATETIME,
+  finished_at DATETIME,
+  FOREIGN KEY (request_id) REFERENCES requests(id),
+  FOREIGN KEY (approval_id) REFERENCES request_approvals(id)
+);
+
+CREATE INDEX ix_render_jobs_request_id ON render_jobs (request_id);
+CREATE INDEX ix_render_jobs_status ON render_jobs (status);
+
+CREATE TABLE auth_caches (
+  name TEXT PRIMARY KEY,
+  data BLOB NOT NULL,
+  version INTEGER NOT NULL
+);
+
+CREATE TABLE table_versions (
+  name TEXT PRIMARY KEY,
+  version INTEGER NOT NULL
+);
@@ -0,0 +1,46 @@
+"""render job queue
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 08:07:31.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('render_jobs',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('request_id', sa.Integer(), nullable=False),
+    sa.Column('approval_id', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('pdf_filename', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('available_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['approval_id'], ['request_approvals.id'], ),
+    sa.ForeignKeyConstraint(['request_id'], ['requests.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('render_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_render_jobs_request_id'), ['request_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_render_jobs_status'), ['status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('render_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_render_jobs_status'))
+        batch_op.drop_index(batch_op.f('ix_render_jobs_request_id'))
+
+    op.drop_table('render_jobs')
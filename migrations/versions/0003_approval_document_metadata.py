@@ -0,0 +1,28 @@
+"""approval document filename and size
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 08:20:07.730912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('approval_documents', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('filename', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('size', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('approval_documents', schema=None) as batch_op:
+        batch_op.drop_column('size')
+        batch_op.drop_column('filename')
@@ -0,0 +1,43 @@
+"""document registry
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 08:21:36.204417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('document_records',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('storage_key', sa.String(length=255), nullable=False),
+    sa.Column('request_id', sa.Integer(), nullable=True),
+    sa.Column('approval_id', sa.Integer(), nullable=True),
+    sa.Column('size', sa.Integer(), nullable=True),
+    sa.Column('sha256', sa.String(length=64), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['approval_id'], ['request_approvals.id'], ),
+    sa.ForeignKeyConstraint(['request_id'], ['requests.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('storage_key')
+    )
+    with op.batch_alter_table('document_records', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_document_records_approval_id'), ['approval_id'], unique=False)
+        batch_op.create_index('ix_document_records_request_created', ['request_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('document_records', schema=None) as batch_op:
+        batch_op.drop_index('ix_document_records_request_created')
+        batch_op.drop_index(batch_op.f('ix_document_records_approval_id'))
+
+    op.drop_table('document_records')
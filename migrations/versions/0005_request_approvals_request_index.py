@@ -0,0 +1,26 @@
+"""index request approvals by request
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 08:42:04.887153
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('request_approvals', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_request_approvals_request_id'), ['request_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('request_approvals', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_request_approvals_request_id'))
@@ -0,0 +1,51 @@
+"""current step and role of each request
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 08:43:29.361540
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('requests', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('current_step_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('current_role_id', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_requests_current_role_id'), ['current_role_id'], unique=False)
+        batch_op.create_foreign_key('fk_requests_current_step_id', 'approval_steps', ['current_step_id'], ['id'])
+        batch_op.create_foreign_key('fk_requests_current_role_id', 'roles', ['current_role_id'], ['id'])
+
+    # Point requests awaiting approval at their first pending step, as Request.refresh_current_step does
+    op.execute("""
+        UPDATE requests SET current_step_id = (
+            SELECT request_approvals.step_id
+            FROM request_approvals JOIN approval_steps ON approval_steps.id = request_approvals.step_id
+            WHERE request_approvals.request_id = requests.id AND request_approvals.status = 'pending'
+            ORDER BY approval_steps.step_order
+            LIMIT 1)
+        WHERE status IN ('submitted', 'pending')
+    """)
+    op.execute("""
+        UPDATE requests SET current_role_id = (
+            SELECT approval_steps.approver_role_id FROM approval_steps
+            WHERE approval_steps.id = requests.current_step_id)
+        WHERE current_step_id IS NOT NULL
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('requests', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_requests_current_role_id', type_='foreignkey')
+        batch_op.drop_constraint('fk_requests_current_step_id', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_requests_current_role_id'))
+        batch_op.drop_column('current_role_id')
+        batch_op.drop_column('current_step_id')
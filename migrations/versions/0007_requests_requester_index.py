@@ -0,0 +1,26 @@
+"""index requests by requester
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 08:44:31.052668
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('requests', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_requests_requester_id'), ['requester_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('requests', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_requests_requester_id'))
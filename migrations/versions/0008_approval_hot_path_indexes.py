@@ -0,0 +1,62 @@
+"""approval hot path indexes
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 08:52:13.402117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('request_approvals', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_request_approvals_request_id'))
+        batch_op.create_index('ix_request_approvals_request_step', ['request_id', 'step_id'], unique=False)
+
+    with op.batch_alter_table('approval_steps', schema=None) as batch_op:
+        batch_op.create_index('ix_approval_steps_workflow_order', ['workflow_id', 'step_order'], unique=False)
+
+    with op.batch_alter_table('approval_workflows', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_approval_workflows_request_type_id'), ['request_type_id'], unique=False)
+
+    with op.batch_alter_table('request_types', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_request_types_name'), ['name'], unique=False)
+
+    with op.batch_alter_table('requests', schema=None) as batch_op:
+        batch_op.create_index('ix_requests_requester_status', ['requester_id', 'status'], unique=False)
+        batch_op.create_index('ix_requests_status', ['status'], unique=False)
+        batch_op.drop_index(batch_op.f('ix_requests_requester_id'))
+
+    with op.batch_alter_table('user_signatures', schema=None) as batch_op:
+        batch_op.create_index('ix_user_signatures_user_active_uploaded', ['user_id', 'is_active', 'uploaded_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user_signatures', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_signatures_user_active_uploaded')
+
+    with op.batch_alter_table('requests', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_requests_requester_id'), ['requester_id'], unique=False)
+        batch_op.drop_index('ix_requests_status')
+        batch_op.drop_index('ix_requests_requester_status')
+
+    with op.batch_alter_table('request_types', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_request_types_name'))
+
+    with op.batch_alter_table('approval_workflows', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_approval_workflows_request_type_id'))
+
+    with op.batch_alter_table('approval_steps', schema=None) as batch_op:
+        batch_op.drop_index('ix_approval_steps_workflow_order')
+
+    with op.batch_alter_table('request_approvals', schema=None) as batch_op:
+        batch_op.drop_index('ix_request_approvals_request_step')
+        batch_op.create_index(batch_op.f('ix_request_approvals_request_id'), ['request_id'], unique=False)
@@ -0,0 +1,41 @@
+"""postgresql jsonb form data
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 11:04:37.518260
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite has a single JSON type, so only PostgreSQL databases change
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.alter_column('request_types', 'form_schema', type_=postgresql.JSONB(),
+                    postgresql_using='form_schema::jsonb')
+    op.alter_column('requests', 'form_data', type_=postgresql.JSONB(),
+                    postgresql_using='form_data::jsonb')
+    op.create_index('ix_requests_form_data', 'requests', ['form_data'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'form_data': 'jsonb_path_ops'})
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.drop_index('ix_requests_form_data', table_name='requests', postgresql_using='gin')
+    op.alter_column('requests', 'form_data', type_=sa.JSON(),
+                    postgresql_using='form_data::json')
+    op.alter_column('request_types', 'form_schema', type_=sa.JSON(),
+                    postgresql_using='form_schema::json')
@@ -0,0 +1,57 @@
+"""role permissions
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 12:21:09.730514
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+# The role checks the views used to hard-code, as of this revision
+ROLE_PERMISSIONS = {
+    'manage_roles': ['admin'],
+    'manage_users': ['admin', 'chair', 'dean', 'advisor'],
+    'approve_requests': ['admin', 'advisor', 'chair', 'dean'],
+    'approve_any_step': ['admin'],
+    'view_all_requests': ['admin', 'advisor', 'chair', 'dean'],
+    'delete_any_request': ['admin'],
+}
+
+roles = sa.table('roles', sa.column('id', sa.Integer), sa.column('name', sa.String))
+permissions = sa.table('permissions', sa.column('id', sa.Integer), sa.column('name', sa.String))
+role_permissions = sa.table('role_permissions', sa.column('role_id', sa.Integer),
+                            sa.column('permission_id', sa.Integer))
+
+
+def upgrade():
+    conn = op.get_bind()
+    # A database without roles is new; initialize_database gives it these permissions
+    if conn.execute(sa.select(sa.func.count()).select_from(roles)).scalar() == 0:
+        return
+    for permission_name, role_names in ROLE_PERMISSIONS.items():
+        permission_id = conn.execute(sa.select(permissions.c.id)
+                                     .where(permissions.c.name == permission_name)).scalar()
+        if permission_id is None:
+            conn.execute(permissions.insert().values(name=permission_name))
+            permission_id = conn.execute(sa.select(permissions.c.id)
+                                         .where(permissions.c.name == permission_name)).scalar()
+        granted = set(conn.execute(sa.select(role_permissions.c.role_id)
+                                   .where(role_permissions.c.permission_id == permission_id)).scalars())
+        for role_id in conn.execute(sa.select(roles.c.id).where(roles.c.name.in_(role_names))).scalars():
+            if role_id not in granted:
+                conn.execute(role_permissions.insert().values(role_id=role_id, permission_id=permission_id))
+
+
+def downgrade():
+    conn = op.get_bind()
+    permission_ids = sa.select(permissions.c.id).where(permissions.c.name.in_(list(ROLE_PERMISSIONS)))
+    conn.execute(role_permissions.delete().where(role_permissions.c.permission_id.in_(permission_ids)))
+    conn.execute(permissions.delete().where(permissions.c.name.in_(list(ROLE_PERMISSIONS))))
@@ -0,0 +1,29 @@
+"""msal cache table
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 13:02:45.116902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('auth_caches',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('auth_caches')
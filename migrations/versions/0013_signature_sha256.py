@@ -0,0 +1,26 @@
+"""signature sha256
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18 15:12:47.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0013'
+down_revision = '0012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user_signatures', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('sha256', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('user_signatures', schema=None) as batch_op:
+        batch_op.drop_column('sha256')
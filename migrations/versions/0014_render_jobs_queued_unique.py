@@ -0,0 +1,33 @@
+"""render jobs queued unique
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-18 17:40:12.604317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0014'
+down_revision = '0013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep only the newest queued job of each request; it renders the request's latest state
+    op.execute("UPDATE render_jobs SET status = 'failed', last_error = 'Superseded by a newer queued job' "
+               "WHERE status = 'queued' AND id NOT IN "
+               "(SELECT max_id FROM (SELECT MAX(id) AS max_id FROM render_jobs "
+               "WHERE status = 'queued' GROUP BY request_id) AS newest)")
+    with op.batch_alter_table('render_jobs', schema=None) as batch_op:
+        batch_op.create_index('uq_render_jobs_queued_request', ['request_id'], unique=True,
+                              sqlite_where=sa.text("status = 'queued'"),
+                              postgresql_where=sa.text("status = 'queued'"))
+
+
+def downgrade():
+    with op.batch_alter_table('render_jobs', schema=None) as batch_op:
+        batch_op.drop_index('uq_render_jobs_queued_request')
@@ -1,6 +1,10 @@
 from .user import db, User, Role, Permission, RolePermission, UserSignature
 from .request import RequestType, Request, ApprovalWorkflow, ApprovalStep, RequestApproval
 from .approval_document import ApprovalDocument
+from .render_job import RenderJob
+from .document_record import DocumentRecord
+from .auth_cache import AuthCache
+from .table_version import TableVersion
 
 __all__ = [
     'db',
@@ -14,5 +18,9 @@ __all__ = [
     'ApprovalWorkflow',
     'ApprovalStep',
     'RequestApproval',
-    'ApprovalDocument'
+    'ApprovalDocument',
+    'RenderJob',
+    'DocumentRecord',
+    'AuthCache',
+    'TableVersion'
 ]
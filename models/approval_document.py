@@ -1,7 +1,12 @@
+from datetime import datetime
 from . import db
 
 class ApprovalDocument(db.Model):
     __tablename__ = 'approval_documents'
     id = db.Column(db.Integer, primary_key=True)
-    pdf_data = db.Column(db.LargeBinary, nullable=False)
-    created_at = db.Column(db.DateTime, default=db.func.current_timestamp(), nullable=False)
+    filename = db.Column(db.String(255))
+    size = db.Column(db.Integer)
+    # Deferred so metadata queries never load the PDF itself
+    pdf_data = db.deferred(db.Column(db.LargeBinary, nullable=False))
+    # Local time like DocumentRecord.created_at, which the document reconciler compares it with
+    created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
@@ -0,0 +1,9 @@
+from . import db
+
+class AuthCache(db.Model):
+    """A serialized MSAL cache shared by the app's workers (see utils.msal_client)."""
+    __tablename__ = 'auth_caches'
+    name = db.Column(db.String(50), primary_key=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+    # Incremented on every write so workers can tell when to reload
+    version = db.Column(db.Integer, nullable=False, default=1)
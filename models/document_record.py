@@ -0,0 +1,29 @@
+from datetime import datetime
+from . import db
+
+class DocumentRecord(db.Model):
+    """Registry entry for a generated PDF held in the document store."""
+    __tablename__ = 'document_records'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    storage_key = db.Column(db.String(255), unique=True, nullable=False)
+    request_id = db.Column(db.Integer, db.ForeignKey('requests.id'), nullable=True)
+    approval_id = db.Column(db.Integer, db.ForeignKey('request_approvals.id'), nullable=True, index=True)
+    size = db.Column(db.Integer)
+    sha256 = db.Column(db.String(64))
+    created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+
+    __table_args__ = (
+        # Newest document of a request
+        db.Index('ix_document_records_request_created', 'request_id', 'created_at'),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'storage_key': self.storage_key,
+            'request_id': self.request_id,
+            'approval_id': self.approval_id,
+            'size': self.size,
+            'sha256': self.sha256,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
@@ -0,0 +1,37 @@
+from datetime import datetime
+from . import db
+
+class RenderJob(db.Model):
+    __tablename__ = 'render_jobs'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    request_id = db.Column(db.Integer, db.ForeignKey('requests.id'), nullable=False, index=True)
+    approval_id = db.Column(db.Integer, db.ForeignKey('request_approvals.id'), nullable=True)
+    status = db.Column(db.String(20), default='queued', nullable=False, index=True)  # queued, running, done, failed
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.Text)
+    pdf_filename = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+    available_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    request = db.relationship('Request')
+    approval = db.relationship('RequestApproval')
+
+    __table_args__ = (
+        # A request has at most one queued job, which enqueue_render reuses
+        db.Index('uq_render_jobs_queued_request', 'request_id', unique=True,
+                 sqlite_where=db.text("status = 'queued'"), postgresql_where=db.text("status = 'queued'")),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'request_id': self.request_id,
+            'approval_id': self.approval_id,
+            'status': self.status,
+            'attempts': self.attempts,
+            'error': self.last_error if self.status == 'failed' else None,
+            'pdf_filename': self.pdf_filename,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
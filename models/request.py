@@ -1,11 +1,16 @@
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import aliased
 from .user import db, User, Role
 
+# JSON documents are stored as JSONB on PostgreSQL so they can be indexed and queried in place
+JSONDocument = db.JSON().with_variant(JSONB(), 'postgresql')
+
 class RequestType(db.Model):
     __tablename__ = 'request_types'
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    name = db.Column(db.String(255), nullable=False)
+    name = db.Column(db.String(255), nullable=False, index=True)
     description = db.Column(db.Text, nullable=True)
-    form_schema = db.Column(db.JSON, nullable=True)
+    form_schema = db.Column(JSONDocument, nullable=True)
     template_doc_path = db.Column(db.String(255), nullable=True)
     created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.current_timestamp())
     requests = db.relationship('Request', backref='request_type', lazy=True)
@@ -17,29 +22,48 @@ class Request(db.Model):
     type_id = db.Column(db.Integer, db.ForeignKey('request_types.id'), nullable=False)
     requester_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     title = db.Column(db.String(255), nullable=False)
-    form_data = db.Column(db.JSON)
+    form_data = db.Column(JSONDocument)
     status = db.Column(db.String(50), default='draft')
     final_document_path = db.Column(db.String(255), nullable=True)
     created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.current_timestamp())
     updated_at = db.Column(db.DateTime, nullable=False, server_default=db.func.current_timestamp(),
                            onupdate=db.func.current_timestamp())
+    # The step the request is waiting on and its approver role; kept up to date by refresh_current_step
+    current_step_id = db.Column(db.Integer, db.ForeignKey('approval_steps.id'), nullable=True)
+    current_role_id = db.Column(db.Integer, db.ForeignKey('roles.id'), nullable=True, index=True)
     requester = db.relationship('User', backref='requests')
     approvals = db.relationship('RequestApproval', backref='request', lazy=True)
 
-    @property
-    def latest_approval(self):
-        """Get the most recent approval for this request."""
-        from sqlalchemy import desc
-        return (RequestApproval.query
-                .join(ApprovalStep)
-                .filter(RequestApproval.request_id == self.id)
-                .order_by(desc(ApprovalStep.step_order))
-                .first())
+    __table_args__ = (
+        # My Requests, optionally narrowed to a status
+        db.Index('ix_requests_requester_status', 'requester_id', 'status'),
+        db.Index('ix_requests_status', 'status'),
+        # Containment (@>) lookups on form_data, see utils.approval_queries.form_data_filter. Only
+        # PostgreSQL gets it; migrations/env.py keeps autogenerate from adding it elsewhere
+        db.Index('ix_requests_form_data', 'form_data', postgresql_using='gin',
+                 postgresql_ops={'form_data': 'jsonb_path_ops'}).ddl_if(dialect='postgresql'),
+    )
+
+    def refresh_current_step(self):
+        """
+        Point current_step_id and current_role_id at the first pending step
+        while the request is awaiting approval, or clear them. Call it before
+        committing any change to the request's status or approvals.
+        """
+        current = None
+        if self.status in ('submitted', 'pending'):
+            current = (db.session.query(RequestApproval.step_id, ApprovalStep.approver_role_id)
+                       .join(ApprovalStep, RequestApproval.step_id == ApprovalStep.id)
+                       .filter(RequestApproval.request_id == self.id, RequestApproval.status == 'pending')
+                       .order_by(ApprovalStep.step_order)
+                       .first())
+        self.current_step_id = current.step_id if current else None
+        self.current_role_id = current.approver_role_id if current else None
 
 class ApprovalWorkflow(db.Model):
     __tablename__ = 'approval_workflows'
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    request_type_id = db.Column(db.Integer, db.ForeignKey('request_types.id'), nullable=False)
+    request_type_id = db.Column(db.Integer, db.ForeignKey('request_types.id'), nullable=False, index=True)
     name = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text)
     steps = db.relationship('ApprovalStep', backref='workflow', lazy=True, order_by='ApprovalStep.step_order')
@@ -54,6 +78,11 @@ class ApprovalStep(db.Model):
     approver_role = db.relationship('Role')
     approvals = db.relationship('RequestApproval', backref='step', lazy=True)
 
+    __table_args__ = (
+        # A workflow's steps in order
+        db.Index('ix_approval_steps_workflow_order', 'workflow_id', 'step_order'),
+    )
+
 class RequestApproval(db.Model):
     __tablename__ = 'request_approvals'
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -65,4 +94,28 @@ class RequestApproval(db.Model):
     approved_at = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp(), nullable=False)
     pdf_path = db.Column(db.String(255), nullable=True) 
-    approver = db.relationship('User', backref='approvals') 
\ No newline at end of file
+    approver = db.relationship('User', backref='approvals')
+
+    __table_args__ = (
+        # A request's approvals, joined to their steps
+        db.Index('ix_request_approvals_request_step', 'request_id', 'step_id'),
+    )
+
+# Each request's approvals ranked from its last workflow step down
+_ranked_approvals = (db.select(RequestApproval,
+                               db.func.row_number().over(
+                                   partition_by=RequestApproval.request_id,
+                                   order_by=(ApprovalStep.step_order.desc(), RequestApproval.id.desc())
+                               ).label('position'))
+                     .join(ApprovalStep, RequestApproval.step_id == ApprovalStep.id)
+                     .subquery())
+_latest_approval = aliased(RequestApproval, _ranked_approvals)
+
+# The approval of the request's last workflow step. A relationship rather than a query
+# property, so a list of requests can load it in one go with selectinload(Request.latest_approval).
+Request.latest_approval = db.relationship(
+    _latest_approval,
+    primaryjoin=db.and_(_latest_approval.request_id == Request.id, _ranked_approvals.c.position == 1),
+    uselist=False,
+    viewonly=True,
+)
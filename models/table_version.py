@@ -0,0 +1,7 @@
+from . import db
+
+class TableVersion(db.Model):
+    """A counter per table, moved on whenever rows of the table change (see utils.table_versions)."""
+    __tablename__ = 'table_versions'
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
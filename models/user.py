@@ -37,6 +37,13 @@ class UserSignature(db.Model):
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     signature_image_path = db.Column(db.String(255), nullable=False)
+    # SHA-256 of the normalized image file; empty for signatures uploaded before normalization
+    sha256 = db.Column(db.String(64), nullable=True)
     uploaded_at = db.Column(db.DateTime, default=db.func.current_timestamp(), nullable=False)
     is_active = db.Column(db.Boolean, nullable=False)
-    user = db.relationship('User', backref='signatures') 
\ No newline at end of file
+    user = db.relationship('User', backref='signatures')
+
+    __table_args__ = (
+        # A user's newest active signature
+        db.Index('ix_user_signatures_user_active_uploaded', 'user_id', 'is_active', 'uploaded_at'),
+    ) 
\ No newline at end of file
@@ -1,20 +1,211 @@
-from flask import jsonify
-from models import User
+from flask import jsonify, request
+from sqlalchemy.orm import aliased
+from models import db, User, Role, Request, RequestType, RequestApproval, ApprovalStep
+from utils.api_helpers import api_etag, list_response, not_modified, parse_datetime, parse_list_args
+from utils.approval_queries import FORM_DATA_FILTERS, form_data_filter
+from utils.auth_helpers import api_permission_required, get_current_user
+from utils.render_queue import queue_stats
+from utils.render_cache import cache_stats
+from utils.table_versions import table_version
+
+Requester = aliased(User, name='requester')
+Approver = aliased(User, name='approver')
+CurrentStep = aliased(ApprovalStep, name='current_step')
+CurrentRole = aliased(Role, name='current_role')
+
+# Fields /api/users can return, and the columns they are read from
+USER_FIELDS = {
+    'id': User.id,
+    'name': User.full_name,
+    'email': User.email,
+    'status': User.status,
+    'role': Role.name,
+    'created_at': User.created_at,
+}
+DEFAULT_USER_FIELDS = ['id', 'name', 'email']
+
+# Fields /api/requests can return
+REQUEST_FIELDS = {
+    'id': Request.id,
+    'title': Request.title,
+    'type': RequestType.name,
+    'status': Request.status,
+    'requester': Requester.full_name,
+    'requester_email': Requester.email,
+    'current_step': CurrentStep.name,
+    'current_role': CurrentRole.name,
+    'created_at': Request.created_at,
+    'updated_at': Request.updated_at,
+    'form_data': Request.form_data,
+}
+DEFAULT_REQUEST_FIELDS = ['id', 'title', 'type', 'status', 'requester', 'current_role', 'created_at']
+
+# Fields /api/approvals can return
+APPROVAL_FIELDS = {
+    'id': RequestApproval.id,
+    'request_id': RequestApproval.request_id,
+    'request_title': Request.title,
+    'request_type': RequestType.name,
+    'request_status': Request.status,
+    'step': ApprovalStep.name,
+    'step_order': ApprovalStep.step_order,
+    'role': Role.name,
+    'status': RequestApproval.status,
+    'approver': Approver.full_name,
+    'comments': RequestApproval.comments,
+    'approved_at': RequestApproval.approved_at,
+    'created_at': RequestApproval.created_at,
+}
+DEFAULT_APPROVAL_FIELDS = ['id', 'request_id', 'request_type', 'step', 'role', 'status', 'approver', 'approved_at']
+
+def _columns(fields, columns):
+    return [columns[name].label(name) for name in fields]
+
+# Filters look ids up in uncorrelated subqueries, so they also work when the table is joined for a field
+def _role_ids(name):
+    return db.select(Role.id).where(Role.name == name).correlate(None)
+
+def _type_ids(name):
+    return db.select(RequestType.id).where(RequestType.name == name).correlate(None)
 
 def setup_api_routes(app):
     """Simple API endpoint for users"""
     
     @app.route('/api/users')
+    @api_permission_required('manage_users')
     def api_users():
-        """Return all users in a simple format"""
-        users = User.query.all()
-        user_list = []
-        
-        for user in users:
-            user_list.append({
-                'id': user.id,
-                'name': user.full_name,
-                'email': user.email
-            })
-        
-        return jsonify(user_list) 
\ No newline at end of file
+        """
+        Users in id order, a page of ?limit= at a time with the next page linked
+        in the Link header, or all of them as NDJSON with ?format=ndjson. ?fields=
+        picks the fields returned. Responses carry an ETag of the versions of the
+        tables they are read from (users, and roles for the role field), so
+        unchanged results are answered with 304 Not Modified.
+        """
+        try:
+            args = parse_list_args(USER_FIELDS, DEFAULT_USER_FIELDS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Renaming a role changes the role field without touching the users table
+        versions = [table_version('users')]
+        if 'role' in args.fields:
+            versions.append(table_version('roles'))
+        etag = api_etag(*versions)
+        response = not_modified(etag)
+        if response:
+            return response
+
+        # Plain column rows, never User objects
+        query = db.select(*_columns(args.fields, USER_FIELDS)).select_from(User)
+        if 'role' in args.fields:
+            query = query.outerjoin(Role, User.role_id == Role.id)
+        return list_response(query, User.id, args, etag)
+
+    @app.route('/api/requests')
+    @api_permission_required()
+    def api_requests():
+        """
+        Requests, newest first, paged like /api/users. Users without the
+        view_all_requests permission only see their own. Filters: ?type= (request
+        type name), ?status=, ?role= (the role the request is waiting on),
+        ?created_after= and ?created_before= (ISO dates), and the form filters
+        of the pending approvals page (?semester=, ?ps_id=, ?withdrawal_type=).
+        """
+        try:
+            args = parse_list_args(REQUEST_FIELDS, DEFAULT_REQUEST_FIELDS)
+            created_after = parse_datetime('created_after')
+            created_before = parse_datetime('created_before')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        query = db.select(*_columns(args.fields, REQUEST_FIELDS)).select_from(Request)
+        # Join only the tables the chosen fields come from
+        if 'type' in args.fields:
+            query = query.join(RequestType, Request.type_id == RequestType.id)
+        if {'requester', 'requester_email'} & set(args.fields):
+            query = query.outerjoin(Requester, Request.requester_id == Requester.id)
+        if 'current_step' in args.fields:
+            query = query.outerjoin(CurrentStep, Request.current_step_id == CurrentStep.id)
+        if 'current_role' in args.fields:
+            query = query.outerjoin(CurrentRole, Request.current_role_id == CurrentRole.id)
+
+        current_user = get_current_user()
+        if 'view_all_requests' not in current_user.permissions:
+            query = query.where(Request.requester_id == current_user.id)
+        if request.args.get('type'):
+            query = query.where(Request.type_id.in_(_type_ids(request.args['type'])))
+        if request.args.get('status'):
+            query = query.where(Request.status == request.args['status'])
+        if request.args.get('role'):
+            query = query.where(Request.current_role_id.in_(_role_ids(request.args['role'])))
+        if created_after:
+            query = query.where(Request.created_at >= created_after)
+        if created_before:
+            query = query.where(Request.created_at < created_before)
+        for name in FORM_DATA_FILTERS:
+            if request.args.get(name):
+                query = query.where(form_data_filter(name, request.args[name]))
+        return list_response(query, Request.id, args, descending=True)
+
+    @app.route('/api/approvals')
+    @api_permission_required('view_all_requests')
+    def api_approvals():
+        """
+        Approval steps of requests, newest first, paged like /api/users.
+        Filters: ?type= (request type name), ?status= (of the step), ?role= (the
+        step's approver role), ?request_id=, ?created_after= and ?created_before=
+        (ISO dates), and ?current=1 for only the step each request is waiting on.
+        """
+        try:
+            args = parse_list_args(APPROVAL_FIELDS, DEFAULT_APPROVAL_FIELDS)
+            created_after = parse_datetime('created_after')
+            created_before = parse_datetime('created_before')
+            request_id = int(request.args['request_id']) if request.args.get('request_id') else None
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        current = request.args.get('current') in ('1', 'true')
+
+        query = db.select(*_columns(args.fields, APPROVAL_FIELDS)).select_from(RequestApproval)
+        # Join only the tables the chosen fields and filters need
+        if current or {'request_title', 'request_type', 'request_status'} & set(args.fields):
+            query = query.join(Request, RequestApproval.request_id == Request.id)
+        if 'request_type' in args.fields:
+            query = query.join(RequestType, Request.type_id == RequestType.id)
+        if {'step', 'step_order', 'role'} & set(args.fields):
+            query = query.join(ApprovalStep, RequestApproval.step_id == ApprovalStep.id)
+        if 'role' in args.fields:
+            query = query.outerjoin(Role, ApprovalStep.approver_role_id == Role.id)
+        if 'approver' in args.fields:
+            query = query.outerjoin(Approver, RequestApproval.approver_id == Approver.id)
+
+        if request.args.get('type'):
+            query = query.where(RequestApproval.request_id.in_(
+                db.select(Request.id).where(Request.type_id.in_(_type_ids(request.args['type']))).correlate(None)))
+        if request.args.get('status'):
+            query = query.where(RequestApproval.status == request.args['status'])
+        if request.args.get('role'):
+            query = query.where(RequestApproval.step_id.in_(
+                db.select(ApprovalStep.id).where(ApprovalStep.approver_role_id.in_(_role_ids(request.args['role'])))
+                .correlate(None)))
+        if request_id:
+            query = query.where(RequestApproval.request_id == request_id)
+        if current:
+            query = query.where(RequestApproval.step_id == Request.current_step_id)
+        if created_after:
+            query = query.where(RequestApproval.created_at >= created_after)
+        if created_before:
+            query = query.where(RequestApproval.created_at < created_before)
+        return list_response(query, RequestApproval.id, args, descending=True)
+
+    @app.route('/api/render_queue')
+    @api_permission_required('view_all_requests')
+    def api_render_queue():
+        """Return PDF render queue depth and latency"""
+        return jsonify(queue_stats())
+
+
+    @app.route('/api/render_cache')
+    @api_permission_required('view_all_requests')
+    def api_render_cache():
+        """Return PDF render cache hit/miss counters for this process"""
+        return jsonify(cache_stats())
@@ -1,10 +1,16 @@
 from flask import render_template, redirect, url_for, flash, request as flask_request, session, current_app
-import subprocess
 import os
 from datetime import datetime
-from models import db, User, RequestApproval, ApprovalStep, Request, RequestType
-from utils.auth_helpers import active_required
+from models import db, RequestApproval, ApprovalStep, Request, RequestType
+from utils.auth_helpers import active_required, permission_required, get_current_user
+from utils.render_queue import enqueue_render
+from utils.render_cache import render_cache_key
+from utils.document_store import save_document
+from utils.workflow_registry import workflow_registry, request_type_of, step_of
+from utils.approval_queries import (pending_approvals_page, pending_approval_rows, request_rows_page,
+                                    REQUEST_STATUSES, FORM_DATA_FILTERS)
 from PIL import Image, ImageDraw, ImageFont
+from .pdf_renderers import render_document, renderer_name_for, prepare_base_document
 
 def setup_approval_routes(app):
     @app.route('/my_requests')
@@ -13,128 +19,71 @@ def setup_approval_routes(app):
         if not session.get("user"):
             return redirect(url_for("login"))
         
-        user_email = session['user'].get('preferred_username').lower()
-        current_user = User.query.filter_by(email=user_email).first()
+        current_user = get_current_user()
         
         if not current_user:
             flash('User not found. Please log in again.', 'danger')
             return redirect(url_for('login'))
         
-        requests = current_user.requests
+        page = flask_request.args.get('page', 1, type=int)
+        pagination, requests = request_rows_page(
+            db.select(Request).filter(Request.requester_id == current_user.id).order_by(Request.id.desc()),
+            page, current_app.config['REQUESTS_PER_PAGE'])
         
-        # Add approval status information to each request
-        for req in requests:
-            # Get all approval steps for this request
-            request_approvals = RequestApproval.query.join(ApprovalStep).filter(
-                RequestApproval.request_id == req.id
-            ).order_by(ApprovalStep.step_order).all()
-            
-            # Add approval status to each request
-            req.approval_status = []
-            for approval in request_approvals:
-                role_name = approval.step.approver_role.name if approval.step.approver_role else "Unknown"
-                req.approval_status.append({
-                    'role': role_name,
-                    'step': approval.step.name,
-                    'status': approval.status,
-                    'approver': approval.approver.full_name if approval.approver else 'Pending'
-                })
-        
-        return render_template('my_requests.html', requests=requests)
+        return render_template('my_requests.html', requests=requests, pagination=pagination)
 
     @app.route('/pending_approvals')
+    @permission_required('view_all_requests')
     @active_required
     def pending_approvals():
         """View all forms regardless of their status"""
         if not session.get("user"):
             return redirect(url_for("login"))
         
-        user_email = session['user'].get('preferred_username').lower()
-        current_user = User.query.filter_by(email=user_email).first()
+        current_user = get_current_user()
         
         if not current_user:
             flash('User not found. Please log in again.', 'danger')
             return redirect(url_for('login'))
         
-        if current_user.role.name == 'basic_user':
-            flash('You do not have an assigned role for approvals.', 'warning')
-            return redirect(url_for('index'))
-        
-        # Get all requests with their approval statuses
-        requests = Request.query.all()
-        all_approvals = []
+        # One page of requests, filtered by the role they are waiting on, their status and
+        # values of the submitted form (semester, PS ID, withdrawal type)
+        page = flask_request.args.get('page', 1, type=int)
+        role_id = flask_request.args.get('role_id', type=int)
+        status = flask_request.args.get('status') or None
+        form_filters = {name: flask_request.args.get(name, '').strip() for name in FORM_DATA_FILTERS}
+        pagination = pending_approvals_page(page, current_app.config['REQUESTS_PER_PAGE'],
+                                            role_id=role_id, status=status, form_filters=form_filters)
+        all_approvals = pending_approval_rows(pagination.items, current_user)
+        
+        return render_template('pending_approvals.html', pending_approvals=all_approvals,
+                               pagination=pagination,
+                               roles=sorted(workflow_registry().roles.values(), key=lambda role: role.name),
+                               statuses=REQUEST_STATUSES, role_id=role_id, status=status,
+                               form_filters=form_filters)
+
+    @app.route('/approval_inbox')
+    @permission_required('view_all_requests')
+    @active_required
+    def approval_inbox():
+        """Requests currently waiting on the user's role, on the pending approvals page it redirects to"""
+        if not session.get("user"):
+            return redirect(url_for("login"))
         
-        for req in requests:
-            # Get all approval steps for this request
-            request_approvals = RequestApproval.query.join(ApprovalStep).filter(
-                RequestApproval.request_id == req.id
-            ).order_by(ApprovalStep.step_order).all()
-            
-            # Find the current pending step or the last step if none are pending
-            current_step = next((a for a in request_approvals if a.status == 'pending'), 
-                                request_approvals[-1] if request_approvals else None)
-            
-            if current_step:
-                can_approve = False
-                
-                # Check if we can approve
-                if (current_step.status == 'pending' or req.status == 'submitted'):
-                    if current_user.role.name == 'admin':
-                        can_approve = True
-                    elif current_step.step.approver_role and current_user.role.name == current_step.step.approver_role.name:
-                        can_approve = True
-                    elif current_user.role_id == current_step.step.approver_role_id:
-                        can_approve = True
-                
-                # Collect info
-                approver_role_info = {
-                    'id': current_step.step.approver_role_id,
-                    'name': current_step.step.approver_role.name if current_step.step.approver_role else "Unknown"
-                }
-                
-                # Get the latest approval for this request
-                latest_approval = RequestApproval.query.join(ApprovalStep).filter(
-                    RequestApproval.request_id == req.id
-                ).order_by(ApprovalStep.step_order.desc()).first()
-                
-                all_approvals.append({
-                    'approval_id': current_step.id,
-                    'request': req,
-                    'request_type': req.request_type.name,
-                    'requester': req.requester.full_name,
-                    'submitted': req.created_at,
-                    'step': current_step.step.name,
-                    'status': req.status,
-                    'can_approve': can_approve,
-                    'latest_approval': latest_approval,
-                    'pdf_path': current_step.pdf_path,
-                    'approval_status': [{
-                        'step': a.step.name,
-                        'status': a.status,
-                        'approver': a.approver.full_name if a.approver else 'Pending'
-                    } for a in request_approvals],
-                    'debug_info': {
-                        'user_role_name': current_user.role.name,
-                        'user_role_id': current_user.role_id,
-                        'step_approver_role_name': approver_role_info['name'],
-                        'step_approver_role_id': approver_role_info['id'],
-                        'step_status': current_step.status
-                    }
-                })
+        current_user = get_current_user()
+        if not current_user:
+            flash('User not found. Please log in again.', 'danger')
+            return redirect(url_for('login'))
         
-        return render_template('pending_approvals.html', pending_approvals=all_approvals)
+        return redirect(url_for('pending_approvals', role_id=current_user.role_id))
 
     @app.route('/request_approval/<int:approval_id>', methods=['GET', 'POST'])
+    @permission_required('approve_requests')
     @active_required
     def request_approval(approval_id):
         """View and process approval for a specific request"""
         approval = RequestApproval.query.get_or_404(approval_id)
-        current_user = User.query.filter_by(email=session['user'].get('preferred_username').lower()).first()
-        
-        # Check if user has permission to approve
-        if not current_user or current_user.role.name.lower() not in ['admin', 'advisor', 'chair', 'dean']:
-            flash('You do not have permission to approve requests.', 'danger')
-            return redirect(url_for('index'))
+        current_user = get_current_user()
         
         # Check if this is the current user's turn to approve
         if approval.status != 'pending':
@@ -156,36 +105,25 @@ def setup_approval_routes(app):
                 approval.approver_id = current_user.id
                 approval.approved_at = db.func.current_timestamp()
                 
-                db.session.commit()
+                # The last approval step approves the whole request
+                next_pending = any(a.status == 'pending' for a in approval.request.approvals)
+                if not next_pending:
+                    approval.request.status = 'approved'
+                approval.request.refresh_current_step()
                 
-                # Generate PDF with all signatures up to this point
-                request_type = approval.request.request_type.name.lower()
-                if request_type == 'withdrawal':
-                    pdf_filename, error = generate_withdrawal_pdf(approval.request.id)
-                elif request_type == 'rcl':
-                    pdf_filename, error = generate_rcl_pdf(approval.request.id)
-                else:
-                    pdf_path, error = generate_pdf_for_approval(approval.id)
-                    if not error:
-                        pdf_filename = os.path.basename(pdf_path)
-                    else:
-                        pdf_filename = None
+                db.session.commit()
                 
-                if error:
-                    flash(f"PDF generation error: {error}", "danger")
-                else:
+                # Queue the PDF render only once the request's final status is committed, so the
+                # document is rendered from it; the approver is not kept waiting on pdflatex
+                job = enqueue_render(approval.request_id, approval.id)
+                if job.status == 'failed':
+                    flash(f"PDF generation error: {job.last_error}", "danger")
+                elif job.status == 'done':
                     flash("PDF generated successfully!", "success")
-                
-                # Check if this was the last approval step
-                request_approvals = RequestApproval.query.join(ApprovalStep).filter(
-                    RequestApproval.request_id == approval.request_id
-                ).order_by(ApprovalStep.step_order).all()
-                
-                next_pending = any(a.status == 'pending' for a in request_approvals)
+                else:
+                    flash("PDF generation has been queued.", "info")
                 
                 if not next_pending:
-                    approval.request.status = 'approved'
-                    db.session.commit()
                     flash('Request has been fully approved!', 'success')
                 else:
                     flash('Request approved and moved to next approval step!', 'success')
@@ -198,6 +136,7 @@ def setup_approval_routes(app):
                 
                 # Update request status
                 approval.request.status = 'rejected'
+                approval.request.refresh_current_step()
                 
                 db.session.commit()
                 flash('Request has been rejected.', 'warning')
@@ -210,6 +149,7 @@ def setup_approval_routes(app):
                 
                 # Update request status
                 approval.request.status = 'returned'
+                approval.request.refresh_current_step()
                 
                 db.session.commit()
                 flash('Request has been returned for revision.', 'info')
@@ -220,40 +160,24 @@ def setup_approval_routes(app):
         return render_template('request_approval.html', approval=approval)
 
     @app.route('/approval_management')
+    @permission_required('view_all_requests')
     @active_required
     def approval_management():
         """View all requests and their approval statuses"""
         if not session.get("user"):
             return redirect(url_for("login"))
         
-        user_email = session['user'].get('preferred_username').lower()
-        current_user = User.query.filter_by(email=user_email).first()
+        current_user = get_current_user()
         
         if not current_user:
             flash('User not found. Please log in again.', 'danger')
             return redirect(url_for('login'))
         
-        if current_user.role.name not in ['admin', 'advisor', 'chair', 'dean']:
-            flash('You do not have permission to view approval management.', 'warning')
-            return redirect(url_for('index'))
+        page = flask_request.args.get('page', 1, type=int)
+        pagination, requests = request_rows_page(db.select(Request).order_by(Request.id.desc()),
+                                                 page, current_app.config['REQUESTS_PER_PAGE'])
         
-        requests = Request.query.all()
-        for req in requests:
-            # get the approval steps for this request
-            request_approvals = RequestApproval.query.join(ApprovalStep).filter(
-                RequestApproval.request_id == req.id
-            ).order_by(ApprovalStep.step_order).all()
-            
-            req.approval_status = []
-            for appr in request_approvals:
-                req.approval_status.append({
-                    'step': appr.step.name,
-                    'status': appr.status,
-                    'approver': appr.approver.full_name if appr.approver else 'Pending',
-                    'comments': appr.comments
-                })
-        
-        return render_template('approval_management.html', requests=requests)
+        return render_template('approval_management.html', requests=requests, pagination=pagination)
 
     @app.route('/resubmit_request/<int:request_id>', methods=['POST'])
     @active_required
@@ -262,8 +186,7 @@ def setup_approval_routes(app):
         if not session.get("user"):
             return redirect(url_for("login"))
         
-        user_email = session['user'].get('preferred_username').lower()
-        current_user = User.query.filter_by(email=user_email).first()
+        current_user = get_current_user()
 
         if not current_user:
             flash('User not found. Please log in again.', 'danger')
@@ -283,7 +206,12 @@ def setup_approval_routes(app):
             flash('You can only resubmit a returned request.', 'warning')
             return redirect(url_for('my_requests'))
 
+        # Reopen the step that returned the request so its approver can act on it again
+        for approval in req.approvals:
+            if approval.status == 'returned':
+                approval.status = 'pending'
         req.status = 'pending'
+        req.refresh_current_step()
         db.session.commit()
 
         flash('Request has been resubmitted for approval.', 'success')
@@ -294,39 +222,112 @@ def setup_approval_routes(app):
 # HELPER FUNCTIONS FOR PDF GENERATION
 # --------------------------------------------------------------------
 
-def generate_rcl_pdf(request_id):
+def request_render_key(request_obj, approvals, approval=None):
     """
-    Generate a PDF for an RCL request using a LaTeX template.
-    Returns (pdf_filename, error_message).
+    Render cache key for the document generate_request_pdf builds.
+    `approvals` are the request's approvals in step order; `approval` is the
+    approval a generic (non RCL/Withdrawal) document is rendered for.
     """
-    from models import Request, RequestApproval, ApprovalStep
-    req = Request.query.get(request_id)
-    if not req:
-        return None, "Request not found for RCL PDF generation."
+    type_name = request_type_of(request_obj).name
+    request_type = type_name.lower()
+    pdf_dir = os.path.join(current_app.root_path, "pdf")
+    uploads_dir = os.path.join(current_app.root_path, "static", "uploads")
+    renderer = renderer_name_for(type_name)
 
-    # Get all approvals for this request in order
-    approvals = RequestApproval.query.join(ApprovalStep).filter(
-        RequestApproval.request_id == request_id
-    ).order_by(ApprovalStep.step_order).all()
+    if request_type in ('rcl', 'withdrawal'):
+        template_path = os.path.join(pdf_dir, f"{request_type}_template.tex")
+        # The signature date defaults to the day of rendering, so it is part of the key
+        extra = {'renderer': renderer, 'signature_date': signature_date(request_obj.form_data or {})}
+        return render_cache_key(template_path, request_obj, approvals, uploads_dir, extra)
 
-    if not approvals:
-        return None, "No approval records found for RCL PDF generation."
+    # Generic documents show the approvals up to the one they are rendered for
+    step_order = step_of(approval).step_order
+    approvals = [a for a in approvals if step_of(a).step_order <= step_order]
+    template_path = os.path.join(pdf_dir, "approval_template.tex")
+    extra = {'renderer': renderer, 'approval_id': approval.id, 'date': datetime.now().strftime("%Y-%m-%d")}
+    return render_cache_key(template_path, request_obj, approvals, uploads_dir, extra)
 
-    # Create necessary directories
-    uploads_dir = os.path.join(current_app.root_path, "static", "uploads")
-    pdf_dir = os.path.join(current_app.root_path, "pdf")
-    os.makedirs(uploads_dir, exist_ok=True)
-    os.makedirs(pdf_dir, exist_ok=True)
+def generate_request_pdf(approval):
+    """
+    Generate the PDF for an approval using the generator for its request type.
+    Returns (document_key, error_message).
+    """
+    request_type = request_type_of(approval.request).name.lower()
+    if request_type == 'withdrawal':
+        return generate_withdrawal_pdf(approval.request.id)
+    if request_type == 'rcl':
+        return generate_rcl_pdf(approval.request.id)
+
+    return generate_pdf_for_approval(approval.id)
+
+APPROVER_ROLES = ('advisor', 'chair', 'dean')
+
+def signature_file(uploads_dir, sig_path):
+    """Absolute path of an uploaded signature image, or None if there is none."""
+    if not sig_path:
+        return None
+    src_path = os.path.join(uploads_dir, sig_path)
+    return src_path if os.path.exists(src_path) else None
 
+def signature_date(form_data):
+    """The requester's signature date from the form, or today's date if it has none."""
+    return form_data.get("signature_date", str(datetime.now().date()))
+
+def approver_fields(approvals, uploads_dir, pending_name):
+    """
+    Collect the name, date, comments and signature of each approved step.
+
+    Returns (fields, signatures) keyed by the template placeholders
+    (advisorName, advisorDate, advisorComments, advisorSignature, ...).
+    Roles that have not approved yet show `pending_name`.
+    """
+    fields = {}
+    signatures = {}
+    for role in APPROVER_ROLES:
+        fields[f"{role}Name"] = pending_name
+        fields[f"{role}Date"] = ""
+        fields[f"{role}Comments"] = ""
+        signatures[f"{role}Signature"] = None
+
+    for approval in approvals:
+        approver_role = step_of(approval).approver_role
+        role = approver_role.name if approver_role else ""
+        if role in APPROVER_ROLES and approval.status == 'approved' and approval.approver:
+            fields[f"{role}Name"] = approval.approver.full_name
+            fields[f"{role}Date"] = approval.approved_at.strftime("%Y-%m-%d") if approval.approved_at else ""
+            fields[f"{role}Comments"] = approval.comments or ""
+            signatures[f"{role}Signature"] = signature_file(uploads_dir, approval.approver.signature_path)
+    return fields, signatures
+
+def store_request_pdf(req, approvals, pdf_path):
+    """
+    Save a freshly generated PDF in the document store and point the request
+    and its approvals at it. Returns the document key.
+    """
+    # Request-wide documents are registered against the request only
+    document_key = save_document(pdf_path, req.id)
+
+    # Update all approval records with the new document
+    for approval in approvals:
+        if approval.status == 'approved':
+            approval.pdf_path = document_key
+
+    # Get the latest approval to update specifically
+    latest_approval = req.latest_approval
+
+    if latest_approval:
+        latest_approval.pdf_path = document_key
+
+    # Also update the request's final document path, and save all of it in one commit
+    req.final_document_path = document_key
+    db.session.commit()
+    return document_key
+
+def rcl_document(req, approvals, uploads_dir):
+    """Template fields and signatures for an RCL request. Returns (fields, signatures)."""
     # Get the latest form data
     form_data = req.form_data or {}
     
-    # Extract RCL-specific fields with proper fallbacks
-    full_name = req.requester.full_name if req.requester else "Unknown"
-    ps_id = form_data.get("ps_id", "")
-    semester = form_data.get("semester", "").title()  # Capitalize first letter
-    year = form_data.get("year", "")
-    
     # Get the formatted reason
     reason_text = []
     
@@ -359,8 +360,6 @@ def generate_rcl_pdf(request_id):
         hours = form_data.get("thesis_hours", "")
         reason_text.append(f"Final Semester (Thesis Track): Working on thesis/dissertation with {hours} hours of thesis/dissertation credit.")
     
-    reason = "\n\n".join(reason_text) if reason_text else "No reason specified"
-    
     # Get courses and format them
     courses = form_data.get("courses", [])
     if not courses:
@@ -369,228 +368,37 @@ def generate_rcl_pdf(request_id):
             course = form_data.get(f"course{i}")
             if course:
                 courses.append(course)
-    courses_str = "\n".join(f"• {course}" for course in courses) if courses else "None"
-    
-    # Get remaining hours
-    remaining_hours = form_data.get("remaining_hours", "")
-    
-    # Get letter attachment status
-    letter_attached = "Yes" if form_data.get("letter_attached") is True else "No"
-    
-    # Get signature date and path
-    signature_date = form_data.get("signature_date", str(datetime.now().date()))
-    signature_path = req.requester.signature_path if req.requester else None
-    
-    # Initialize approver information
-    advisor_signature = ""
-    advisor_name = "Not Yet Approved"
-    advisor_date = ""
-    advisor_comments = ""
-    
-    chair_signature = ""
-    chair_name = "Not Yet Approved"
-    chair_date = ""
-    chair_comments = ""
-    
-    dean_signature = ""
-    dean_name = "Not Yet Approved"
-    dean_date = ""
-    dean_comments = ""
-    
-    # Helper function to copy signature to PDF directory
-    def copy_signature_to_pdf_dir(sig_path):
-        if not sig_path:
-            return
-        src_path = os.path.join(uploads_dir, sig_path)
-        if os.path.exists(src_path):
-            try:
-                import shutil
-                shutil.copy2(src_path, os.path.join(pdf_dir, sig_path))
-            except Exception as e:
-                current_app.logger.warning(f"Could not copy signature file: {e}")
-    
-    # Process approvals to get signature information
-    for approval in approvals:
-        role = approval.step.approver_role.name if approval.step.approver_role else ""
-        
-        if role == 'advisor':
-            if approval.status == 'approved' and approval.approver:
-                advisor_signature = approval.approver.signature_path or ""
-                advisor_name = approval.approver.full_name
-                advisor_date = approval.approved_at.strftime("%Y-%m-%d") if approval.approved_at else ""
-                advisor_comments = approval.comments or ""
-                copy_signature_to_pdf_dir(advisor_signature)
-        
-        elif role == 'chair':
-            if approval.status == 'approved' and approval.approver:
-                chair_signature = approval.approver.signature_path or ""
-                chair_name = approval.approver.full_name
-                chair_date = approval.approved_at.strftime("%Y-%m-%d") if approval.approved_at else ""
-                chair_comments = approval.comments or ""
-                copy_signature_to_pdf_dir(chair_signature)
-        
-        elif role == 'dean':
-            if approval.status == 'approved' and approval.approver:
-                dean_signature = approval.approver.signature_path or ""
-                dean_name = approval.approver.full_name
-                dean_date = approval.approved_at.strftime("%Y-%m-%d") if approval.approved_at else ""
-                dean_comments = approval.comments or ""
-                copy_signature_to_pdf_dir(dean_signature)
-
-    # Copy student signature if it exists
-    if signature_path:
-        copy_signature_to_pdf_dir(signature_path)
-        # Make sure we use a fully qualified path for LaTeX
-        signature_path = "./".join(signature_path.rsplit("/", 1) if "/" in signature_path else ("", signature_path))
-    else:
-        signature_path = "non_existent_file.png"  # Use a non-existent file for IfFileExists to skip
-        
-    # Ensure signature paths are properly formatted for LaTeX IfFileExists command
-    if advisor_signature and advisor_signature.strip():
-        advisor_signature = "./".join(advisor_signature.rsplit("/", 1) if "/" in advisor_signature else ("", advisor_signature))
-    else:
-        advisor_signature = "non_existent_file.png"
-        
-    if chair_signature and chair_signature.strip():
-        chair_signature = "./".join(chair_signature.rsplit("/", 1) if "/" in chair_signature else ("", chair_signature))
-    else:
-        chair_signature = "non_existent_file.png"
-        
-    if dean_signature and dean_signature.strip():
-        dean_signature = "./".join(dean_signature.rsplit("/", 1) if "/" in dean_signature else ("", dean_signature))
-    else:
-        dean_signature = "non_existent_file.png"
-
-    template_path = os.path.join(pdf_dir, "rcl_template.tex")
-
-    try:
-        with open(template_path, "r", encoding="utf-8") as f:
-            template_content = f.read()
-    except Exception as e:
-        return None, f"Error reading RCL template: {e}"
-
-    # Helper function to escape LaTeX special characters
-    def escape_latex(text):
-        if not isinstance(text, str):
-            text = str(text)
-        special_chars = {
-            '&': r'\&',
-            '%': r'\%',
-            '$': r'\$',
-            '#': r'\#',
-            '_': r'\_',
-            '{': r'\{',
-            '}': r'\}',
-            '~': r'\textasciitilde{}',
-            '^': r'\textasciicircum{}',
-            '\\': r'\textbackslash{}',
-            '<': r'\textless{}',
-            '>': r'\textgreater{}'
-        }
-        for char, escape in special_chars.items():
-            text = text.replace(char, escape)
-        return text
-
-    # Fill template with escaped values
-    filled_template = (template_content
-        .replace("{{fullName}}", escape_latex(full_name))
-        .replace("{{psId}}", escape_latex(ps_id))
-        .replace("{{semester}}", escape_latex(semester))
-        .replace("{{year}}", escape_latex(year))
-        .replace("{{reason}}", escape_latex(reason))
-        .replace("{{courses}}", escape_latex(courses_str))
-        .replace("{{remainingHours}}", escape_latex(remaining_hours))
-        .replace("{{letterAttached}}", escape_latex(letter_attached))
-        .replace("{{signatureDate}}", escape_latex(signature_date))
-        .replace("{{studentSignature}}", signature_path if signature_path else "")
-        .replace("{{advisorSignature}}", advisor_signature if advisor_signature else "")
-        .replace("{{advisorName}}", escape_latex(advisor_name))
-        .replace("{{advisorDate}}", escape_latex(advisor_date))
-        .replace("{{advisorComments}}", escape_latex(advisor_comments))
-        .replace("{{chairSignature}}", chair_signature if chair_signature else "")
-        .replace("{{chairName}}", escape_latex(chair_name))
-        .replace("{{chairDate}}", escape_latex(chair_date))
-        .replace("{{chairComments}}", escape_latex(chair_comments))
-        .replace("{{deanSignature}}", dean_signature if dean_signature else "")
-        .replace("{{deanName}}", escape_latex(dean_name))
-        .replace("{{deanDate}}", escape_latex(dean_date))
-        .replace("{{deanComments}}", escape_latex(dean_comments))
-    )
-
-    # Write filled template
-    tex_path = os.path.join(pdf_dir, "document.tex")
-    try:
-        with open(tex_path, "w", encoding="utf-8") as f:
-            f.write(filled_template)
-    except Exception as e:
-        return None, f"Error writing LaTeX file: {e}"
-
-    # Run pdflatex
-    try:
-        result = subprocess.run(["make"], cwd=pdf_dir, capture_output=True, text=True)
-        if result.returncode != 0:
-            # Try to read the log file for more details
-            log_path = os.path.join(pdf_dir, "document.log")
-            log_content = ""
-            if os.path.exists(log_path):
-                with open(log_path, "r", encoding="utf-8") as f:
-                    log_content = f.read()
-            
-            error_message = f"pdflatex (Makefile) failed for RCL PDF.\n"
-            error_message += f"Make error: {result.stderr}\n"
-            error_message += f"Make output: {result.stdout}\n"
-            if log_content:
-                error_message += f"LaTeX log:\n{log_content}"
-            return None, error_message
-    except Exception as e:
-        return None, f"Subprocess error: {e}"
-
-    # Clean up copied signature files
-    for sig_path in [signature_path, advisor_signature, chair_signature, dean_signature]:
-        if sig_path and sig_path != "non_existent_file.png":
-            try:
-                os.remove(os.path.join(pdf_dir, sig_path))
-            except Exception as e:
-                print(f"Warning: Could not remove temporary signature file: {e}")
-
-    generated_pdf_path = os.path.join(pdf_dir, "document.pdf")
-    if not os.path.exists(generated_pdf_path):
-        return None, "document.pdf not found after RCL PDF generation."
 
-    new_filename = f"rcl_{request_id}_{int(datetime.now().timestamp())}.pdf"
-    final_pdf_path = os.path.join(pdf_dir, new_filename)
-    os.rename(generated_pdf_path, final_pdf_path)
-
-    # Update all approval records with the new filename
-    for approval in approvals:
-        if approval.status == 'approved':
-            approval.pdf_path = new_filename
-    db.session.commit()
-
-    # Get the latest approval to update specifically
-    latest_approval = RequestApproval.query.join(ApprovalStep).filter(
-        RequestApproval.request_id == request_id
-    ).order_by(ApprovalStep.step_order.desc()).first()
-    
-    if latest_approval:
-        latest_approval.pdf_path = new_filename
-        db.session.commit()
-
-    # Also update the request's final document path
-    req.final_document_path = new_filename
-    db.session.commit()
+    # RCL-specific fields, keyed by template placeholder
+    fields = {
+        "fullName": req.requester.full_name if req.requester else "Unknown",
+        "psId": form_data.get("ps_id", ""),
+        "semester": form_data.get("semester", "").title(),  # Capitalize first letter
+        "year": form_data.get("year", ""),
+        "reason": "\n\n".join(reason_text) if reason_text else "No reason specified",
+        "courses": "\n".join(f"• {course}" for course in courses) if courses else "None",
+        "remainingHours": form_data.get("remaining_hours", ""),
+        "letterAttached": "Yes" if form_data.get("letter_attached") is True else "No",
+        "signatureDate": signature_date(form_data),
+    }
+    signatures = {
+        "studentSignature": signature_file(uploads_dir, req.requester.signature_path if req.requester else None)
+    }
+
+    # Add approver information
+    approver_text, approver_signatures = approver_fields(approvals, uploads_dir, "Not Yet Approved")
+    fields.update(approver_text)
+    signatures.update(approver_signatures)
+    return fields, signatures
 
-    return new_filename, None
-
-def generate_withdrawal_pdf(request_id):
+def generate_rcl_pdf(request_id):
     """
-    Generate a PDF for a withdrawal request using a LaTeX template.
-    Returns (pdf_filename, error_message).
+    Generate a PDF for an RCL request with the renderer configured for RCL.
+    Returns (document_key, error_message).
     """
-    from models import Request, RequestApproval, ApprovalStep
     req = Request.query.get(request_id)
     if not req:
-        return None, "Request not found for withdrawal PDF generation."
+        return None, "Request not found for RCL PDF generation."
 
     # Get all approvals for this request in order
     approvals = RequestApproval.query.join(ApprovalStep).filter(
@@ -598,7 +406,7 @@ def generate_withdrawal_pdf(request_id):
     ).order_by(ApprovalStep.step_order).all()
 
     if not approvals:
-        return None, "No approval records found for withdrawal PDF generation."
+        return None, "No approval records found for RCL PDF generation."
 
     # Create necessary directories
     uploads_dir = os.path.join(current_app.root_path, "static", "uploads")
@@ -606,280 +414,133 @@ def generate_withdrawal_pdf(request_id):
     os.makedirs(uploads_dir, exist_ok=True)
     os.makedirs(pdf_dir, exist_ok=True)
 
-    # Get the latest form data
-    form_data = req.form_data or {}
-    
-    # Extract withdrawal-specific fields with proper fallbacks
-    full_name = req.requester.full_name if req.requester else "Unknown"
-    
-    # Get student information
-    ps_id = form_data.get("myUHID", "")
-    college = form_data.get("college", "")
-    plan_degree = form_data.get("planDegree", "")
-    address = form_data.get("address", "")
-    phone = form_data.get("phoneNumber", "")
-    
-    # Get withdrawal details
-    term_year = form_data.get("termYear", "")
-    reason = form_data.get("reason", "")
-    last_date_attended = form_data.get("lastDateAttended", "")
-    financial_assistance = "Yes" if form_data.get("financialAssistance") else "No"
-    student_health_insurance = "Yes" if form_data.get("studentHealthInsurance") else "No"
-    campus_housing = "Yes" if form_data.get("campusHousing") else "No"
-    visa_status = "Yes" if form_data.get("visaStatus") else "No"
-    gi_bill_benefits = "Yes" if form_data.get("giBillBenefits") else "No"
-    
-    # Get withdrawal type
-    withdrawal_type = form_data.get("withdrawalType", "")
-    
-    # Get courses
-    courses = form_data.get("coursesToWithdraw", "None")
-    
-    # Get additional comments
-    additional_comments = form_data.get("additionalComments", "")
-    
-    # Get student signature info
-    signature_date = form_data.get("signature_date", str(datetime.now().date()))
-    signature_path = form_data.get("signature_path")
-
-    # Initialize approver information
-    advisor_signature = ""
-    advisor_name = "Pending"
-    advisor_date = ""
-    advisor_comments = ""
-    
-    chair_signature = ""
-    chair_name = "Pending"
-    chair_date = ""
-    chair_comments = ""
-    
-    dean_signature = ""
-    dean_name = "Pending"
-    dean_date = ""
-    dean_comments = ""
-
-    # Helper function to copy signature to PDF directory
-    def copy_signature_to_pdf_dir(sig_path):
-        if sig_path:
-            src_path = os.path.join(uploads_dir, sig_path)
-            if os.path.exists(src_path):
-                try:
-                    import shutil
-                    dest_path = os.path.join(pdf_dir, sig_path)
-                    shutil.copy2(src_path, dest_path)
-                    return sig_path
-                except Exception as e:
-                    print(f"Warning: Could not copy signature file: {e}")
-        return None
+    fields, signatures = rcl_document(req, approvals, uploads_dir)
+    new_filename = f"rcl_{request_id}_{int(datetime.now().timestamp())}.pdf"
+    final_pdf_path, error = render_document(request_type_of(req).name, pdf_dir, "rcl", fields, signatures,
+                                            new_filename, label="RCL PDF",
+                                            cache_key=request_render_key(req, approvals),
+                                            base=request_base(req, uploads_dir))
+    if error:
+        return None, error
 
-    # Process each approval to get signatures up to the current step
-    current_step = None
-    for approval in approvals:
-        role = approval.step.approver_role.name if approval.step.approver_role else ""
-        
-        if role == 'advisor':
-            if approval.status == 'approved' and approval.approver:
-                advisor_signature = approval.approver.signature_path or ""
-                advisor_name = approval.approver.full_name
-                advisor_date = approval.approved_at.strftime("%Y-%m-%d") if approval.approved_at else ""
-                advisor_comments = approval.comments or ""
-                copy_signature_to_pdf_dir(advisor_signature)
-            current_step = 'advisor'
-        
-        elif role == 'chair':
-            if approval.status == 'approved' and approval.approver:
-                chair_signature = approval.approver.signature_path or ""
-                chair_name = approval.approver.full_name
-                chair_date = approval.approved_at.strftime("%Y-%m-%d") if approval.approved_at else ""
-                chair_comments = approval.comments or ""
-                copy_signature_to_pdf_dir(chair_signature)
-            current_step = 'chair'
-        
-        elif role == 'dean':
-            if approval.status == 'approved' and approval.approver:
-                dean_signature = approval.approver.signature_path or ""
-                dean_name = approval.approver.full_name
-                dean_date = approval.approved_at.strftime("%Y-%m-%d") if approval.approved_at else ""
-                dean_comments = approval.comments or ""
-                copy_signature_to_pdf_dir(dean_signature)
-            current_step = 'dean'
-
-    # Copy student signature if it exists
-    if signature_path:
-        copy_signature_to_pdf_dir(signature_path)
-        # Make sure we use a fully qualified path for LaTeX
-        signature_path = "./".join(signature_path.rsplit("/", 1) if "/" in signature_path else ("", signature_path))
-    else:
-        signature_path = "non_existent_file.png"  # Use a non-existent file for IfFileExists to skip
-        
-    # Ensure signature paths are properly formatted for LaTeX IfFileExists command
-    if advisor_signature and advisor_signature.strip():
-        advisor_signature = "./".join(advisor_signature.rsplit("/", 1) if "/" in advisor_signature else ("", advisor_signature))
-    else:
-        advisor_signature = "non_existent_file.png"
-        
-    if chair_signature and chair_signature.strip():
-        chair_signature = "./".join(chair_signature.rsplit("/", 1) if "/" in chair_signature else ("", chair_signature))
-    else:
-        chair_signature = "non_existent_file.png"
-        
-    if dean_signature and dean_signature.strip():
-        dean_signature = "./".join(dean_signature.rsplit("/", 1) if "/" in dean_signature else ("", dean_signature))
-    else:
-        dean_signature = "non_existent_file.png"
-
-    template_path = os.path.join(pdf_dir, "withdrawal_template.tex")
-
-    try:
-        with open(template_path, "r", encoding="utf-8") as f:
-            template_content = f.read()
-    except Exception as e:
-        return None, f"Error reading withdrawal template: {e}"
-
-    # Helper function to escape LaTeX special characters
-    def escape_latex(text):
-        if not isinstance(text, str):
-            text = str(text)
-        special_chars = {
-            '&': r'\&',
-            '%': r'\%',
-            '$': r'\$',
-            '#': r'\#',
-            '_': r'\_',
-            '{': r'\{',
-            '}': r'\}',
-            '~': r'\textasciitilde{}',
-            '^': r'\textasciicircum{}',
-            '\\': r'\textbackslash{}',
-            '<': r'\textless{}',
-            '>': r'\textgreater{}'
-        }
-        for char, escape in special_chars.items():
-            text = text.replace(char, escape)
-        return text
-
-    # Fill template with escaped values
-    filled_template = (template_content
-        .replace("{{fullName}}", escape_latex(full_name))
-        .replace("{{psId}}", escape_latex(ps_id))
-        .replace("{{college}}", escape_latex(college))
-        .replace("{{planDegree}}", escape_latex(plan_degree))
-        .replace("{{address}}", escape_latex(address))
-        .replace("{{phone}}", escape_latex(phone))
-        .replace("{{termYear}}", escape_latex(term_year))
-        .replace("{{reason}}", escape_latex(reason))
-        .replace("{{courses}}", escape_latex(courses))
-        .replace("{{withdrawalType}}", escape_latex(withdrawal_type))
-        .replace("{{lastDateAttended}}", escape_latex(last_date_attended))
-        .replace("{{financialAssistance}}", escape_latex(financial_assistance))
-        .replace("{{studentHealthInsurance}}", escape_latex(student_health_insurance))
-        .replace("{{campusHousing}}", escape_latex(campus_housing))
-        .replace("{{visaStatus}}", escape_latex(visa_status))
-        .replace("{{giBillBenefits}}", escape_latex(gi_bill_benefits))
-        .replace("{{additionalComments}}", escape_latex(additional_comments))
-        .replace("{{signatureDate}}", escape_latex(signature_date))
-        .replace("{{studentSignature}}", signature_path if signature_path else "")
-        .replace("{{advisorSignature}}", advisor_signature if advisor_signature else "")
-        .replace("{{advisorName}}", escape_latex(advisor_name))
-        .replace("{{advisorDate}}", escape_latex(advisor_date))
-        .replace("{{advisorComments}}", escape_latex(advisor_comments))
-        .replace("{{chairSignature}}", chair_signature if chair_signature else "")
-        .replace("{{chairName}}", escape_latex(chair_name))
-        .replace("{{chairDate}}", escape_latex(chair_date))
-        .replace("{{chairComments}}", escape_latex(chair_comments))
-        .replace("{{deanSignature}}", dean_signature if dean_signature else "")
-        .replace("{{deanName}}", escape_latex(dean_name))
-        .replace("{{deanDate}}", escape_latex(dean_date))
-        .replace("{{deanComments}}", escape_latex(dean_comments))
-    )
-
-    # Write filled template
-    tex_path = os.path.join(pdf_dir, "document.tex")
-    try:
-        with open(tex_path, "w", encoding="utf-8") as f:
-            f.write(filled_template)
-    except Exception as e:
-        return None, f"Error writing LaTeX file: {e}"
-
-    # Run pdflatex
-    try:
-        result = subprocess.run(["make"], cwd=pdf_dir, capture_output=True, text=True)
-        if result.returncode != 0:
-            # Try to read the log file for more details
-            log_path = os.path.join(pdf_dir, "document.log")
-            log_content = ""
-            if os.path.exists(log_path):
-                with open(log_path, "r", encoding="utf-8") as f:
-                    log_content = f.read()
-            
-            error_message = f"pdflatex (Makefile) failed for withdrawal PDF.\n"
-            error_message += f"Make error: {result.stderr}\n"
-            error_message += f"Make output: {result.stdout}\n"
-            if log_content:
-                error_message += f"LaTeX log:\n{log_content}"
-            return None, error_message
-    except Exception as e:
-        return None, f"Subprocess error: {e}"
-
-    # Clean up copied signature files
-    for sig_path in [signature_path, advisor_signature, chair_signature, dean_signature]:
-        if sig_path:
-            try:
-                os.remove(os.path.join(pdf_dir, sig_path))
-            except Exception as e:
-                print(f"Warning: Could not remove temporary signature file: {e}")
+    return store_request_pdf(req, approvals, final_pdf_path), None
 
-    generated_pdf_path = os.path.join(pdf_dir, "document.pdf")
-    if not os.path.exists(generated_pdf_path):
-        return None, "document.pdf not found after withdrawal PDF generation."
+def withdrawal_document(req, approvals, uploads_dir):
+    """Template fields and signatures for a withdrawal request. Returns (fields, signatures)."""
+    # Get the latest form data
+    form_data = req.form_data or {}
 
-    new_filename = f"withdrawal_{request_id}_{int(datetime.now().timestamp())}.pdf"
-    final_pdf_path = os.path.join(pdf_dir, new_filename)
-    os.rename(generated_pdf_path, final_pdf_path)
+    # Withdrawal-specific fields, keyed by template placeholder
+    fields = {
+        # Student information
+        "fullName": req.requester.full_name if req.requester else "Unknown",
+        "psId": form_data.get("myUHID", ""),
+        "college": form_data.get("college", ""),
+        "planDegree": form_data.get("planDegree", ""),
+        "address": form_data.get("address", ""),
+        "phone": form_data.get("phoneNumber", ""),
+        # Withdrawal details
+        "termYear": form_data.get("termYear", ""),
+        "reason": form_data.get("reason", ""),
+        "lastDateAttended": form_data.get("lastDateAttended", ""),
+        "withdrawalType": form_data.get("withdrawalType", ""),
+        "financialAssistance": "Yes" if form_data.get("financialAssistance") else "No",
+        "studentHealthInsurance": "Yes" if form_data.get("studentHealthInsurance") else "No",
+        "campusHousing": "Yes" if form_data.get("campusHousing") else "No",
+        "visaStatus": "Yes" if form_data.get("visaStatus") else "No",
+        "giBillBenefits": "Yes" if form_data.get("giBillBenefits") else "No",
+        "courses": form_data.get("coursesToWithdraw", "None"),
+        "additionalComments": form_data.get("additionalComments", ""),
+        # Student signature info
+        "signatureDate": signature_date(form_data),
+    }
+    signatures = {
+        "studentSignature": signature_file(uploads_dir, form_data.get("signature_path"))
+    }
+
+    # Add approver information
+    approver_text, approver_signatures = approver_fields(approvals, uploads_dir, "Pending")
+    fields.update(approver_text)
+    signatures.update(approver_signatures)
+    return fields, signatures
 
-    # Update all approval records with the new filename
-    for approval in approvals:
-        if approval.status == 'approved':
-            approval.pdf_path = new_filename
-    db.session.commit()
+def generate_withdrawal_pdf(request_id):
+    """
+    Generate a PDF for a withdrawal request with the renderer configured for Withdrawal.
+    Returns (document_key, error_message).
+    """
+    req = Request.query.get(request_id)
+    if not req:
+        return None, "Request not found for withdrawal PDF generation."
 
-    # Get the latest approval to update specifically
-    latest_approval = RequestApproval.query.join(ApprovalStep).filter(
+    # Get all approvals for this request in order
+    approvals = RequestApproval.query.join(ApprovalStep).filter(
         RequestApproval.request_id == request_id
-    ).order_by(ApprovalStep.step_order.desc()).first()
-    
-    if latest_approval:
-        latest_approval.pdf_path = new_filename
-        db.session.commit()
-
-    # Also update the request's final document path
-    req.final_document_path = new_filename
-    db.session.commit()
-
-    return new_filename, None
+    ).order_by(ApprovalStep.step_order).all()
 
+    if not approvals:
+        return None, "No approval records found for withdrawal PDF generation."
 
-def generate_pdf_for_approval(approval_id):
-    """
-    (Generic fallback) Helper function for approvals that don't match RCL or Withdrawal,
-    or if you want a generic template for other forms.
-    """
-    approval = RequestApproval.query.get(approval_id)
-    if not approval:
-        return None, "Approval record not found."
-    
-    request_obj = approval.request
-    requester = request_obj.requester  # who submitted the request
-    
     # Create necessary directories
-    uploads_dir = os.path.join(current_app.root_path, "uploads")
+    uploads_dir = os.path.join(current_app.root_path, "static", "uploads")
     pdf_dir = os.path.join(current_app.root_path, "pdf")
     os.makedirs(uploads_dir, exist_ok=True)
     os.makedirs(pdf_dir, exist_ok=True)
 
-    # Create default signature PNG if it doesn't exist
-    signature_path = "default_signature.png"
-    default_sig = os.path.join(uploads_dir, signature_path)
+    fields, signatures = withdrawal_document(req, approvals, uploads_dir)
+    new_filename = f"withdrawal_{request_id}_{int(datetime.now().timestamp())}.pdf"
+    final_pdf_path, error = render_document(request_type_of(req).name, pdf_dir, "withdrawal", fields, signatures,
+                                            new_filename, label="withdrawal PDF",
+                                            cache_key=request_render_key(req, approvals),
+                                            base=request_base(req, uploads_dir))
+    if error:
+        return None, error
+
+    return store_request_pdf(req, approvals, final_pdf_path), None
+
+# Field builders for request types with a whole-request document
+REQUEST_DOCUMENTS = {
+    'rcl': rcl_document,
+    'withdrawal': withdrawal_document,
+}
+
+def request_base(req, uploads_dir):
+    """
+    Describe the request's base document, i.e. the form before any approvals,
+    for incremental stamping. Returns (base_key, fields, signatures).
+    """
+    type_name = request_type_of(req).name
+    template = type_name.lower()
+    fields, signatures = REQUEST_DOCUMENTS[template](req, [], uploads_dir)
+    template_path = os.path.join(current_app.root_path, "pdf", f"{template}_template.tex")
+    extra = {'renderer': renderer_name_for(type_name), 'base': True,
+             'signature_date': signature_date(req.form_data or {})}
+    base_key = render_cache_key(template_path, req, [], uploads_dir, extra)
+    return base_key, fields, signatures
+
+def prepare_request_base(request_id):
+    """
+    Render the base document for a newly submitted request so that each
+    approval only has to stamp its signature block onto it. Does nothing
+    unless incremental stamping applies to the request type.
+    """
+    req = Request.query.get(request_id)
+    if not req:
+        return
+    type_name = request_type_of(req).name
+    template = type_name.lower()
+    if template not in REQUEST_DOCUMENTS:
+        return
+    uploads_dir = os.path.join(current_app.root_path, "static", "uploads")
+    error = prepare_base_document(type_name, template, request_base(req, uploads_dir))
+    if error:
+        current_app.logger.warning(f"Request {request_id}: {error}")
+
+def default_signature_file():
+    """Path of the placeholder signature PNG, creating it on first use."""
+    uploads_dir = os.path.join(current_app.root_path, "uploads")
+    os.makedirs(uploads_dir, exist_ok=True)
+    default_sig = os.path.join(uploads_dir, "default_signature.png")
     if not os.path.exists(default_sig):
         try:
             # Create a new image with white background
@@ -899,55 +560,56 @@ def generate_pdf_for_approval(approval_id):
             with open(default_sig, 'wb') as f:
                 # Minimal valid PNG file (1x1 transparent pixel)
                 f.write(bytes.fromhex('89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c4890000000d4944415478da63000000000000ffff00000500000007'))
+    return default_sig
+
+def generate_pdf_for_approval(approval_id):
+    """
+    (Generic fallback) Helper function for approvals that don't match RCL or Withdrawal,
+    or if you want a generic template for other forms. Shows every signature up to
+    the approval's step. Returns (document_key, error_message).
+    """
+    approval = RequestApproval.query.get(approval_id)
+    if not approval:
+        return None, "Approval record not found."
     
-    full_name = requester.full_name or "Unknown User"
-    names = full_name.split(None, 1)
-    first_name = names[0]
-    last_name = names[1] if len(names) > 1 else ""
-    approval_note = approval.comments or "No comments"
-    current_date = datetime.now().strftime("%Y-%m-%d")
+    request_obj = approval.request
+    requester = request_obj.requester  # who submitted the request
+
+    # Get all approvals for this request up to the current step
+    approvals = RequestApproval.query.join(ApprovalStep).filter(
+        RequestApproval.request_id == request_obj.id,
+        ApprovalStep.step_order <= step_of(approval).step_order
+    ).order_by(ApprovalStep.step_order).all()
     
+    # Create necessary directories
+    uploads_dir = os.path.join(current_app.root_path, "static", "uploads")
     pdf_dir = os.path.join(current_app.root_path, "pdf")
-    template_path = os.path.join(pdf_dir, "approval_template.tex")
-    
-    try:
-        with open(template_path, "r", encoding="utf-8") as f:
-            template_content = f.read()
-    except Exception as e:
-        return None, f"Error reading LaTeX template: {e}"
-    
-    filled_template = (
-        template_content
-        .replace("{{firstName}}", first_name)
-        .replace("{{lastName}}", last_name)
-        .replace("{{approvalNote}}", approval_note)
-        .replace("{{date}}", current_date)
-        .replace("{{signatureFilename}}", signature_path)  # Don't escape the signature path
-    )
-    
-    tex_path = os.path.join(pdf_dir, "document.tex")
-    try:
-        with open(tex_path, "w", encoding="utf-8") as f:
-            f.write(filled_template)
-    except Exception as e:
-        return None, f"Error writing LaTeX file: {e}"
-    
-    try:
-        result = subprocess.run(["make"], cwd=pdf_dir, capture_output=True, text=True)
-        if result.returncode != 0:
-            return None, f"Error: pdflatex (via Makefile) failed to generate PDF. Error: {result.stderr}"
-    except Exception as e:
-        return None, f"Subprocess error: {e}"
-    
-    generated_pdf_path = os.path.join(pdf_dir, "document.pdf")
-    if not os.path.exists(generated_pdf_path):
-        return None, "Expected PDF was not generated."
-    
+    os.makedirs(uploads_dir, exist_ok=True)
+    os.makedirs(pdf_dir, exist_ok=True)
+
+    approver_text, signatures = approver_fields(approvals, uploads_dir, "")
+    fields = {
+        "requestId": request_obj.id,
+        "requestType": request_type_of(request_obj).name,
+        "requesterName": requester.full_name or "Unknown User",
+        "studentSignatureDate": request_obj.created_at.strftime("%Y-%m-%d"),
+        "approvalNote": approval.comments or "No comments",
+        "date": datetime.now().strftime("%Y-%m-%d"),
+    }
+    # The generic template labels approver dates as <role>SignatureDate
+    for role in APPROVER_ROLES:
+        fields[f"{role}Name"] = approver_text[f"{role}Name"]
+        fields[f"{role}SignatureDate"] = approver_text[f"{role}Date"]
+    signatures["studentSignature"] = signature_file(uploads_dir, requester.signature_path) or default_signature_file()
+
     new_filename = f"approval_{approval_id}_{int(datetime.now().timestamp())}.pdf"
-    final_pdf_path = os.path.join(pdf_dir, new_filename)
-    os.rename(generated_pdf_path, final_pdf_path)
+    final_pdf_path, error = render_document(request_type_of(request_obj).name, pdf_dir, "approval", fields, signatures,
+                                            new_filename, label="approval PDF",
+                                            cache_key=request_render_key(request_obj, approvals, approval))
+    if error:
+        return None, error
     
-    approval.pdf_path = new_filename
+    approval.pdf_path = save_document(final_pdf_path, request_obj.id, approval.id)
     db.session.commit()
     
-    return final_pdf_path, None
+    return approval.pdf_path, None
@@ -12,6 +12,7 @@ def setup_auth_routes(app):
     def start_login():
         auth_url = build_auth_url(
             config.CLIENT_ID, 
+            config.CLIENT_SECRET,
             config.AUTHORITY, 
             config.SCOPE, 
             url_for("authorized", _external=True)
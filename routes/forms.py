@@ -1,7 +1,32 @@
-from flask import render_template, redirect, url_for, flash, request, session
-from models import db, User, RequestType, Request, ApprovalWorkflow, RequestApproval
-from utils.auth_helpers import active_required, get_user_signature
+from flask import render_template, redirect, url_for, flash, request, session, abort
+from models import db, Request, RequestApproval
+from utils.auth_helpers import active_required, get_user_signature, get_current_user
+from utils.submissions import submit_request, SubmissionError
 from datetime import date
+from utils.workflow_registry import workflow_registry
+from .approvals import prepare_request_base
+
+# Request types whose forms have a page of their own, by the endpoint that serves it
+CUSTOM_FORM_ENDPOINTS = {
+    'RCL': 'rcl_form',
+    'Withdrawal': 'withdrawal_form',
+}
+
+def parse_request_form(type_name, **values):
+    """
+    Read and validate request.form with the compiled form of a request type.
+    Returns (data, errors) as CompiledForm.parse does.
+    """
+    request_type = workflow_registry().request_type(type_name)
+    form = request_type.form if request_type else None
+    if form is None:
+        raise SubmissionError(f'{type_name} form type not found in the database')
+    return form.parse(request.form, **values)
+
+def form_url(request_type):
+    """The page a request type's form is filled in on."""
+    endpoint = CUSTOM_FORM_ENDPOINTS.get(request_type.name)
+    return url_for(endpoint) if endpoint else url_for('request_form', type_id=request_type.id)
 
 def setup_form_routes(app):
     @app.route('/rcl_form', methods=['GET', 'POST'])
@@ -12,52 +37,51 @@ def setup_form_routes(app):
         
         if request.method == 'POST':
             try:
-                user_email = session['user'].get('preferred_username').lower()
-                current_user = User.query.filter_by(email=user_email).first()
+                current_user = get_current_user()
                 signature = get_user_signature(current_user.id)
                 if not signature:
                     flash('Please upload a signature before submitting the form.', 'warning')
                     return redirect(url_for('upload_signature'))
 
-                rcl_type = RequestType.query.filter_by(name='RCL').first()
-                if not rcl_type:
-                    flash('RCL form type not found in the database', 'danger')
-                    return redirect(url_for('index'))            
                 if not current_user:
                     flash('User not found. Please log in again.', 'danger')
                     return redirect(url_for('login'))
                 
+                # Read and validate the fields described by the RCL schema
+                fields, errors = parse_request_form('RCL', signature_date=str(date.today()))
+                if errors:
+                    for error in errors.values():
+                        flash(error, 'danger')
+                    return redirect(url_for('rcl_form'))
+                
                 # Process form data
                 form_data = {}
                 
                 # Process Initial Adjustment Issues
-                form_data['iai'] = request.form.getlist('iai[]')
+                form_data['iai'] = fields['iai']
                 
-                # Process reason (ICLP or medical)
+                # Process reason (ICLP or medical), sent as checkboxes named "reason"
                 form_data['reason'] = request.form.get('reason')
                 
                 # Process letter attachment
-                form_data['letter_attached'] = 'letter_attached' in request.form
+                form_data['letter_attached'] = fields['letter_attached']
                 
                 # Process semester and year
-                form_data['semester'] = request.form.get('semester')
+                form_data['semester'] = fields['semester']
                 if form_data['semester'] == 'fall':
-                    form_data['year'] = '20' + request.form.get('fall_year', '')
+                    form_data['year'] = '20' + fields['fall_year']
                 elif form_data['semester'] == 'spring':
-                    form_data['year'] = '20' + request.form.get('spring_year', '')
+                    form_data['year'] = '20' + fields['spring_year']
                 
                 # Process courses
-                form_data['courses'] = []
-                for i in range(1, 4):
-                    course = request.form.get(f'course{i}')
-                    if course:
-                        form_data['courses'].append(course)
+                form_data['courses'] = [fields[f'course{i}'] for i in range(1, 4) if fields[f'course{i}']]
                 
                 # Process remaining hours
-                form_data['remaining_hours'] = request.form.get('remaining_hours')
+                remaining_hours = fields['remaining_hours']
+                form_data['remaining_hours'] = str(remaining_hours) if remaining_hours is not None else None
                 
                 # Process PS ID
-                form_data['ps_id'] = request.form.get('ps_id')
+                form_data['ps_id'] = fields['ps_id']
                 
                 # Add signature info
                 form_data['signature_date'] = str(date.today())
@@ -73,30 +97,15 @@ def setup_form_routes(app):
                     reason_text.append("Medical Reason")
                 form_data['formatted_reason'] = "\n".join(reason_text)
                 
-                # Create request
+                # Create the request and its pending approvals in one transaction
                 semester_info = f"{form_data['semester']} {form_data['year']}"
-                new_request = Request(
-                    type_id=rcl_type.id,
-                    requester_id=current_user.id,
-                    title=f"RCL Request - {semester_info}",
-                    form_data=form_data,
-                    status='submitted' 
-                )
-                db.session.add(new_request)
-                db.session.commit()
-                
-                # Create entries in approval table set as pending
-                workflow = ApprovalWorkflow.query.filter_by(request_type_id=rcl_type.id).first()
-                if workflow:
-                    for step in workflow.steps:
-                        approval = RequestApproval(
-                            request_id=new_request.id,
-                            step_id=step.id,
-                            status='pending'
-                        )
-                        db.session.add(approval)
-                    db.session.commit()
-                    flash('RCL Form submitted successfully and sent for approval!', 'success')
+                try:
+                    request_id = submit_request('RCL', current_user.id, f"RCL Request - {semester_info}", form_data)
+                except SubmissionError as e:
+                    flash(str(e), 'danger')
+                    return redirect(url_for('index'))
+                prepare_request_base(request_id)
+                flash('RCL Form submitted successfully and sent for approval!', 'success')
                 return redirect(url_for('index'))
                 
             except Exception as e:
@@ -114,8 +123,7 @@ def setup_form_routes(app):
             return redirect(url_for("login"))
         
         # Get user's signature for both GET and POST requests
-        user_email = session['user'].get('preferred_username').lower()
-        current_user = User.query.filter_by(email=user_email).first()
+        current_user = get_current_user()
         if not current_user:
             flash('User not found. Please log in again.', 'danger')
             return redirect(url_for('login'))
@@ -128,56 +136,24 @@ def setup_form_routes(app):
                     flash('Please upload a signature before submitting the form.', 'warning')
                     return redirect(url_for('upload_signature'))
 
-                withdrawal_type = RequestType.query.filter_by(name='Withdrawal').first()
-                if not withdrawal_type:
-                    flash('Withdrawal form type not found in the database', 'danger')
-                    return redirect(url_for('index'))
-                
-                # Process form data
-                form_data = {}
-                form_data['myUHID'] = request.form.get('myUHID', '')
-                form_data['college'] = request.form.get('college', '')
-                form_data['planDegree'] = request.form.get('planDegree', '')
-                form_data['address'] = request.form.get('address', '')
-                form_data['phoneNumber'] = request.form.get('phoneNumber', '')
-                form_data['termYear'] = request.form.get('termYear', '')
-                form_data['reason'] = request.form.get('reason', '')
-                form_data['lastDateAttended'] = request.form.get('lastDateAttended', '')
-                form_data['financialAssistance'] = request.form.get('financialAssistance') == 'yes'
-                form_data['studentHealthInsurance'] = request.form.get('studentHealthInsurance') == 'yes'
-                form_data['campusHousing'] = request.form.get('campusHousing') == 'yes'
-                form_data['visaStatus'] = request.form.get('visaStatus') == 'yes'
-                form_data['giBillBenefits'] = request.form.get('giBillBenefits') == 'yes'
-                form_data['withdrawalType'] = request.form.get('withdrawalType', '')
-                form_data['coursesToWithdraw'] = request.form.get('coursesToWithdraw', '')
-                form_data['additionalComments'] = request.form.get('additionalComments', '')
+                # Read and validate the fields described by the Withdrawal schema
+                form_data, errors = parse_request_form('Withdrawal')
+                if errors:
+                    for error in errors.values():
+                        flash(error, 'danger')
+                    return redirect(url_for('withdrawal_form'))
                 form_data['signature_path'] = signature.signature_image_path
                 form_data['submissionDate'] = str(date.today())
                     
-                # create request
-                new_request = Request(
-                    type_id=withdrawal_type.id,
-                    requester_id=current_user.id,
-                    title=f"Withdrawal Request - {form_data['termYear']}",
-                    form_data=form_data,
-                    status='submitted'
-                )
-                db.session.add(new_request)
-                db.session.commit()
-                
-                # create entries in approval table set as pending
-                workflow = ApprovalWorkflow.query.filter_by(request_type_id=withdrawal_type.id).first()
-                if workflow:
-                    for step in workflow.steps:
-                        approval = RequestApproval(
-                            request_id=new_request.id,
-                            step_id=step.id,
-                            status='pending'
-                        )
-                        db.session.add(approval)
-                    
-                    db.session.commit()
-                    flash('Withdrawal Form submitted successfully and sent for approval!', 'success')
+                # Create the request and its pending approvals in one transaction
+                try:
+                    request_id = submit_request('Withdrawal', current_user.id,
+                                                f"Withdrawal Request - {form_data['termYear']}", form_data)
+                except SubmissionError as e:
+                    flash(str(e), 'danger')
+                    return redirect(url_for('index'))
+                prepare_request_base(request_id)
+                flash('Withdrawal Form submitted successfully and sent for approval!', 'success')
                 return redirect(url_for('my_requests'))
                 
             except Exception as e:
@@ -191,6 +167,52 @@ def setup_form_routes(app):
         # GET request
         return render_template('withdraw_form.html', signature=signature)
 
+    @app.route('/forms/<int:type_id>', methods=['GET', 'POST'])
+    @active_required
+    def request_form(type_id):
+        """Fill in and submit a request of any type with a form schema, drawn from its compiled form"""
+        if not session.get("user"):
+            return redirect(url_for("login"))
+        
+        current_user = get_current_user()
+        if not current_user:
+            flash('User not found. Please log in again.', 'danger')
+            return redirect(url_for('login'))
+        
+        request_type = workflow_registry().request_type(type_id)
+        if request_type is None:
+            abort(404)
+        if request_type.name in CUSTOM_FORM_ENDPOINTS:
+            return redirect(form_url(request_type))
+        form = request_type.form
+        if form is None:
+            flash(f'{request_type.name} requests cannot be submitted online.', 'warning')
+            return redirect(url_for('available_forms'))
+        
+        values, errors = {}, {}
+        if request.method == 'POST':
+            signature = get_user_signature(current_user.id)
+            if not signature:
+                flash('Please upload a signature before submitting the form.', 'warning')
+                return redirect(url_for('upload_signature'))
+            
+            values, errors = form.parse(request.form)
+            if not errors:
+                form_data = dict(values, signature_path=signature.signature_image_path,
+                                 submissionDate=str(date.today()))
+                try:
+                    request_id = submit_request(request_type.name, current_user.id,
+                                                f"{request_type.name} Request", form_data)
+                except SubmissionError as e:
+                    flash(str(e), 'danger')
+                    return redirect(url_for('available_forms'))
+                prepare_request_base(request_id)
+                flash(f'{request_type.name} request submitted successfully and sent for approval!', 'success')
+                return redirect(url_for('my_requests'))
+        
+        return render_template('request_form.html', request_type=request_type, form=form,
+                               values=values, errors=errors)
+
     @app.route('/available_forms')
     @active_required
     def available_forms():
@@ -198,10 +220,12 @@ def setup_form_routes(app):
         if not session.get("user"):
             return redirect(url_for("login"))
         
-        # Get all request types from the database
-        form_types = RequestType.query.filter(RequestType.name.in_(['RCL', 'Withdrawal'])).all()
+        # Every request type with a form that can be filled in online
+        form_types = [request_type for request_type in workflow_registry().request_types.values()
+                      if request_type.form]
         
-        return render_template('available_forms.html', form_types=form_types)
+        return render_template('available_forms.html', form_types=form_types,
+                               form_urls={request_type.id: form_url(request_type) for request_type in form_types})
 
     @app.route('/delete_request/<int:request_id>', methods=['POST'])
     @active_required
@@ -210,8 +234,7 @@ def setup_form_routes(app):
         if not session.get("user"):
             return redirect(url_for("login"))
         
-        user_email = session['user'].get('preferred_username').lower()
-        current_user = User.query.filter_by(email=user_email).first()
+        current_user = get_current_user()
         
         if not current_user:
             flash('User not found. Please log in again.', 'danger')
@@ -220,7 +243,7 @@ def setup_form_routes(app):
         request_obj = Request.query.get_or_404(request_id)
         
         # Check if the user owns this request or is an admin
-        if request_obj.requester_id != current_user.id and current_user.role.name != 'admin':
+        if request_obj.requester_id != current_user.id and 'delete_any_request' not in current_user.permissions:
             flash('You do not have permission to delete this request.', 'danger')
             return redirect(url_for('my_requests'))
         
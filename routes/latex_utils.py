@@ -0,0 +1,26 @@
+import re
+
+_LATEX_SPECIAL_CHARS = {
+    '&': r'\&',
+    '%': r'\%',
+    '$': r'\$',
+    '#': r'\#',
+    '_': r'\_',
+    '{': r'\{',
+    '}': r'\}',
+    '~': r'\textasciitilde{}',
+    '^': r'\textasciicircum{}',
+    '\\': r'\textbackslash{}',
+    '<': r'\textless{}',
+    '>': r'\textgreater{}'
+}
+
+_LATEX_SPECIAL_RE = re.compile('|'.join(re.escape(char) for char in _LATEX_SPECIAL_CHARS))
+
+def latex_escape(text):
+    """Escape LaTeX special characters in a single pass."""
+    if text is None:
+        return ""
+    if not isinstance(text, str):
+        text = str(text)
+    return _LATEX_SPECIAL_RE.sub(lambda match: _LATEX_SPECIAL_CHARS[match.group()], text)
@@ -0,0 +1,581 @@
+# pdf_renderers.py
+"""
+Pluggable PDF renderers.
+
+The PDF generators describe a document as a template name ('rcl',
+'withdrawal' or 'approval'), a dict of text fields keyed by the template's
+placeholder names and a dict of signature image paths. A renderer turns that
+description into a PDF:
+
+- LatexRenderer fills pdf/<template>_template.tex and runs pdflatex.
+- ReportLabRenderer draws the same layout in-process with ReportLab.
+
+With PDF_INCREMENTAL_STAMPING enabled, ReportLab documents whose signature
+blocks have fixed positions are rendered once with empty signature boxes (the
+base document) and each approval only stamps the boxes onto it.
+
+The renderer used for each request type is chosen with PDF_RENDERERS in config.py.
+"""
+import io
+import json
+import os
+import tempfile
+from collections import defaultdict
+from xml.sax.saxutils import escape
+from flask import current_app
+import PyPDF2
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import ArrayObject, DecodedStreamObject, DictionaryObject, NameObject
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import cm, inch
+from reportlab.pdfgen import canvas
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, ListFlowable, ListItem, Flowable
+from utils import render_cache
+from utils.pdf_build import build_latex_pdf
+from .latex_utils import latex_escape
+
+MISSING_SIGNATURE = "non_existent_file.png"
+
+class LatexRenderer:
+    """Fill a LaTeX template and compile it with pdflatex."""
+    name = 'latex'
+
+    def render(self, pdf_dir, template, fields, signatures, output_filename, label="PDF", cache_key=None):
+        template_path = os.path.join(pdf_dir, f"{template}_template.tex")
+        try:
+            with open(template_path, "r", encoding="utf-8") as f:
+                filled_template = f.read()
+        except Exception as e:
+            return None, f"Error reading {label} template: {e}"
+
+        # Signatures are linked into the build directory under their own file names
+        signature_files = {}
+        for key, path in signatures.items():
+            if path:
+                name = os.path.basename(path)
+                signature_files[name] = path
+                filled_template = filled_template.replace("{{" + key + "}}", name)
+            else:
+                filled_template = filled_template.replace("{{" + key + "}}", MISSING_SIGNATURE)
+
+        for key, value in fields.items():
+            filled_template = filled_template.replace("{{" + key + "}}", latex_escape(value))
+
+        return build_latex_pdf(pdf_dir, filled_template, output_filename, signature_files,
+                               label=label, cache_key=cache_key)
+
+# --------------------------------------------------------------------
+# REPORTLAB LAYOUTS
+# --------------------------------------------------------------------
+# Each layout mirrors its LaTeX template as a list of parts:
+#   ('title', text)                 document title
+#   ('section', text)               section heading
+#   ('subsection', text)            subsection heading
+#   ('field', label, key)           "Label: value" on one line
+#   ('block', label, key)           label followed by a multi-line value
+#   ('text', key)                   multi-line value without a label
+#   ('bullets', [(label, key)])     bulleted "Label: value" list
+#   ('signature', key, lines)       boxed signature with caption lines
+#   ('optional_signature', ...)     same, skipped when there is no signature
+
+def _approver_box(role, title):
+    return ('signature', f'{role}Signature', [
+        '{' + role + 'Name}', title, 'Date: {' + role + 'Date}', 'Comments: {' + role + 'Comments}'
+    ])
+
+STUDENT_BOX = ('signature', 'studentSignature', ['Student Signature', 'Date: {signatureDate}'])
+
+REPORTLAB_LAYOUTS = {
+    'rcl': [
+        ('title', 'Reduced Course Load (RCL) Request Form'),
+        ('section', 'Student Information'),
+        ('field', 'Full Name', 'fullName'),
+        ('field', 'PS ID', 'psId'),
+        ('field', 'Semester', 'semester'),
+        ('field', 'Year', 'year'),
+        ('section', 'Request Details'),
+        ('block', 'Reason for RCL', 'reason'),
+        ('block', 'Courses to Drop', 'courses'),
+        ('field', 'Remaining Hours', 'remainingHours'),
+        ('field', 'Letter Attached', 'letterAttached'),
+        ('section', 'Academic Certifying Signatures'),
+        ('subsection', 'Academic Advisor'),
+        _approver_box('advisor', 'Academic Advisor'),
+        ('subsection', 'Department Chair'),
+        _approver_box('chair', 'Department Chair'),
+        ('subsection', 'College Dean'),
+        _approver_box('dean', 'College Dean'),
+        ('section', 'Student Authorization'),
+        STUDENT_BOX,
+    ],
+    'withdrawal': [
+        ('title', 'Withdrawal Request Form'),
+        ('section', 'Student Information'),
+        ('field', 'Full Name', 'fullName'),
+        ('field', 'PS ID', 'psId'),
+        ('field', 'College', 'college'),
+        ('field', 'Plan/Degree', 'planDegree'),
+        ('field', 'Address', 'address'),
+        ('field', 'Phone Number', 'phone'),
+        ('section', 'Withdrawal Details'),
+        ('field', 'Term/Year', 'termYear'),
+        ('field', 'Reason for Withdrawal', 'reason'),
+        ('field', 'Last Date Attended', 'lastDateAttended'),
+        ('field', 'Withdrawal Type', 'withdrawalType'),
+        ('section', 'Impact on Student Status'),
+        ('bullets', [
+            ('Financial Assistance', 'financialAssistance'),
+            ('Student Health Insurance', 'studentHealthInsurance'),
+            ('Campus Housing', 'campusHousing'),
+            ('Visa Status', 'visaStatus'),
+            ('G.I. Bill Benefits', 'giBillBenefits'),
+        ]),
+        ('section', 'Courses to Withdraw'),
+        ('text', 'courses'),
+        ('section', 'Additional Comments'),
+        ('text', 'additionalComments'),
+        ('section', 'Student Authorization'),
+        STUDENT_BOX,
+        ('section', 'Approvals'),
+        ('subsection', 'Academic Advisor'),
+        _approver_box('advisor', 'Academic Advisor'),
+        ('subsection', 'Department Chair'),
+        _approver_box('chair', 'Department Chair'),
+        ('subsection', 'College Dean'),
+        _approver_box('dean', 'College Dean'),
+    ],
+    'approval': [
+        ('section', 'Approval Document'),
+        ('field', 'Request ID', 'requestId'),
+        ('field', 'Request Type', 'requestType'),
+        ('field', 'Submitted By', 'requesterName'),
+        ('section', 'Approval History'),
+        ('signature', 'studentSignature', ['Student Signature', 'Date: {studentSignatureDate}']),
+        ('optional_signature', 'advisorSignature',
+         ['Academic Advisor Signature', 'Name: {advisorName}', 'Date: {advisorSignatureDate}']),
+        ('optional_signature', 'chairSignature',
+         ['Department Chair Signature', 'Name: {chairName}', 'Date: {chairSignatureDate}']),
+        ('optional_signature', 'deanSignature',
+         ['College Dean Signature', 'Name: {deanName}', 'Date: {deanSignatureDate}']),
+        ('block', 'Current Approval Note', 'approvalNote'),
+        ('block', 'Current Approval Date', 'date'),
+    ],
+}
+
+def _markup(text):
+    """Escape text for a Paragraph and keep its line breaks."""
+    return escape(str(text if text is not None else "")).replace("\n", "<br/>")
+
+def _field_values(fields):
+    # Missing fields render as empty text, like unfilled LaTeX placeholders
+    return defaultdict(str, {key: "" if value is None else str(value) for key, value in fields.items()})
+
+def _signature_parts(template):
+    return [part for part in REPORTLAB_LAYOUTS[template] if part[0] in ('signature', 'optional_signature')]
+
+# Layouts whose signature blocks never appear or disappear, so every block has a
+# fixed position and can be stamped onto a previously rendered page
+STAMPABLE_TEMPLATES = {
+    template for template, parts in REPORTLAB_LAYOUTS.items()
+    if not any(part[0] == 'optional_signature' for part in parts)
+}
+
+class SignatureBox(Flowable):
+    """
+    A bordered box holding the signature image, a rule and caption lines.
+
+    The box always reserves room for `reserved_lines` more caption lines than it
+    has, so its size does not depend on what is filled in. A `blank` box only
+    draws its border; when a `geometry` dict is given, the box records the page
+    and position it was drawn at under its key so it can be stamped later.
+    """
+    padding = 6
+    image_height = 54
+    rule_gap = 4
+    reserved_lines = 2
+
+    def __init__(self, key, path, lines, width, style, geometry=None, blank=False):
+        super().__init__()
+        self.key = key
+        self.path = path
+        self.lines = lines
+        self.width = width
+        self.style = style
+        self.geometry = geometry
+        self.blank = blank
+        self.hAlign = 'CENTER'
+
+    def caption_height(self):
+        """Height of the caption area, including the reserved lines."""
+        return (len(self.lines) + self.reserved_lines) * self.style.leading
+
+    def wrap(self, availWidth, availHeight):
+        self.height = 2 * self.padding + self.image_height + 2 * self.rule_gap + self.caption_height()
+        return self.width, self.height
+
+    def draw(self):
+        canv = self.canv
+        canv.setLineWidth(0.5)
+        canv.rect(0, 0, self.width, self.height)
+        if not self.blank:
+            self.draw_contents(canv, 0, 0)
+        if self.geometry is not None:
+            x, y = canv.absolutePosition(0, 0)
+            self.geometry[self.key] = {
+                'page': canv.getPageNumber() - 1, 'x': x, 'y': y,
+                'width': self.width, 'height': self.height
+            }
+
+    def draw_contents(self, canv, x, y):
+        """Draw the image, rule and captions inside a box whose lower left corner is (x, y)."""
+        top = y + self.height - self.padding
+        if self.path:
+            try:
+                image_width = 0.4 * self.width
+                canv.drawImage(self.path, x + (self.width - image_width) / 2, top - self.image_height,
+                               image_width, self.image_height, preserveAspectRatio=True, anchor='c', mask='auto')
+            except Exception as e:
+                print(f"Warning: Could not load signature image {self.path}: {e}")
+
+        rule_y = top - self.image_height - self.rule_gap
+        canv.setLineWidth(0.4)
+        canv.line(x + self.width / 2 - 3 * cm, rule_y, x + self.width / 2 + 3 * cm, rule_y)
+
+        cursor = rule_y - self.rule_gap
+        text_width = self.width - 2 * self.padding
+        for line in self.lines:
+            paragraph = Paragraph(_markup(line), self.style)
+            _, height = paragraph.wrap(text_width, self.height)
+            cursor -= height
+            paragraph.drawOn(canv, x + self.padding, cursor)
+
+    def fits(self):
+        """Whether the captions fit in the reserved caption area."""
+        text_width = self.width - 2 * self.padding
+        used = sum(Paragraph(_markup(line), self.style).wrap(text_width, self.height)[1] for line in self.lines)
+        return used <= self.caption_height()
+
+def _add_indirect(writer, obj):
+    """
+    Add obj to the writer as an indirect object and return a reference to it.
+
+    PyPDF2 3.0.x only offers this through the private PdfWriter._add_object,
+    so requirements.txt pins PyPDF2 and scripts/check_pdf_stamping fails if an
+    upgrade changes it. Without it stamping fails and documents are rendered
+    in full.
+    """
+    add_object = getattr(writer, "_add_object", None)
+    if add_object is None:
+        raise RuntimeError(f"PyPDF2 {PyPDF2.__version__} cannot add objects to a PdfWriter")
+    return add_object(obj)
+
+class ReportLabRenderer:
+    """Draw the document in-process with ReportLab, without spawning pdflatex."""
+    name = 'reportlab'
+
+    page_size = letter
+    margin = inch
+
+    def __init__(self):
+        styles = getSampleStyleSheet()
+        self.styles = {
+            'title': styles['Title'],
+            'section': styles['Heading2'],
+            'subsection': styles['Heading3'],
+            'body': styles['BodyText'],
+            'caption': ParagraphStyle('SignatureCaption', parent=styles['Normal'], alignment=TA_CENTER),
+        }
+
+    @property
+    def box_width(self):
+        return 0.8 * (self.page_size[0] - 2 * self.margin)
+
+    def signature_box(self, part, fields, signatures, geometry=None, blank=False):
+        """The SignatureBox for a ('signature', key, lines) layout part."""
+        key, lines = part[1], part[2]
+        return SignatureBox(key, signatures.get(key), [line.format_map(fields) for line in lines],
+                            self.box_width, self.styles['caption'], geometry, blank)
+
+    def build_story(self, template, fields, signatures, geometry=None, blank_boxes=False):
+        """
+        Turn a layout into a list of ReportLab flowables. With blank_boxes the
+        signature boxes are drawn empty and their positions go into geometry.
+        """
+        fields = _field_values(fields)
+        body = self.styles['body']
+        story = []
+
+        for part in REPORTLAB_LAYOUTS[template]:
+            kind = part[0]
+            if kind in ('title', 'section', 'subsection'):
+                story.append(Paragraph(_markup(part[1]), self.styles[kind]))
+            elif kind == 'field':
+                story.append(Paragraph(f"<b>{_markup(part[1])}:</b> {_markup(fields[part[2]])}", body))
+            elif kind == 'block':
+                story.append(Paragraph(f"<b>{_markup(part[1])}:</b>", body))
+                story.append(Paragraph(_markup(fields[part[2]]), body))
+            elif kind == 'text':
+                story.append(Paragraph(_markup(fields[part[1]]), body))
+            elif kind == 'bullets':
+                items = [
+                    ListItem(Paragraph(f"<b>{_markup(label)}:</b> {_markup(fields[key])}", body))
+                    for label, key in part[1]
+                ]
+                story.append(ListFlowable(items, bulletType='bullet', leftIndent=12))
+            elif kind in ('signature', 'optional_signature'):
+                if kind == 'optional_signature' and not signatures.get(part[1]):
+                    continue
+                story.append(Spacer(1, 6))
+                story.append(self.signature_box(part, fields, signatures, geometry, blank_boxes))
+                story.append(Spacer(1, 6))
+        return story
+
+    def _write_pdf(self, final_pdf_path, write):
+        """Call write(tmp_path) and move the result into place atomically."""
+        target_dir = os.path.dirname(final_pdf_path)
+        os.makedirs(target_dir, exist_ok=True)
+        # Write to a temporary file first so readers never see a partial PDF
+        fd, tmp_path = tempfile.mkstemp(prefix=".render_", suffix=".pdf", dir=target_dir)
+        os.close(fd)
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, final_pdf_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _build(self, pdf_path, template, fields, signatures, geometry=None, blank_boxes=False):
+        def write(tmp_path):
+            doc = SimpleDocTemplate(tmp_path, pagesize=self.page_size,
+                                    leftMargin=self.margin, rightMargin=self.margin,
+                                    topMargin=self.margin, bottomMargin=self.margin)
+            doc.build(self.build_story(template, fields, signatures, geometry, blank_boxes))
+        self._write_pdf(pdf_path, write)
+
+    def render(self, pdf_dir, template, fields, signatures, output_filename, label="PDF", cache_key=None):
+        if template not in REPORTLAB_LAYOUTS:
+            return None, f"No ReportLab layout for {label}."
+
+        final_pdf_path = os.path.join(pdf_dir, output_filename)
+        if cache_key and render_cache.restore(cache_key, final_pdf_path):
+            return final_pdf_path, None
+
+        try:
+            self._build(final_pdf_path, template, fields, signatures)
+        except Exception as e:
+            return None, f"ReportLab rendering failed for {label}: {e}"
+
+        render_cache.store(cache_key, final_pdf_path)
+        return final_pdf_path, None
+
+    # ----------------------------------------------------------------
+    # Incremental stamping
+    # ----------------------------------------------------------------
+
+    def base_document(self, base_dir, base_key, template, base_fields, base_signatures):
+        """
+        Return (base_pdf_path, geometry) for the base document, rendering it the
+        first time. The base document holds the form with every signature box
+        left empty. The geometry maps each box's key to the page and rectangle
+        it occupies and is kept next to the PDF.
+        """
+        base_pdf_path = os.path.join(base_dir, f"{base_key}.pdf")
+        geometry_path = os.path.join(base_dir, f"{base_key}.json")
+        if os.path.exists(base_pdf_path) and os.path.exists(geometry_path):
+            with open(geometry_path, "r", encoding="utf-8") as f:
+                geometry = json.load(f)
+            # Mark as recently used for evict_base_documents
+            os.utime(base_pdf_path)
+            return base_pdf_path, geometry
+
+        geometry = {}
+        self._build(base_pdf_path, template, base_fields, base_signatures, geometry, blank_boxes=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".geometry_", suffix=".json", dir=base_dir)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(geometry, f)
+        os.replace(tmp_path, geometry_path)
+        return base_pdf_path, geometry
+
+    @staticmethod
+    def _attach_overlay(writer, page, overlay_page, name):
+        """
+        Draw overlay_page on top of page by adding it as a Form XObject.
+
+        Unlike PdfPage.merge_page this never parses either content stream: the
+        page's existing content is wrapped in q/Q and a stream invoking the
+        overlay is appended.
+        """
+        form = overlay_page['/Contents'].get_object().clone(writer)
+        form[NameObject('/Type')] = NameObject('/XObject')
+        form[NameObject('/Subtype')] = NameObject('/Form')
+        form[NameObject('/BBox')] = overlay_page.mediabox
+        form[NameObject('/Resources')] = overlay_page['/Resources'].clone(writer)
+
+        resources = page['/Resources'].get_object()
+        if '/XObject' not in resources:
+            resources[NameObject('/XObject')] = DictionaryObject()
+        resources['/XObject'].get_object()[NameObject(name)] = _add_indirect(writer, form)
+
+        before = DecodedStreamObject()
+        before.set_data(b"q\n")
+        after = DecodedStreamObject()
+        after.set_data(f"\nQ\nq {name} Do Q\n".encode("ascii"))
+        contents = page['/Contents'].get_object()
+        streams = list(contents) if isinstance(contents, ArrayObject) else [page.raw_get('/Contents')]
+        page[NameObject('/Contents')] = ArrayObject(
+            [_add_indirect(writer, before)] + streams + [_add_indirect(writer, after)]
+        )
+
+    def stamp(self, base_pdf_path, geometry, boxes, output_path):
+        """
+        Overlay signature boxes onto a copy of the base document.
+
+        Each box's contents are drawn at the position recorded in `geometry` on
+        an overlay page, which is then laid over the matching base page.
+        """
+        overlay_buffer = io.BytesIO()
+        overlay = canvas.Canvas(overlay_buffer, pagesize=self.page_size)
+        pages = sorted({geometry[box.key]['page'] for box in boxes})
+        for page in range(pages[-1] + 1 if pages else 0):
+            for box in boxes:
+                rect = geometry[box.key]
+                if rect['page'] != page:
+                    continue
+                box.wrap(rect['width'], rect['height'])
+                box.draw_contents(overlay, rect['x'], rect['y'])
+            overlay.showPage()
+        overlay.save()
+
+        overlay_pages = PdfReader(io.BytesIO(overlay_buffer.getvalue())).pages
+        writer = PdfWriter()
+        for index, base_page in enumerate(PdfReader(base_pdf_path).pages):
+            page = writer.add_page(base_page)
+            if index in pages:
+                self._attach_overlay(writer, page, overlay_pages[index], f"/BancroffStamp{index}")
+
+        def write(tmp_path):
+            with open(tmp_path, "wb") as f:
+                writer.write(f)
+        self._write_pdf(output_path, write)
+
+    def render_stamped(self, pdf_dir, base_dir, template, fields, signatures, output_filename, base,
+                       label="PDF", cache_key=None):
+        """
+        Render by stamping onto the base document.
+
+        `base` is (base_key, base_fields, base_signatures) describing the document
+        before any approvals; only its non-signature fields appear in the base
+        PDF. Every signature box is stamped, so a document costs one overlay
+        per page holding a box. Falls back to a full render if a box does not fit or stamping fails.
+        """
+        final_pdf_path = os.path.join(pdf_dir, output_filename)
+        if cache_key and render_cache.restore(cache_key, final_pdf_path):
+            return final_pdf_path, None
+
+        base_key, base_fields, base_signatures = base
+        try:
+            base_pdf_path, geometry = self.base_document(base_dir, base_key, template, base_fields, base_signatures)
+
+            fields = _field_values(fields)
+            boxes = []
+            for part in _signature_parts(template):
+                box = self.signature_box(part, fields, signatures)
+                if part[1] not in geometry or not box.fits():
+                    return self.render(pdf_dir, template, fields, signatures, output_filename, label, cache_key)
+                boxes.append(box)
+
+            self.stamp(base_pdf_path, geometry, boxes, final_pdf_path)
+        except Exception as e:
+            print(f"Warning: Stamping {label} failed, rendering it in full: {e}")
+            return self.render(pdf_dir, template, fields, signatures, output_filename, label, cache_key)
+
+        render_cache.store(cache_key, final_pdf_path)
+        return final_pdf_path, None
+
+RENDERERS = {
+    LatexRenderer.name: LatexRenderer(),
+    ReportLabRenderer.name: ReportLabRenderer(),
+}
+
+def renderer_name_for(request_type_name):
+    """Name of the renderer configured for a request type (falls back to 'default')."""
+    configured = current_app.config.get('PDF_RENDERERS', {})
+    return configured.get(request_type_name, configured.get('default', LatexRenderer.name))
+
+def stamping_renderer(request_type_name, template):
+    """
+    The renderer to stamp documents of this type with, or None when incremental
+    stamping is disabled or not possible (LaTeX output, variable layouts).
+    """
+    if not current_app.config.get('PDF_INCREMENTAL_STAMPING') or template not in STAMPABLE_TEMPLATES:
+        return None
+    renderer = RENDERERS.get(renderer_name_for(request_type_name))
+    return renderer if hasattr(renderer, 'render_stamped') else None
+
+def evict_base_documents(base_dir, max_bytes):
+    """
+    Remove the least recently used base documents, with their geometry, until
+    the base documents in base_dir take at most max_bytes.
+    """
+    if not os.path.isdir(base_dir):
+        return
+    entries = []
+    for entry in os.scandir(base_dir):
+        if entry.name.endswith(".pdf") and entry.is_file():
+            stat = entry.stat()
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        for stale_path in (path, path[:-len(".pdf")] + ".json"):
+            try:
+                os.remove(stale_path)
+            except OSError:
+                pass
+        total -= size
+
+def prepare_base_document(request_type_name, template, base):
+    """
+    Render the unsigned base document ahead of the first approval.
+    Returns an error message, or None when it is ready or not needed.
+    """
+    renderer = stamping_renderer(request_type_name, template)
+    if renderer is None:
+        return None
+    base_key, base_fields, base_signatures = base
+    try:
+        renderer.base_document(current_app.config['PDF_BASE_DIR'], base_key, template, base_fields, base_signatures)
+    except Exception as e:
+        return f"Could not render base document: {e}"
+    evict_base_documents(current_app.config['PDF_BASE_DIR'], current_app.config['PDF_BASE_MAX_BYTES'])
+    return None
+
+def render_document(request_type_name, pdf_dir, template, fields, signatures, output_filename,
+                    label="PDF", cache_key=None, base=None):
+    """
+    Render a document with the renderer configured for its request type.
+
+    When `base` (base_key, base_fields, base_signatures) is given and incremental
+    stamping applies, the approver blocks are stamped onto the base document
+    instead of rendering the whole document again.
+    Returns (final_pdf_path, error_message).
+    """
+    if base:
+        renderer = stamping_renderer(request_type_name, template)
+        if renderer is not None:
+            result = renderer.render_stamped(pdf_dir, current_app.config['PDF_BASE_DIR'], template, fields,
+                                             signatures, output_filename, base, label=label, cache_key=cache_key)
+            # Stamping renders the base document itself if it was never prepared or has been evicted
+            evict_base_documents(current_app.config['PDF_BASE_DIR'], current_app.config['PDF_BASE_MAX_BYTES'])
+            return result
+
+    name = renderer_name_for(request_type_name)
+    renderer = RENDERERS.get(name)
+    if renderer is None:
+        return None, f"Unknown PDF renderer '{name}' configured for {request_type_name}."
+    return renderer.render(pdf_dir, template, fields, signatures, output_filename,
+                           label=label, cache_key=cache_key)
@@ -1,9 +1,12 @@
-from flask import Blueprint, request, send_file, flash, redirect, url_for, render_template, current_app, send_from_directory
-import os
-from datetime import datetime
-from models import db, RequestApproval
-import subprocess
-import shutil
+from flask import (Blueprint, request, send_file, flash, redirect, url_for, render_template, current_app, jsonify,
+                   session, abort)
+from models import db, RequestApproval, ApprovalStep, RenderJob
+from utils.render_queue import ACTIVE_STATUSES, enqueue_render, get_active_job
+from utils import render_cache
+from utils.document_store import document_exists, send_document
+from utils.document_registry import latest_request_document
+from utils.auth_helpers import active_required, get_current_user, can_view_request
+from routes.approvals import request_render_key
 
 pdf_bp = Blueprint('pdf', __name__)
 
@@ -11,152 +14,101 @@ def setup_pdf_routes(app):
     """Register all PDF-related routes with the Flask application"""
     app.register_blueprint(pdf_bp)
 
+def _require_request_access(request_obj):
+    """Abort with 403 unless the signed-in user may see this request's documents."""
+    current_user = get_current_user()
+    if not current_user or not can_view_request(current_user, request_obj):
+        abort(403)
+
+@pdf_bp.route('/render_jobs/<int:job_id>', methods=['GET'])
+@active_required
+def render_job_status(job_id):
+    """Return the status of a PDF render job for the polling UI."""
+    if not session.get("user"):
+        return jsonify({'error': 'Sign in to see render jobs'}), 401
+    job = RenderJob.query.get_or_404(job_id)
+    _require_request_access(job.request)
+    return jsonify(job.to_dict())
+
 @pdf_bp.route('/generate_pdf/<int:approval_id>', methods=['GET'])
+@active_required
 def generate_pdf_route(approval_id):
     """
-    Generate and download a PDF for the specified approval ID.
-    Always generates a fresh PDF with the latest data.
+    Serve the PDF for the specified approval ID.
+    Rendering happens on the background render queue: if the stored PDF is
+    missing, or ?refresh=1 is given, the render cache is checked first and a
+    render job is only queued on a miss. A status page polls the job until the
+    document is ready. If the recorded document has gone missing, the newest
+    registered document of the same request is served instead.
     
     Args:
         approval_id (int): The ID of the approval record
     
     Returns:
-        PDF file attachment or redirect with flash message
+        PDF file, render status page, or redirect with flash message
     """
+    if not session.get("user"):
+        return redirect(url_for("login"))
+    approval = RequestApproval.query.get_or_404(approval_id)
+    request_obj = approval.request
+    # Only the requester, the request's approvers and those who may view all requests get its documents
+    _require_request_access(request_obj)
+
     try:
-        approval = RequestApproval.query.get_or_404(approval_id)
-        request_obj = approval.request
-        requester = request_obj.requester
+        job = get_active_job(request_obj.id)
+        # RCL and Withdrawal PDFs cover the whole request; other types are per approval
+        pdf_filename = request_obj.final_document_path or approval.pdf_path
+        stored = document_exists(pdf_filename)
 
-        # Determine which PDF generation function to use based on request type
-        request_type = request_obj.request_type.name.lower()
-        current_app.logger.info(f"Generating PDF for {request_type} request ID {request_obj.id}")
-        
-        # Import the specialized PDF generation functions
-        from routes.approvals import generate_rcl_pdf, generate_withdrawal_pdf, generate_pdf_for_approval
-        
-        # Generate the appropriate PDF based on request type
-        if request_type == 'rcl':
-            current_app.logger.info(f"Calling generate_rcl_pdf for request {request_obj.id}")
-            pdf_filename, error = generate_rcl_pdf(request_obj.id)
-        elif request_type == 'withdrawal':
-            current_app.logger.info(f"Calling generate_withdrawal_pdf for request {request_obj.id}")
-            pdf_filename, error = generate_withdrawal_pdf(request_obj.id)
-        else:
-            # Fallback to generic approval PDF
-            current_app.logger.info(f"Calling generate_pdf_for_approval for approval {approval_id}")
-            pdf_path, error = generate_pdf_for_approval(approval_id)
-            if not error:
-                pdf_filename = os.path.basename(pdf_path)
-            else:
-                pdf_filename = None
+        if job is None and (request.args.get('refresh') or not stored):
+            # Serve straight from the render cache when nothing has changed
+            approvals = RequestApproval.query.join(ApprovalStep).filter(
+                RequestApproval.request_id == request_obj.id
+            ).order_by(ApprovalStep.step_order).all()
+            cached_pdf = render_cache.lookup(request_render_key(request_obj, approvals, approval))
+            if cached_pdf:
+                return send_file(cached_pdf, mimetype='application/pdf', conditional=True)
+
+            current_app.logger.info(f"Queueing PDF render for request ID {request_obj.id}")
+            job = enqueue_render(request_obj.id, approval.id)
 
-        if error or not pdf_filename:
-            current_app.logger.error(f"PDF generation failed for approval {approval_id}: {error}")
-            flash(f"PDF generation failed: {error}", "danger")
-            return redirect(url_for("pending_approvals"))
+        if job is not None:
+            if job.status in ACTIVE_STATUSES:
+                return render_template('render_status.html', job=job, approval=approval)
+            if job.status == 'failed':
+                current_app.logger.error(f"PDF generation failed for approval {approval_id}: {job.last_error}")
+                flash(f"PDF generation failed: {job.last_error}", "danger")
+                return redirect(url_for("pending_approvals"))
+            pdf_filename = job.pdf_filename
 
         # Refresh approval object to get the latest pdf_path after generation
         db.session.refresh(approval)
         
-        # Check both approval.pdf_path and pdf_filename to find the correct file
-        target_filename = approval.pdf_path or pdf_filename
-        current_app.logger.info(f"Using target filename: {target_filename}")
+        # Check both pdf_filename and approval.pdf_path to find the stored document
+        document_key = pdf_filename or approval.pdf_path
+        current_app.logger.info(f"Using stored document: {document_key}")
         
-        # Ensure static PDF directory exists
-        static_pdf_dir = os.path.join(current_app.root_path, 'static', 'pdfs')
-        os.makedirs(static_pdf_dir, exist_ok=True)
-
-        # Copy the generated PDF from the pdf directory to static directory
-        pdf_dir = os.path.join(current_app.root_path, "pdf")
-        source_pdf = os.path.join(pdf_dir, target_filename)
-        current_app.logger.info(f"Looking for PDF at: {source_pdf}")
-        
-        if not os.path.exists(source_pdf):
-            current_app.logger.error(f"Generated PDF not found at {source_pdf}")
-            
-            # Look for the file in different locations
-            pdf_files = [f for f in os.listdir(pdf_dir) if f.endswith('.pdf')]
-            current_app.logger.info(f"Available PDFs in directory: {pdf_files}")
+        if not document_exists(document_key):
+            current_app.logger.error(f"Stored PDF not found: {document_key}")
             
-            if pdf_files:
-                # Use the most recently created PDF as a fallback
-                pdf_files.sort(key=lambda x: os.path.getmtime(os.path.join(pdf_dir, x)), reverse=True)
-                target_filename = pdf_files[0]
-                source_pdf = os.path.join(pdf_dir, target_filename)
-                current_app.logger.info(f"Using most recent PDF instead: {target_filename}")
-            else:
+            # Fall back to the newest registered document of this request
+            record = latest_request_document(request_obj.id)
+            if record is None:
                 flash(f"Generated PDF not found. Please try again.", "danger")
                 return redirect(url_for("pending_approvals"))
-            
-        static_pdf_path = os.path.join(static_pdf_dir, target_filename)
-        shutil.copy2(source_pdf, static_pdf_path)
-        current_app.logger.info(f"Copied PDF to: {static_pdf_path}")
+            document_key = record.storage_key
+            current_app.logger.info(f"Using most recent document of the request instead: {document_key}")
         
         # Ensure the approval record has the correct path
-        if approval.pdf_path != target_filename:
-            approval.pdf_path = target_filename
+        if approval.pdf_path != document_key:
+            approval.pdf_path = document_key
             db.session.commit()
-            current_app.logger.info(f"Updated approval record with path: {target_filename}")
+            current_app.logger.info(f"Updated approval record with path: {document_key}")
         
-        # Return the PDF file directly
-        return send_from_directory(
-            static_pdf_dir,
-            target_filename,
-            as_attachment=False,
-            mimetype='application/pdf'
-        )
+        # Stream the PDF from the document store (supports Range requests)
+        return send_document(document_key)
         
     except Exception as e:
         current_app.logger.error(f"Error in generate_pdf_route for approval {approval_id}: {str(e)}")
         flash(f"Error serving PDF: {str(e)}", "danger")
         return redirect(url_for("pending_approvals"))
-
-def _generate_pdf_for_approval(approval_id, request_type, full_name, signature_path, comments):
-    """
-    Internal function to handle PDF generation logic
-    
-    Returns:
-        tuple: (pdf_path, error_message)
-    """
-    try:
-        # Process name components
-        names = full_name.split(None, 1)
-        first_name = names[0]
-        last_name = names[1] if len(names) > 1 else ""
-        current_date = datetime.now().strftime("%Y-%m-%d")
-
-        # Set up file paths
-        pdf_dir = os.path.join(current_app.root_path, "pdf")
-        template_file = os.path.join(pdf_dir, f"{request_type}_template.tex")
-        tex_output = os.path.join(pdf_dir, "document.tex")
-        final_pdf = os.path.join(pdf_dir, f"approval_{approval_id}_{int(datetime.now().timestamp())}.pdf")
-
-        # Read and process template
-        with open(template_file, "r", encoding="utf-8") as f:
-            tex = f.read() \
-                .replace("{{firstName}}", first_name) \
-                .replace("{{lastName}}", last_name) \
-                .replace("{{approvalNote}}", comments) \
-                .replace("{{date}}", current_date) \
-                .replace("{{signatureFilename}}", signature_path)
-
-        # Write processed template
-        with open(tex_output, "w", encoding="utf-8") as f:
-            f.write(tex)
-
-        # Generate PDF
-        subprocess.run(["make"], cwd=pdf_dir, check=True)
-        
-        # Verify and rename output
-        pdf_file = os.path.join(pdf_dir, "document.pdf")
-        if not os.path.exists(pdf_file):
-            return None, "PDF was not created."
-
-        os.rename(pdf_file, final_pdf)
-
-        return final_pdf, None
-
-    except Exception as e:
-        current_app.logger.error(f"PDF generation failed: {str(e)}")
-        return None, str(e)
@@ -1,11 +1,13 @@
 from flask import render_template, redirect, url_for, flash, session, request
 from models import db, User, Role, UserSignature
 from forms import UserForm
-from utils.auth_helpers import admin_required, active_required, management_access_required
+from utils.rbac import invalidate_permissions
+from utils.workflow_registry import invalidate_workflows
+from utils.signatures import save_signature, SignatureError
+from utils.auth_helpers import (admin_required, active_required, management_access_required, get_current_user,
+                                invalidate_user_cache)
 from forms.user_forms import SignatureUploadForm
 import config
-from werkzeug.utils import secure_filename
-import os
 def setup_user_routes(app):
     @app.route('/users')
     @management_access_required
@@ -52,6 +54,8 @@ def setup_user_routes(app):
                     new_role = Role(name=role_name)
                     db.session.add(new_role)
                     db.session.commit()
+                    invalidate_permissions()
+                    invalidate_workflows()
                     flash(f'Role {role_name} created successfully', 'success')
                 return redirect(url_for('manage_roles'))
                 
@@ -95,8 +99,7 @@ def setup_user_routes(app):
         if user:
             if form.validate_on_submit():
                 try:
-                    current_user_email = session['user'].get('preferred_username').lower()
-                    current_user = User.query.filter_by(email=current_user_email).first() 
+                    current_user = get_current_user()
                     user.full_name = form.name.data
                     user.email = form.email.data
                     user.role = Role.query.filter_by(name=form.role.data).first()
@@ -107,6 +110,7 @@ def setup_user_routes(app):
                     else:
                         user.status = form.status.data
                     db.session.commit()
+                    invalidate_user_cache(user_id)
                     flash('User updated successfully!', 'success')
                     return redirect(url_for('user_list'))
                 except Exception as e:
@@ -131,13 +135,13 @@ def setup_user_routes(app):
         try:
             user = User.query.get(user_id)
             if user:
-                current_user_email = session['user'].get('preferred_username').lower()
-                current_user = User.query.filter_by(email=current_user_email).first()
+                current_user = get_current_user()
                 if current_user and current_user.id == user_id:
                     flash('You cannot delete your own account!', 'danger')
                 else:
                     db.session.delete(user)
                     db.session.commit()
+                    invalidate_user_cache(user_id)
                     flash('User deleted successfully!', 'success')
             else:
                 flash('User not found!', 'danger')
@@ -154,14 +158,14 @@ def setup_user_routes(app):
         try:
             user = User.query.get(user_id)
             if user:
-                current_user_email = session['user'].get('preferred_username').lower()
-                current_user = User.query.filter_by(email=current_user_email).first()
+                current_user = get_current_user()
                 
                 if current_user and current_user.id == user_id:
                     flash('You cannot deactivate your own account!', 'danger')
                 else:
                     user.status = 'deactivated'
                     db.session.commit()
+                    invalidate_user_cache(user_id)
                     flash('User deactivated successfully!', 'success')
             else:
                 flash('User not found!', 'danger')
@@ -180,6 +184,7 @@ def setup_user_routes(app):
             if user:
                 user.status = 'active'
                 db.session.commit()
+                invalidate_user_cache(user_id)
                 flash('User reactivated successfully!', 'success')
             else:
                 flash('User not found!', 'danger')
@@ -193,8 +198,7 @@ def setup_user_routes(app):
         if not session.get("user"):
             return redirect(url_for("login"))
             
-        user_email = session['user'].get('preferred_username').lower()
-        current_user = User.query.filter_by(email=user_email).first()
+        current_user = get_current_user()
         
         if not current_user:
             flash('User not found. Please log in again.', 'danger')
@@ -207,33 +211,32 @@ def setup_user_routes(app):
         form = SignatureUploadForm()
         
         if form.validate_on_submit():
-            filename = secure_filename(form.signature.data.filename)
-            
-            # Create unique filename with user ID and timestamp
-            import time 
-            file_ext = filename.rsplit('.', 1)[1].lower()
-            unique_filename = f"signature_{current_user.id}_{int(time.time())}.{file_ext}"
-            
-            # Save the file
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-            form.signature.data.save(file_path)
+            # Trim, scale down and recompress the image, stored once under its content hash
+            try:
+                signature_path, sha256 = save_signature(form.signature.data.stream, app.config['UPLOAD_FOLDER'])
+            except SignatureError as e:
+                flash(str(e), 'danger')
+                return render_template('upload_signature.html', form=form, active_signature=active_signature)
             
             # Deactivate all previous signatures
-            for sig in current_user.signatures:
+            user = User.query.get(current_user.id)
+            for sig in user.signatures:
                 sig.is_active = False
             
             # Create new signature record
             new_signature = UserSignature(
                 user_id=current_user.id,
-                signature_image_path=unique_filename,
+                signature_image_path=signature_path,
+                sha256=sha256,
                 is_active=True
             )
             
             # Update user's primary signature path
-            current_user.signature_path = unique_filename
+            user.signature_path = signature_path
             
             db.session.add(new_signature)
             db.session.commit()
+            invalidate_user_cache(user.id)
             
             flash('Signature uploaded successfully!', 'success')
             return redirect(url_for('index'))
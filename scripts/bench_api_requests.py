@@ -0,0 +1,89 @@
+"""
+Compare reading requests through the JSON API with scraping the dashboards.
+
+Seeds --size requests (RCL and Withdrawal, at random points of their
+workflow) into a fresh SQLite database, or the database given with
+--database-url (emptied first), all submitted by one student. Then reads
+every request three ways: page by page through pending_approvals.html as an
+admin and my_requests.html as the student (REQUESTS_PER_PAGE rows a page, as
+screen-scrapers do), and as --page-size row pages of /api/requests and
+/api/approvals, with and without gzip. Prints the time and bytes each needs
+for all the requests.
+Run from the repository root:
+python -m scripts.bench_api_requests --size 10000
+python -m scripts.bench_api_requests --database-url postgresql://localhost/bancroff_bench
+"""
+import argparse
+import time
+
+from scripts.bench_pending_approvals import (bench_database, create_bench_app, login, remove_bench_database,
+                                             seed_requests)
+
+def read_html(client, url, pages):
+    """Fetch pages 1..pages of a dashboard; returns (seconds, bytes)."""
+    start, size = time.perf_counter(), 0
+    for page in range(1, pages + 1):
+        response = client.get(f"{url}?page={page}")
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} page {page} returned {response.status_code}")
+        size += len(response.data)
+    return time.perf_counter() - start, size
+
+def read_api(client, url, gzip_encoding=False):
+    """Follow the Link headers of an API list from its first page; returns (seconds, bytes, rows)."""
+    headers = {'Accept-Encoding': 'gzip'} if gzip_encoding else {}
+    start, size, rows = time.perf_counter(), 0, 0
+    while url:
+        response = client.get(url, headers=headers)
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} returned {response.status_code}")
+        size += len(response.data)
+        if not gzip_encoding:
+            rows += len(response.json)
+        link = response.headers.get('Link')
+        url = link.split(';')[0].strip('<>') if link else None
+    return time.perf_counter() - start, size, rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=10000, help="Requests to seed")
+    parser.add_argument("--page-size", type=int, default=10000, help="Rows per API page")
+    parser.add_argument("--database-url", help="Benchmark this database instead of SQLite (its tables are dropped)")
+    args = parser.parse_args()
+
+    database = bench_database(args.database_url, "bancroff_bench_")
+    app = create_bench_app(database)
+    with app.app_context():
+        from models import db, User, Role, Request
+        admin_email = seed_requests(args.size, type_names=('RCL', 'Withdrawal'))
+        student = User(email='bench.student@example.com', full_name='Bench Student', status='active',
+                       role_id=Role.query.filter_by(name='basic_user').first().id)
+        db.session.add(student)
+        db.session.commit()
+        db.session.execute(db.update(Request).values(requester_id=student.id))
+        db.session.commit()
+    pages = -(-args.size // app.config['REQUESTS_PER_PAGE'])
+    admin, student = app.test_client(), app.test_client()
+    login(admin, admin_email)
+    login(student, 'bench.student@example.com')
+
+    print(f"{args.size} requests")
+    for label, (seconds, size) in [
+            (f"pending_approvals.html, {pages} pages", read_html(admin, '/pending_approvals', pages)),
+            (f"my_requests.html, {pages} pages", read_html(student, '/my_requests', pages))]:
+        print(f"  {label:<44} {seconds * 1000:9.1f} ms  {size / 2**20:7.2f} MiB")
+    for label, client, url in [
+            ("/api/requests (admin)", admin, f"/api/requests?limit={args.page_size}"),
+            ("/api/requests (student)", student, f"/api/requests?limit={args.page_size}"),
+            ("/api/approvals?current=1", admin, f"/api/approvals?current=1&limit={args.page_size}")]:
+        seconds, size, rows = read_api(client, url)
+        gzip_seconds, gzip_size, _ = read_api(client, url, gzip_encoding=True)
+        print(f"  {label:<44} {seconds * 1000:9.1f} ms  {size / 2**20:7.2f} MiB  {rows} rows")
+        print(f"  {label + ', gzip':<44} {gzip_seconds * 1000:9.1f} ms  {gzip_size / 2**20:7.2f} MiB")
+    with app.app_context():
+        from models import db
+        db.engine.dispose()
+    remove_bench_database(database)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Measure the memory and time /api/users takes as the users table grows.
+
+Each size is seeded into a fresh SQLite database (or the database given with
+--database-url, emptied first), then the whole table is exported three ways:
+loading every User object into one JSON list (what the endpoint used to do),
+streaming NDJSON, and following the Link headers of JSON pages. Peak Python
+memory is traced while each export is read, and a poll that sends back the
+ETag of the last response is timed. Streamed exports should peak at the same
+memory for every size.
+Run from the repository root:
+python -m scripts.bench_api_users --sizes 1000 100000 1000000
+"""
+import argparse
+import time
+import tracemalloc
+
+from flask import jsonify
+from scripts.bench_pending_approvals import bench_database, create_bench_app, remove_bench_database, login
+
+def seed_users(count, batch_size=10000):
+    """Add `count` users in bulk, plus an admin to list them. Returns the admin's email."""
+    from models import db, User, Role
+    from utils.table_versions import bump_table_version
+    admin = User(email='bench.admin@example.com', full_name='Bench Admin', status='active',
+                 role_id=Role.query.filter_by(name='admin').first().id)
+    db.session.add(admin)
+    db.session.commit()
+    role_id = Role.query.filter_by(name='basic_user').first().id
+    for start in range(0, count, batch_size):
+        db.session.execute(db.insert(User), [
+            {'email': f"bench.user{i}@example.com", 'full_name': f"Bench User {i}", 'status': 'active',
+             'role_id': role_id}
+            for i in range(start, min(start + batch_size, count))])
+        # Bulk inserts bypass the ORM, so the version is moved on by hand
+        bump_table_version(db.session.connection(), 'users')
+        db.session.commit()
+    return admin.email
+
+def load_all(app, client):
+    """The endpoint as it was: every User object, one list, one JSON document."""
+    from models import User
+    with app.test_request_context():
+        users = User.query.all()
+        response = jsonify([{'id': u.id, 'name': u.full_name, 'email': u.email} for u in users])
+        return len(response.get_data()), None
+
+def stream_ndjson(app, client):
+    response = client.get('/api/users?format=ndjson', buffered=False)
+    size = sum(len(chunk) for chunk in response.response)
+    response.close()
+    return size, response.headers['ETag']
+
+def follow_pages(app, client):
+    url, size = '/api/users?limit=1000', 0
+    while url:
+        response = client.get(url)
+        size += len(response.data)
+        link = response.headers.get('Link')
+        url = link.split(';')[0].strip('<>') if link else None
+    return size, None
+
+def measure(export, app, client):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size, etag = export(app, client)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, size, etag
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000], help="Users to seed")
+    parser.add_argument("--repeat", type=int, default=100, help="Conditional requests timed")
+    parser.add_argument("--database-url", help="Benchmark this database instead of SQLite (its tables are dropped)")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        database = bench_database(args.database_url, "bancroff_bench_")
+        app = create_bench_app(database)
+        with app.app_context():
+            email = seed_users(size)
+        client = app.test_client()
+        login(client, email)
+        print(f"{size} users")
+        etag = None
+        for label, export in [("load all (before)", load_all), ("NDJSON stream", stream_ndjson),
+                              ("JSON pages of 1000", follow_pages)]:
+            elapsed, peak, length, export_etag = measure(export, app, client)
+            etag = export_etag or etag
+            print(f"  {label:<20} {elapsed * 1000:9.1f} ms  {peak / 2**20:8.2f} MiB peak  {length / 2**20:7.1f} MiB sent")
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            response = client.get('/api/users?format=ndjson', headers={'If-None-Match': etag})
+            if response.status_code != 304:
+                raise RuntimeError(f"Unchanged users returned {response.status_code}")
+        print(f"  {'304 Not Modified':<20} {(time.perf_counter() - start) / args.repeat * 1000:9.2f} ms")
+        with app.app_context():
+            from models import db
+            db.engine.dispose()
+        remove_bench_database(database)
+
+if __name__ == "__main__":
+    main()
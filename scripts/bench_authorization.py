@@ -0,0 +1,79 @@
+"""
+Measure the per-request cost of authorizing a signed-in user.
+
+Times, in a request context, three ways of deciding whether the user may open
+an approver page: looking the user up by email and comparing their role name
+(what views used to do), resolving them with get_current_user() when the user
+cache is cold, and the usual case of a warm cache, where the check is a subset
+test against the role's cached permission set. Prints microseconds and
+queries per request; the first line is the cost of the request context alone.
+Run from the repository root:
+python -m scripts.bench_authorization --iterations 2000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from flask import g, session
+from sqlalchemy import event
+from scripts.bench_pending_approvals import create_bench_app, seed_requests
+
+def no_check(email):
+    return True
+
+def email_lookup(email):
+    from models import User
+    user = User.query.filter_by(email=email).first()
+    return user is not None and user.role.name.lower() in ['admin', 'advisor', 'chair', 'dean']
+
+def cold_cache(email):
+    from flask import current_app
+    from utils.auth_helpers import get_current_user
+    current_app.extensions.get('current_user_cache', {}).clear()
+    user = get_current_user()
+    return user is not None and frozenset(['approve_requests']) <= user.permissions
+
+def warm_cache(email):
+    from utils.auth_helpers import get_current_user
+    user = get_current_user()
+    return user is not None and frozenset(['approve_requests']) <= user.permissions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000, help="Requests authorized per approach")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bancroff_bench_"), "bench.db")
+    app = create_bench_app(db_path)
+    try:
+        with app.app_context():
+            from models import db
+            email = seed_requests(0)
+            engine = db.engine
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+        for label, authorize in [("no check (baseline)", no_check),
+                                 ("email lookup", email_lookup),
+                                 ("get_current_user, cold", cold_cache),
+                                 ("get_current_user, warm", warm_cache)]:
+            with app.test_request_context():
+                session['user'] = {'preferred_username': email}
+                authorize(email)  # load the role permissions and fill the cache
+            statements.clear()
+            start = time.perf_counter()
+            for _ in range(args.iterations):
+                with app.test_request_context():
+                    session['user'] = {'preferred_username': email}
+                    if not authorize(email):
+                        raise RuntimeError(f"{label} refused the admin")
+                    g.pop('current_user', None)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<24} {elapsed / args.iterations * 1e6:8.1f} us/request  "
+                  f"{len(statements) / args.iterations:4.1f} queries/request")
+    finally:
+        os.remove(db_path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Concurrent read/write load test for the SQLite database settings.
+
+For each mode a fresh database is seeded and hit by reader threads paging
+through the pending approvals and My Requests views while writer threads
+return pending approvals, for a fixed time. "default" runs SQLite as it is
+out of the box; "tuned" applies WAL mode, the busy timeout and the pragmas
+from config.py. Prints requests/sec and failed requests for each mode.
+Run from the repository root:
+python -m scripts.bench_db_concurrency --readers 8 --writers 4 --seconds 10
+"""
+import argparse
+import os
+import queue
+import random
+import tempfile
+import threading
+import time
+
+import config
+from scripts.bench_pending_approvals import create_bench_app, seed_requests, login
+
+def run_load(app, email, pending_ids, readers, writers, seconds):
+    """Returns (reads, writes, failures) completed within `seconds`."""
+    stop = time.perf_counter() + seconds
+    counts = {'reads': 0, 'writes': 0, 'failures': 0}
+    lock = threading.Lock()
+    per_page = app.config['REQUESTS_PER_PAGE']
+    pages = max(1, pending_ids.qsize() // per_page)
+
+    def count(name):
+        with lock:
+            counts[name] += 1
+
+    def reader(seed):
+        rng = random.Random(seed)
+        client = app.test_client()
+        login(client, email)
+        while time.perf_counter() < stop:
+            url = rng.choice([f"/pending_approvals?page={rng.randint(1, pages)}", "/my_requests"])
+            try:
+                ok = client.get(url).status_code == 200
+            except Exception:
+                ok = False
+            count('reads' if ok else 'failures')
+
+    def writer():
+        client = app.test_client()
+        login(client, email)
+        while time.perf_counter() < stop:
+            try:
+                approval_id = pending_ids.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                response = client.post(f"/request_approval/{approval_id}",
+                                       data={'action': 'return', 'comments': 'load test'})
+                ok = response.status_code == 302
+            except Exception:
+                ok = False
+            count('writes' if ok else 'failures')
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts['reads'], counts['writes'], counts['failures']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000, help="Requests to seed")
+    parser.add_argument("--readers", type=int, default=8, help="Reader threads")
+    parser.add_argument("--writers", type=int, default=4, help="Writer threads")
+    parser.add_argument("--seconds", type=float, default=10, help="Duration of each run")
+    args = parser.parse_args()
+
+    for mode, tuned in [("default", False), ("tuned", True)]:
+        config.SQLITE_TUNING = tuned
+        db_path = os.path.join(tempfile.mkdtemp(prefix="bancroff_bench_"), "bench.db")
+        app = create_bench_app(db_path)
+        with app.app_context():
+            from models import db, RequestApproval
+            email = seed_requests(args.requests)
+            pending_ids = queue.Queue()
+            for (approval_id,) in (db.session.query(RequestApproval.id)
+                                   .filter(RequestApproval.status == 'pending')
+                                   .order_by(db.func.random())):
+                pending_ids.put(approval_id)
+            journal = db.session.execute(db.text("PRAGMA journal_mode")).scalar()
+
+        reads, writes, failures = run_load(app, email, pending_ids, args.readers, args.writers, args.seconds)
+        total = reads + writes
+        print(f"{mode:<8} ({journal:<6}) {total / args.seconds:8.1f} requests/s  "
+              f"{reads / args.seconds:7.1f} reads/s  {writes / args.seconds:7.1f} writes/s  {failures} failed")
+        with app.app_context():
+            db.engine.dispose()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Time filtering requests by values of their submitted form.
+
+Seeds RCL and Withdrawal requests with realistic form data into a fresh SQLite
+database, or into the database given with --database-url (emptied first), then
+for each form filter of the pending approvals view compares loading every
+request's form_data and matching it in Python with the filtered view, whose
+JSON predicates run in the database (on PostgreSQL, from the GIN index on
+form_data). Exits with status 1 if the two disagree on the number of matches.
+Run from the repository root:
+python -m scripts.bench_form_data_filters --database-url postgresql://localhost/bancroff_bench
+python -m scripts.bench_form_data_filters --requests 100000
+"""
+import argparse
+import sys
+import time
+
+from scripts.bench_pending_approvals import (create_bench_app, seed_requests, login, time_view, bench_database,
+                                            remove_bench_database)
+
+def python_matches(db, Request, keys, value):
+    """Number of requests matching a filter when every form is inspected in Python."""
+    matches = 0
+    for (form_data,) in db.session.execute(db.select(Request.form_data).execution_options(yield_per=10000)):
+        if form_data and any(form_data.get(key) == value for key in keys):
+            matches += 1
+    return matches
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000000, help="Requests to seed")
+    parser.add_argument("--repeat", type=int, default=5, help="Requests timed per filter")
+    parser.add_argument("--database-url", help="Benchmark this database instead of SQLite (its tables are dropped)")
+    args = parser.parse_args()
+
+    database = bench_database(args.database_url, "bancroff_bench_")
+    app = create_bench_app(database)
+    mismatches = 0
+    try:
+        with app.app_context():
+            from models import db, Request
+            from utils.approval_queries import FORM_DATA_FILTERS, pending_approvals_page
+            start = time.perf_counter()
+            email = seed_requests(args.requests, batch_size=10000, type_names=('RCL', 'Withdrawal'))
+            if db.engine.dialect.name == 'postgresql':
+                db.session.execute(db.text("ANALYZE requests"))
+                db.session.commit()
+            print(f"{args.requests} requests seeded on {db.engine.dialect.name} "
+                  f"in {time.perf_counter() - start:.1f} s")
+            sample = db.session.scalars(db.select(Request.form_data).order_by(Request.id.desc()).limit(1)).first()
+            filters = {'semester': 'fall', 'ps_id': sample.get('ps_id') or sample.get('myUHID'),
+                       'withdrawal_type': 'medical'}
+
+        client = app.test_client()
+        login(client, email)
+        for name, value in filters.items():
+            with app.app_context():
+                start = time.perf_counter()
+                in_python = python_matches(db, Request, FORM_DATA_FILTERS[name], value)
+                python_time = time.perf_counter() - start
+                in_database = pending_approvals_page(1, app.config['REQUESTS_PER_PAGE'],
+                                                     form_filters={name: value}).total
+            view_time = time_view(client, f"/pending_approvals?{name}={value}", args.repeat)
+            mismatches += in_python != in_database
+            label = f"{name}={value}"
+            print(f"  {label:<25} {in_database:>8} matches  "
+                  f"python {python_time * 1000:9.1f} ms  view {view_time * 1000:8.1f} ms"
+                  f"{'  MISMATCH: python found ' + str(in_python) if in_python != in_database else ''}")
+    finally:
+        with app.app_context():
+            db.engine.dispose()
+        remove_bench_database(database)
+
+    if mismatches:
+        print("FAIL: the database filters disagree with the forms")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
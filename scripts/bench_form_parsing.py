@@ -0,0 +1,56 @@
+"""
+Time parsing and validating one form submission with the form engine.
+
+Builds a typical RCL and Withdrawal submission and, for each, times
+CompiledForm.parse() on the form compiled once (as the app does) against
+compiling the schema again for every submission, which is what interpreting
+the schema per request costs. Prints microseconds per submission.
+Run from the repository root:
+python -m scripts.bench_form_parsing --iterations 20000
+"""
+import argparse
+import time
+
+from werkzeug.datastructures import MultiDict
+
+from form_schema import rcl_form_schema, withdrawal_form_schema
+from utils.form_engine import compile_form
+
+SUBMISSIONS = {
+    'RCL': (rcl_form_schema, MultiDict([
+        ('iai[]', 'english'), ('iai[]', 'reading'), ('reason', 'iclp'), ('track', 'thesis'), ('thesis_hours', '3'),
+        ('semester', 'fall'), ('fall_year', '25'), ('course1', 'MATH 1310'), ('course2', 'ENGL 1301'),
+        ('remaining_hours', '6'), ('name', 'Bench Student'), ('ps_id', '1234567'),
+    ]), {'signature_date': '2026-01-15'}),
+    'Withdrawal': (withdrawal_form_schema, MultiDict([
+        ('myUHID', '1234567'), ('college', 'NSM'), ('planDegree', 'BS Mathematics'), ('address', '4800 Calhoun Rd'),
+        ('phoneNumber', '713-555-0100'), ('termYear', 'Spring 2026'), ('reason', 'Medical leave'),
+        ('lastDateAttended', '2026-02-20'), ('financialAssistance', 'yes'), ('studentHealthInsurance', 'no'),
+        ('campusHousing', 'no'), ('visaStatus', 'no'), ('giBillBenefits', 'no'), ('withdrawalType', 'medical'),
+        ('coursesToWithdraw', 'MATH 1310, ENGL 1301'),
+    ]), {}),
+}
+
+def time_per_call(function, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter() - start) / iterations
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000, help="Submissions parsed per measurement")
+    args = parser.parse_args()
+
+    for name, (schema, form, values) in SUBMISSIONS.items():
+        compiled = compile_form(schema)
+        data, errors = compiled.parse(form, **values)
+        if errors:
+            raise RuntimeError(f"The {name} submission is invalid: {errors}")
+        print(f"{name} ({len(compiled.fields)} fields)")
+        for label, function in [("compiled once", lambda: compiled.parse(form, **values)),
+                                ("compiled per submission", lambda: compile_form(schema).parse(form, **values))]:
+            print(f"  {label:<24} {time_per_call(function, args.iterations) * 1e6:8.1f} us/submission")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Compare ways of loading each request's latest approval for a dashboard.
+
+Seeds a fresh SQLite database and, for every request, reads the id of its
+latest approval three ways: with the per-request query Request.latest_approval
+used to run, by lazy loading the relationship row by row, and by eager loading
+it for all requests with selectinload. Prints the queries issued and the time
+taken by each.
+Run from the repository root:
+python -m scripts.bench_latest_approval --requests 1000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import selectinload
+from scripts.bench_pending_approvals import create_bench_app, seed_requests
+
+def per_request_query(db, Request, RequestApproval, ApprovalStep):
+    ids = []
+    for req in Request.query.all():
+        latest = (RequestApproval.query
+                  .join(ApprovalStep)
+                  .filter(RequestApproval.request_id == req.id)
+                  .order_by(ApprovalStep.step_order.desc())
+                  .first())
+        ids.append(latest.id if latest else None)
+    return ids
+
+def lazy_relationship(db, Request, RequestApproval, ApprovalStep):
+    return [req.latest_approval.id if req.latest_approval else None for req in Request.query.all()]
+
+def eager_relationship(db, Request, RequestApproval, ApprovalStep):
+    requests = db.session.scalars(db.select(Request).options(selectinload(Request.latest_approval)))
+    return [req.latest_approval.id if req.latest_approval else None for req in requests]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000, help="Requests to seed")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bancroff_bench_"), "bench.db")
+    app = create_bench_app(db_path)
+    try:
+        with app.app_context():
+            from models import db, Request, RequestApproval, ApprovalStep
+            seed_requests(args.requests)
+            statements = []
+            event.listen(db.engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+            results = {}
+            for label, load in [("per-request query", per_request_query),
+                                ("lazy relationship", lazy_relationship),
+                                ("selectinload", eager_relationship)]:
+                db.session.expunge_all()
+                statements.clear()
+                start = time.perf_counter()
+                results[label] = load(db, Request, RequestApproval, ApprovalStep)
+                elapsed = time.perf_counter() - start
+                print(f"{label:<18} {len(statements):>6} queries {elapsed * 1000:8.1f} ms")
+
+            if len({tuple(ids) for ids in results.values()}) != 1:
+                raise RuntimeError("The approaches disagree on the latest approvals")
+    finally:
+        os.remove(db_path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Throughput benchmark for isolated LaTeX builds.
+
+Compiles the same approval document repeatedly with an increasing number of
+workers and reports documents/sec for each worker count.
+Run from the repository root:
+python -m scripts.bench_pdf_builds --documents 24
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.pdf_build import build_latex_pdf, configure_pdf_builds
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def fill_sample_template(pdf_dir, index):
+    """Fill approval_template.tex with sample data for one benchmark document."""
+    with open(os.path.join(pdf_dir, "approval_template.tex"), "r", encoding="utf-8") as f:
+        template_content = f.read()
+    return (template_content
+        .replace("{{requestId}}", str(index))
+        .replace("{{requestType}}", "Benchmark")
+        .replace("{{requesterName}}", "Benchmark Student")
+        .replace("{{studentSignature}}", "default_signature.png")
+        .replace("{{studentSignatureDate}}", "2025-01-01")
+        .replace("{{approvalNote}}", "Benchmark run")
+        .replace("{{date}}", "2025-01-01"))
+
+def run_benchmark(documents, workers, pdf_dir, output_dir, signature_files):
+    """Build `documents` PDFs with `workers` threads and return documents/sec."""
+    configure_pdf_builds(workers)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(build_latex_pdf, output_dir, fill_sample_template(pdf_dir, i),
+                            f"bench_{workers}_{i}.pdf", signature_files, "benchmark PDF")
+            for i in range(documents)
+        ]
+        errors = [future.result()[1] for future in futures]
+    elapsed = time.perf_counter() - start
+
+    failed = [error for error in errors if error]
+    if failed:
+        print(f"  {len(failed)} builds failed, first error:\n{failed[0]}")
+    return documents / elapsed if elapsed else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=16, help="Documents built per worker count")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    pdf_dir = os.path.join(APP_ROOT, "pdf")
+    signature = os.path.join(APP_ROOT, "uploads", "default_signature.png")
+    signature_files = {"default_signature.png": signature} if os.path.exists(signature) else {}
+
+    # Keep benchmark output out of the real pdf/ directory
+    output_dir = tempfile.mkdtemp(prefix="bancroff_bench_")
+    shutil.copy2(os.path.join(pdf_dir, "Makefile"), output_dir)
+    try:
+        workers = 1
+        while workers <= args.max_workers:
+            rate = run_benchmark(args.documents, workers, pdf_dir, output_dir, signature_files)
+            print(f"workers={workers:<3} {rate:8.2f} documents/sec")
+            workers *= 2
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Compare cold LaTeX builds with builds that load a precompiled preamble format.
+
+Each template in pdf/ is filled with sample values and built several times
+without a format and then with one. The one-off cost of dumping the format is
+reported separately.
+Run from the repository root:
+python -m scripts.bench_pdf_formats --runs 5
+"""
+import argparse
+import os
+import re
+import shutil
+import statistics
+import tempfile
+import time
+
+from utils import pdf_build
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATES = ["rcl_template.tex", "withdrawal_template.tex", "approval_template.tex"]
+
+def fill_with_samples(template_content):
+    """Replace every {{placeholder}} with sample text; signatures are left out."""
+    def sample(match):
+        name = match.group(1)
+        if "Signature" in name and "Date" not in name:
+            return "non_existent_file.png"
+        return f"Sample {name}"
+    return re.sub(r"\{\{(\w+)\}\}", sample, template_content)
+
+def time_builds(output_dir, tex_source, runs, label):
+    timings = []
+    for i in range(runs):
+        start = time.perf_counter()
+        _, error = pdf_build.build_latex_pdf(output_dir, tex_source, f"bench_{i}.pdf", label=label)
+        timings.append(time.perf_counter() - start)
+        if error:
+            print(f"  build failed:\n{error}")
+            break
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Builds per template and mode")
+    args = parser.parse_args()
+
+    pdf_dir = os.path.join(APP_ROOT, "pdf")
+    output_dir = tempfile.mkdtemp(prefix="bancroff_bench_")
+    shutil.copy2(os.path.join(pdf_dir, "Makefile"), output_dir)
+    format_dir = os.path.join(output_dir, "formats")
+    try:
+        for template in TEMPLATES:
+            with open(os.path.join(pdf_dir, template), "r", encoding="utf-8") as f:
+                tex_source = fill_with_samples(f.read())
+
+            pdf_build.configure_pdf_builds(1)
+            cold = time_builds(output_dir, tex_source, args.runs, template)
+
+            pdf_build.configure_pdf_builds(1, format_dir)
+            start = time.perf_counter()
+            dumped = pdf_build.ensure_format(os.path.join(output_dir, "Makefile"), tex_source)
+            dump_time = time.perf_counter() - start
+            if not dumped:
+                print(f"{template}: could not dump a format, skipping format-backed builds")
+                continue
+            warm = time_builds(output_dir, tex_source, args.runs, template)
+
+            cold_ms = statistics.median(cold) * 1000
+            warm_ms = statistics.median(warm) * 1000
+            print(f"{template:<26} cold {cold_ms:8.1f} ms   format {warm_ms:8.1f} ms   "
+                  f"speedup {cold_ms / warm_ms:4.2f}x   (format dump {dump_time * 1000:.0f} ms)")
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Compare the LaTeX and ReportLab PDF renderers.
+
+Each layout (rcl, withdrawal, approval) is rendered several times with sample
+values by both backends and the mean time per document is reported.
+Run from the repository root:
+python -m scripts.bench_pdf_renderers --runs 10
+"""
+import argparse
+import os
+import re
+import shutil
+import statistics
+import tempfile
+import time
+
+from PIL import Image
+from routes.pdf_renderers import RENDERERS, REPORTLAB_LAYOUTS
+from utils.pdf_build import configure_pdf_builds
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def sample_document(pdf_dir, template, signature):
+    """Sample fields for every placeholder in the template, with one signature image for all."""
+    with open(os.path.join(pdf_dir, f"{template}_template.tex"), "r", encoding="utf-8") as f:
+        names = set(re.findall(r"\{\{(\w+)\}\}", f.read()))
+    signatures = {name: signature for name in names if name.endswith("Signature")}
+    fields = {name: f"Sample {name}" for name in names if name not in signatures}
+    return fields, signatures
+
+def time_renders(renderer, output_dir, template, fields, signatures, runs):
+    timings = []
+    for i in range(runs):
+        start = time.perf_counter()
+        _, error = renderer.render(output_dir, template, fields, signatures,
+                                   f"bench_{renderer.name}_{i}.pdf", label=template)
+        timings.append(time.perf_counter() - start)
+        if error:
+            print(f"  {renderer.name} render failed:\n{error}")
+            return None
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="Renders per layout and backend")
+    args = parser.parse_args()
+
+    pdf_dir = os.path.join(APP_ROOT, "pdf")
+    output_dir = tempfile.mkdtemp(prefix="bancroff_bench_")
+    # The LaTeX renderer reads its templates and Makefile from the output directory
+    for name in os.listdir(pdf_dir):
+        if name == "Makefile" or name.endswith("_template.tex"):
+            shutil.copy2(os.path.join(pdf_dir, name), output_dir)
+    signature = os.path.join(output_dir, "sample_signature.png")
+    Image.new("RGB", (400, 100), color="white").save(signature)
+    configure_pdf_builds(1)
+    try:
+        for template in REPORTLAB_LAYOUTS:
+            fields, signatures = sample_document(pdf_dir, template, signature)
+            means = {}
+            for name, renderer in RENDERERS.items():
+                timings = time_renders(renderer, output_dir, template, fields, signatures, args.runs)
+                if timings:
+                    means[name] = statistics.mean(timings)
+                    print(f"{template:<12} {name:<10} mean {means[name] * 1000:8.1f} ms")
+            if len(means) == len(RENDERERS):
+                print(f"{template:<12} reportlab is {means['latex'] / means['reportlab']:.1f}x faster")
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compare full renders with incremental stamping for a three-step RCL workflow.
+
+A workflow produces four documents: one at submission and one after each of
+the advisor, chair and dean approvals. Full rendering draws all four from
+scratch; stamping renders the base document once and then overlays the
+signature boxes for each step.
+Run from the repository root:
+python -m scripts.bench_pdf_stamping --workflows 20
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from PIL import Image, ImageDraw
+from routes.pdf_renderers import RENDERERS
+
+STEPS = [("advisor", "Academic Advisor"), ("chair", "Department Chair"), ("dean", "College Dean")]
+
+def workflow_documents(signature):
+    """Fields and signatures for the submitted form and after each approval step."""
+    fields = {
+        "fullName": "Benchmark Student", "psId": "1234567", "semester": "Fall", "year": "2025",
+        "reason": "Improper Course Level Placement", "courses": "• MATH 1300\n• PHYS 1301",
+        "remainingHours": "6", "letterAttached": "Yes", "signatureDate": "2025-01-01",
+    }
+    signatures = {"studentSignature": signature}
+    for role, _ in STEPS:
+        fields.update({f"{role}Name": "Not Yet Approved", f"{role}Date": "", f"{role}Comments": ""})
+        signatures[f"{role}Signature"] = None
+
+    documents = [(dict(fields), dict(signatures))]
+    for role, title in STEPS:
+        fields.update({f"{role}Name": f"{title} Name", f"{role}Date": "2025-01-02",
+                       f"{role}Comments": "Approved"})
+        signatures[f"{role}Signature"] = signature
+        documents.append((dict(fields), dict(signatures)))
+    return documents
+
+def run(workflows, output_dir, documents, stamped):
+    renderer = RENDERERS["reportlab"]
+    base_fields, base_signatures = documents[0]
+    start = time.perf_counter()
+    for w in range(workflows):
+        base = (f"bench_base_{w}", base_fields, base_signatures)
+        for step, (fields, signatures) in enumerate(documents):
+            name = f"bench_{w}_{step}.pdf"
+            if stamped:
+                _, error = renderer.render_stamped(output_dir, os.path.join(output_dir, "base"), "rcl",
+                                                   fields, signatures, name, base)
+            else:
+                _, error = renderer.render(output_dir, "rcl", fields, signatures, name)
+            if error:
+                raise RuntimeError(error)
+    return (time.perf_counter() - start) / workflows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workflows", type=int, default=20, help="Workflows rendered per mode")
+    args = parser.parse_args()
+
+    output_dir = tempfile.mkdtemp(prefix="bancroff_bench_")
+    signature = os.path.join(output_dir, "sample_signature.png")
+    image = Image.new("RGB", (400, 100), color="white")
+    ImageDraw.Draw(image).line((20, 70, 380, 30), fill="black", width=4)
+    image.save(signature)
+    try:
+        documents = workflow_documents(signature)
+        full = run(args.workflows, output_dir, documents, stamped=False)
+        stamped = run(args.workflows, output_dir, documents, stamped=True)
+        print(f"full renders   {full * 1000:8.1f} ms per workflow ({len(documents)} documents)")
+        print(f"base + stamps  {stamped * 1000:8.1f} ms per workflow")
+        print(f"stamping is {full / stamped:.1f}x faster")
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Time the pending approvals view against databases of increasing size.
+
+Each size is seeded into a fresh SQLite database (or the database given with
+--database-url, emptied first) with RCL requests at random points of their
+workflow, then the first and a middle page of the view are requested as an
+admin, with and without a role filter.
+Run from the repository root:
+python -m scripts.bench_pending_approvals --sizes 10000 100000
+python -m scripts.bench_pending_approvals --database-url postgresql://localhost/bancroff_bench
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import sqlalchemy as sa
+
+import config
+
+def create_bench_app(database):
+    """
+    Application instance backed by a new SQLite database at the path `database`,
+    or by the database at a URL such as postgresql://localhost/bancroff_bench,
+    whose tables are dropped first.
+    """
+    if "://" in database:
+        drop_tables(database)
+        config.SQLALCHEMY_DATABASE_URI = database
+    else:
+        config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{database}"
+    config.RENDER_WORKERS = 0
+    if 'app' in sys.modules:
+        app = sys.modules['app'].create_app()
+    else:
+        # Importing app.py creates the application for the current config
+        from app import app
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['SESSION_COOKIE_SECURE'] = False
+    return app
+
+def drop_tables(database_url):
+    """Drop every table of the database at database_url."""
+    engine = sa.create_engine(database_url)
+    try:
+        metadata = sa.MetaData()
+        metadata.reflect(engine)
+        metadata.drop_all(engine)
+    finally:
+        engine.dispose()
+
+def bench_database(database_url, prefix):
+    """database_url if given, else the path of a new SQLite file in a temporary directory."""
+    return database_url or os.path.join(tempfile.mkdtemp(prefix=prefix), "bench.db")
+
+def remove_bench_database(database):
+    """Delete a SQLite file made by bench_database; databases given by URL are kept."""
+    if "://" not in database:
+        os.remove(database)
+
+def form_data_for(type_name, rng):
+    """Form contents like those the RCL and Withdrawal forms submit."""
+    ps_id = str(rng.randint(1000000, 9999999))
+    if type_name == 'Withdrawal':
+        return {'myUHID': ps_id, 'termYear': f"{rng.choice(['Fall', 'Spring'])} {rng.randint(2020, 2026)}",
+                'withdrawalType': rng.choice(['medical', 'administrative']),
+                'financialAssistance': rng.random() < 0.3, 'reason': 'Bench request'}
+    return {'iai': [], 'reason': rng.choice(['iclp', 'medical']), 'semester': rng.choice(['fall', 'spring']),
+            'year': str(rng.randint(2020, 2026)), 'courses': [], 'remaining_hours': str(rng.randint(0, 9)),
+            'ps_id': ps_id}
+
+def seed_requests(count, batch_size=5000, type_names=('RCL',)):
+    """
+    Add `count` requests of the given types, with their form data and
+    approvals, in bulk, plus an admin user to view them. Returns the admin's
+    email address.
+    """
+    from models import db, User, Role, Request, RequestType, RequestApproval
+    request_types = [RequestType.query.filter_by(name=name).first() for name in type_names]
+    steps = {rt.id: sorted(rt.workflows[0].steps, key=lambda s: s.step_order) for rt in request_types}
+    admin = User(email='bench.admin@example.com', full_name='Bench Admin', status='active',
+                 role_id=Role.query.filter_by(name='admin').first().id)
+    db.session.add(admin)
+    db.session.commit()
+    requester_ids = [u.id for u in User.query.all()]
+
+    rng = random.Random(0)
+    first_id = (db.session.query(db.func.max(Request.id)).scalar() or 0) + 1
+    for start in range(0, count, batch_size):
+        requests, approvals = [], []
+        for request_id in range(first_id + start, first_id + min(start + batch_size, count)):
+            request_type = rng.choice(request_types)
+            type_steps = steps[request_type.id]
+            approved = rng.randint(0, len(type_steps))
+            current = type_steps[approved] if approved < len(type_steps) else None
+            requests.append({'id': request_id, 'type_id': request_type.id,
+                             'title': f"{request_type.name} Request {request_id}",
+                             'requester_id': rng.choice(requester_ids),
+                             'form_data': form_data_for(request_type.name, rng),
+                             'status': 'submitted' if current else 'approved',
+                             'current_step_id': current.id if current else None,
+                             'current_role_id': current.approver_role_id if current else None})
+            for i, step in enumerate(type_steps):
+                approvals.append({'request_id': request_id, 'step_id': step.id,
+                                  'status': 'approved' if i < approved else 'pending',
+                                  'approver_id': admin.id if i < approved else None})
+        db.session.execute(db.insert(Request), requests)
+        db.session.execute(db.insert(RequestApproval), approvals)
+        db.session.commit()
+    if db.engine.dialect.name == 'postgresql':
+        # The ids were given explicitly, so move the sequence past them for later inserts
+        db.session.execute(db.text("SELECT setval(pg_get_serial_sequence('requests', 'id'), "
+                                   "(SELECT max(id) FROM requests))"))
+        db.session.commit()
+    return admin.email
+
+def login(client, email):
+    with client.session_transaction() as s:
+        s['user'] = {'preferred_username': email, 'name': email}
+        s['status'] = 'active'
+
+def time_view(client, url, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        response = client.get(url)
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} returned {response.status_code}")
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000], help="Requests to seed")
+    parser.add_argument("--repeat", type=int, default=10, help="Requests timed per page")
+    parser.add_argument("--database-url", help="Benchmark this database instead of SQLite (its tables are dropped)")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        database = bench_database(args.database_url, "bancroff_bench_")
+        app = create_bench_app(database)
+        with app.app_context():
+            from models import Role
+            email = seed_requests(size)
+            chair_id = Role.query.filter_by(name='chair').first().id
+        middle = size // app.config['REQUESTS_PER_PAGE'] // 2 or 1
+        client = app.test_client()
+        login(client, email)
+        print(f"{size} requests")
+        for label, url in [("first page", "/pending_approvals"),
+                           ("middle page", f"/pending_approvals?page={middle}"),
+                           ("awaiting chair", f"/pending_approvals?role_id={chair_id}"),
+                           ("submitted", "/pending_approvals?status=submitted")]:
+            print(f"  {label:<15} {time_view(client, url, args.repeat) * 1000:8.1f} ms")
+        with app.app_context():
+            from models import db
+            db.engine.dispose()
+        remove_bench_database(database)
+
+if __name__ == "__main__":
+    main()
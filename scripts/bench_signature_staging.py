@@ -0,0 +1,130 @@
+"""
+Measure the file I/O of putting signatures into LaTeX builds.
+
+Builds the RCL document repeatedly with four signatures (student and three
+approvers). It compares three ways of giving each build its signatures:
+- copy and delete: copy every signature into the build before it runs, as
+  the PDF generators used to;
+- symlinks: link_into_sandbox() in utils/pdf_build.py;
+- hard links: its fallback where symlinks are not supported.
+This is done for raw uploads and for images from the content-addressed
+signature store (utils/signatures.py). Prints bytes copied per document and
+mean build time.
+Run from the repository root:
+python -m scripts.bench_signature_staging --documents 20
+"""
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+import config
+from routes.pdf_renderers import RENDERERS
+from scripts.bench_pdf_renderers import APP_ROOT, sample_document
+from scripts.bench_signatures import photographed_signature
+from utils import pdf_build
+from utils.signatures import normalize_signature, signature_key
+
+@contextmanager
+def copy_staging(copied):
+    """Copy signatures into each build instead of linking them, adding the bytes copied to copied[0]."""
+    def copy_into_sandbox(src_path, sandbox, name):
+        dest_path = os.path.join(sandbox, name)
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        shutil.copy2(src_path, dest_path)
+        copied[0] += os.path.getsize(dest_path)
+    link = pdf_build.link_into_sandbox
+    pdf_build.link_into_sandbox = copy_into_sandbox
+    try:
+        yield
+    finally:
+        pdf_build.link_into_sandbox = link
+
+@contextmanager
+def without_symlinks(copied):
+    """Make symlinks fail, as on volumes without symlink support, so builds fall back to hard links."""
+    def refuse(*args, **kwargs):
+        raise OSError("symlinks are not supported")
+    symlink = os.symlink
+    os.symlink = refuse
+    before = pdf_build.staging_stats()['bytes_copied']
+    try:
+        yield
+    finally:
+        os.symlink = symlink
+        copied[0] += pdf_build.staging_stats()['bytes_copied'] - before
+
+@contextmanager
+def with_symlinks(copied):
+    before = pdf_build.staging_stats()['bytes_copied']
+    try:
+        yield
+    finally:
+        copied[0] += pdf_build.staging_stats()['bytes_copied'] - before
+
+STAGINGS = [("copy and delete", copy_staging), ("symlinks", with_symlinks), ("hard links", without_symlinks)]
+
+def make_signatures(uploads_dir):
+    """Four raw uploads, and the same signatures normalized into the signature store."""
+    dpi = config.SIGNATURE_DPI
+    max_size = (round(config.SIGNATURE_PRINT_SIZE[0] * dpi), round(config.SIGNATURE_PRINT_SIZE[1] * dpi))
+    raw, stored = [], []
+    os.makedirs(uploads_dir, exist_ok=True)
+    for seed in range(4):
+        path = os.path.join(uploads_dir, f"signature_{seed}_raw.jpg")
+        photographed_signature(path, seed=seed)
+        raw.append(path)
+        with open(path, "rb") as f:
+            data, sha256 = normalize_signature(f, max_size, dpi, config.SIGNATURE_COLORS,
+                                               config.SIGNATURE_MAX_PIXELS)
+        stored_path = os.path.join(uploads_dir, signature_key(sha256))
+        os.makedirs(os.path.dirname(stored_path), exist_ok=True)
+        with open(stored_path, "wb") as f:
+            f.write(data)
+        stored.append(stored_path)
+    return {"raw uploads": raw, "signature store": stored}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=20, help="Documents built per staging and signature set")
+    args = parser.parse_args()
+
+    pdf_dir = os.path.join(APP_ROOT, "pdf")
+    work_dir = tempfile.mkdtemp(prefix="bancroff_bench_")
+    output_dir = os.path.join(work_dir, "pdf")
+    os.makedirs(output_dir)
+    # The LaTeX renderer reads its templates and Makefile from the output directory
+    for name in os.listdir(pdf_dir):
+        if name == "Makefile" or name.endswith("_template.tex"):
+            shutil.copy2(os.path.join(pdf_dir, name), output_dir)
+    pdf_build.configure_pdf_builds(1)
+    renderer = RENDERERS["latex"]
+    try:
+        for label, paths in make_signatures(os.path.join(work_dir, "uploads")).items():
+            fields, signatures = sample_document(pdf_dir, "rcl", None)
+            for key, path in zip(sorted(signatures), paths):
+                signatures[key] = path
+            for staging, context in STAGINGS:
+                copied = [0]
+                timings = []
+                with context(copied):
+                    for i in range(args.documents):
+                        start = time.perf_counter()
+                        pdf_path, error = renderer.render(output_dir, "rcl", fields, signatures, f"bench_{i}.pdf")
+                        timings.append(time.perf_counter() - start)
+                        if error:
+                            raise RuntimeError(error)
+                        os.remove(pdf_path)
+                print(f"{label:<16} {staging:<16} {copied[0] / args.documents / 1024:10.1f} KiB copied/document"
+                      f"  mean {statistics.mean(timings) * 1000:7.1f} ms")
+        stats = pdf_build.staging_stats()
+        print(f"link_into_sandbox made {stats['symlinks']} symlinks and {stats['hard_links']} hard links, "
+              f"and copied {stats['copies']} files")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Compare PDF builds with raw and normalized signature images.
+
+Makes a signature the way users tend to upload one: a 12 megapixel phone
+photo (JPEG) of ink on slightly grey, noisy paper. It is run through the
+upload pipeline in utils/signatures.py, and each layout (rcl, withdrawal,
+approval) is then built by each renderer with the raw upload and with the
+normalized image in every signature slot. Prints the time to normalize one
+upload, and the mean build time and PDF size for both images.
+Run from the repository root:
+python -m scripts.bench_signatures --runs 5
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+from PIL import Image, ImageDraw
+import config
+from routes.pdf_renderers import RENDERERS, REPORTLAB_LAYOUTS
+from scripts.bench_pdf_renderers import APP_ROOT, sample_document, time_renders
+from utils.pdf_build import configure_pdf_builds
+from utils.signatures import normalize_signature
+
+def photographed_signature(path, size=(4032, 3024), seed=1):
+    """Write a JPEG like a phone photo of a signature on paper."""
+    rng = random.Random(seed)
+    noise = Image.effect_noise(size, 24).point(lambda level: 200 + level // 6)
+    image = Image.merge('RGB', (noise, noise, noise.point(lambda level: level - 6)))
+    draw = ImageDraw.Draw(image)
+    x, y = size[0] // 4, size[1] // 2
+    for _ in range(60):
+        dx, dy = rng.randint(10, 60), rng.randint(-120, 120)
+        draw.line([(x, y), (x + dx, y + dy)], fill=(25, 35, 120), width=14)
+        x, y = x + dx, max(size[1] // 3, min(2 * size[1] // 3, y + dy))
+    image.save(path, 'JPEG', quality=92)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Builds per layout, renderer and image")
+    args = parser.parse_args()
+
+    pdf_dir = os.path.join(APP_ROOT, "pdf")
+    output_dir = tempfile.mkdtemp(prefix="bancroff_bench_")
+    # The LaTeX renderer reads its templates and Makefile from the output directory
+    for name in os.listdir(pdf_dir):
+        if name == "Makefile" or name.endswith("_template.tex"):
+            shutil.copy2(os.path.join(pdf_dir, name), output_dir)
+    raw = os.path.join(output_dir, "raw_signature.jpg")
+    photographed_signature(raw)
+
+    dpi = config.SIGNATURE_DPI
+    max_size = (round(config.SIGNATURE_PRINT_SIZE[0] * dpi), round(config.SIGNATURE_PRINT_SIZE[1] * dpi))
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        with open(raw, "rb") as f:
+            data, _ = normalize_signature(f, max_size, dpi, config.SIGNATURE_COLORS, config.SIGNATURE_MAX_PIXELS)
+    elapsed = (time.perf_counter() - start) / args.runs
+    normalized = os.path.join(output_dir, "normalized_signature.png")
+    with open(normalized, "wb") as f:
+        f.write(data)
+    print(f"raw upload        {os.path.getsize(raw) / 1024:8.0f} KiB  {Image.open(raw).size}")
+    print(f"normalized        {os.path.getsize(normalized) / 1024:8.0f} KiB  {Image.open(normalized).size}"
+          f"  in {elapsed * 1000:.0f} ms")
+
+    configure_pdf_builds(1)
+    try:
+        for template in REPORTLAB_LAYOUTS:
+            for name, renderer in RENDERERS.items():
+                for label, signature in (("raw", raw), ("normalized", normalized)):
+                    fields, signatures = sample_document(pdf_dir, template, signature)
+                    timings = time_renders(renderer, output_dir, template, fields, signatures, args.runs)
+                    if not timings:
+                        continue
+                    pdf_path = os.path.join(output_dir, f"bench_{renderer.name}_{args.runs - 1}.pdf")
+                    size = os.path.getsize(pdf_path) / 1024 if os.path.exists(pdf_path) else float("nan")
+                    print(f"{template:<12} {name:<10} {label:<10} mean {statistics.mean(timings) * 1000:8.1f} ms"
+                          f"  {size:8.0f} KiB")
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Load test of request submission during the semester-start rush, on SQLite.
+
+--students students with signatures on file submit RCL forms from --threads
+threads for --seconds seconds against a fresh SQLite database with the tuned
+settings of config.py. Three ways are measured: the submission as it used to
+be (commit the request, query the workflow, add one approval per step and
+commit again), submit_request() from utils/submissions.py (one transaction,
+approvals inserted in bulk, workflow steps cached), and POSTs to /rcl_form,
+which go through submit_request(). Prints submissions/sec, failures and the
+number of requests left without approvals.
+Run from the repository root:
+python -m scripts.bench_submissions --threads 8 --seconds 10
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from scripts.bench_pending_approvals import create_bench_app, form_data_for, login
+
+def submit_in_two_commits(type_name, requester_id, title, form_data):
+    """The submission as rcl_form and withdrawal_form used to make it."""
+    from models import db, RequestType, Request, ApprovalWorkflow, RequestApproval
+    request_type = RequestType.query.filter_by(name=type_name).first()
+    new_request = Request(type_id=request_type.id, requester_id=requester_id, title=title,
+                          form_data=form_data, status='submitted')
+    db.session.add(new_request)
+    db.session.commit()
+    workflow = ApprovalWorkflow.query.filter_by(request_type_id=request_type.id).first()
+    for step in workflow.steps:
+        db.session.add(RequestApproval(request_id=new_request.id, step_id=step.id, status='pending'))
+    new_request.refresh_current_step()
+    db.session.commit()
+
+def submit_in_one_transaction(type_name, requester_id, title, form_data):
+    from utils.submissions import submit_request
+    submit_request(type_name, requester_id, title, form_data)
+
+def seed_students(count):
+    """Add `count` students, each with an active signature; returns their (id, email) pairs."""
+    from models import db, User, Role, UserSignature
+    role_id = Role.query.filter_by(name='basic_user').first().id
+    students = [User(email=f"bench.student{i}@example.com", full_name=f"Bench Student {i}", status='active',
+                     role_id=role_id) for i in range(count)]
+    db.session.add_all(students)
+    db.session.flush()
+    db.session.add_all(UserSignature(user_id=student.id, signature_image_path='signature_bench.png',
+                                     is_active=True) for student in students)
+    db.session.commit()
+    return [(student.id, student.email) for student in students]
+
+def run_load(threads, seconds, submit):
+    """Run submit(rng) in `threads` threads for `seconds`; returns (submissions, failures)."""
+    stop = time.perf_counter() + seconds
+    counts = {'ok': 0, 'failed': 0}
+    lock = threading.Lock()
+
+    def worker(seed):
+        rng = random.Random(seed)
+        state = {}
+        while time.perf_counter() < stop:
+            try:
+                ok = submit(rng, state)
+            except Exception:
+                ok = False
+            with lock:
+                counts['ok' if ok else 'failed'] += 1
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return counts['ok'], counts['failed']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8, help="Students submitting at once")
+    parser.add_argument("--students", type=int, default=200, help="Students to seed")
+    parser.add_argument("--seconds", type=float, default=10, help="Duration of each run")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bancroff_bench_")
+    app = create_bench_app(os.path.join(work_dir, "bench.db"))
+    try:
+        with app.app_context():
+            from models import db, Request, RequestApproval
+            students = seed_students(args.students)
+
+        def direct(submit):
+            def run(rng, state):
+                student_id, _ = rng.choice(students)
+                form_data = form_data_for('RCL', rng)
+                with app.app_context():
+                    submit('RCL', student_id, f"RCL Request - {form_data['semester']} {form_data['year']}",
+                           form_data)
+                return True
+            return run
+
+        def post_form(rng, state):
+            if 'client' not in state:
+                state['client'] = app.test_client()
+                login(state['client'], rng.choice(students)[1])
+            form_data = form_data_for('RCL', rng)
+            response = state['client'].post('/rcl_form', data={
+                'reason': form_data['reason'], 'semester': form_data['semester'],
+                f"{form_data['semester']}_year": form_data['year'][2:], 'course1': 'MATH 1310',
+                'remaining_hours': str(rng.randint(1, 9)), 'ps_id': form_data['ps_id']})
+            with state['client'].session_transaction() as s:
+                flashes = s.pop('_flashes', [])
+            return response.status_code == 302 and any(category == 'success' for category, _ in flashes)
+
+        for label, submit in [("two commits (before)", direct(submit_in_two_commits)),
+                              ("submit_request()", direct(submit_in_one_transaction)),
+                              ("POST /rcl_form", post_form)]:
+            submissions, failures = run_load(args.threads, args.seconds, submit)
+            print(f"{label:<22} {submissions / args.seconds:8.1f} submissions/s  {failures} failed")
+
+        with app.app_context():
+            orphans = (db.session.query(db.func.count(Request.id))
+                       .filter(~db.exists().where(RequestApproval.request_id == Request.id)).scalar())
+            print(f"requests without approvals: {orphans}")
+            db.engine.dispose()
+    finally:
+        shutil.rmtree(work_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Check how often sign-in talks to the identity provider's discovery endpoints.
+
+MSAL's HTTP requests go to a local stand-in for Microsoft Entra ID that
+answers instance discovery, tenant discovery and the token endpoint, counts
+each call and waits --latency seconds per call like a remote server would.
+Signs in --logins times by creating a client per sign-in (as the app used to)
+and with the shared client, then starts a second "worker" on the same cache
+store. Exits with status 1 if the shared client repeats discovery, if the
+second worker repeats it, or if any token reached the cache store.
+Run from the repository root:
+python -m scripts.check_msal_discovery --logins 20
+python -m scripts.check_msal_discovery --store database
+"""
+import argparse
+import base64
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from urllib.parse import urlparse
+
+import msal
+
+import config
+from scripts.bench_pending_approvals import create_bench_app
+from utils.auth_helpers import build_auth_url, get_token_from_code
+from utils.msal_client import configure_msal, FileCacheStore, DatabaseCacheStore
+
+def _b64(data):
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.status_code = status_code
+        self.text = json.dumps(payload)
+        self.headers = {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+class FakeIdentityProvider:
+    """An http_client for MSAL that plays the identity provider and counts the calls it gets."""
+
+    def __init__(self, authority, client_id, latency):
+        self.authority = authority.rstrip("/")
+        self.host = urlparse(authority).netloc
+        self.tenant = urlparse(authority).path.strip("/")
+        self.client_id = client_id
+        self.latency = latency
+        self.calls = Counter()
+
+    def _discovery_document(self):
+        return {
+            "authorization_endpoint": f"{self.authority}/oauth2/v2.0/authorize",
+            "token_endpoint": f"{self.authority}/oauth2/v2.0/token",
+            "issuer": f"https://{self.host}/{self.tenant}/v2.0",
+        }
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        time.sleep(self.latency)
+        if url.endswith("/discovery/instance"):
+            self.calls["instance discovery"] += 1
+            return FakeResponse({
+                "tenant_discovery_endpoint": f"{self.authority}/v2.0/.well-known/openid-configuration",
+                "api-version": "1.1",
+                "metadata": [{"preferred_network": self.host, "preferred_cache": self.host,
+                              "aliases": [self.host]}],
+            })
+        if url.endswith("/.well-known/openid-configuration"):
+            self.calls["tenant discovery"] += 1
+            return FakeResponse(self._discovery_document())
+        self.calls["other"] += 1
+        return FakeResponse({"error": "not_found"}, 404)
+
+    def post(self, url, params=None, data=None, headers=None, **kwargs):
+        time.sleep(self.latency)
+        if not url.endswith("/oauth2/v2.0/token"):
+            self.calls["other"] += 1
+            return FakeResponse({"error": "not_found"}, 404)
+        self.calls["token"] += 1
+        now = int(time.time())
+        claims = {"iss": self._discovery_document()["issuer"], "aud": self.client_id, "iat": now,
+                  "exp": now + 3600, "oid": "00000000-0000-0000-0000-000000000001",
+                  "tid": self.tenant, "sub": "bench", "name": "Bench User",
+                  "preferred_username": "bench.user@example.com"}
+        return FakeResponse({
+            "token_type": "Bearer", "scope": " ".join(config.SCOPE), "expires_in": 3600,
+            "access_token": "access-token", "refresh_token": "refresh-token",
+            "id_token": f"{_b64({'alg': 'none', 'typ': 'JWT'})}.{_b64(claims)}.",
+            "client_info": _b64({"uid": claims["oid"], "utid": self.tenant}),
+        })
+
+    def discovery_calls(self):
+        return self.calls["instance discovery"] + self.calls["tenant discovery"]
+
+def sign_in(app, logins, build, exchange):
+    """Run `logins` sign-ins through build() and exchange(); returns seconds per sign-in."""
+    start = time.perf_counter()
+    for _ in range(logins):
+        with app.test_request_context():
+            build()
+            result = exchange()
+            if "error" in result:
+                raise RuntimeError(f"Sign-in failed: {result}")
+    return (time.perf_counter() - start) / logins
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=20, help="Sign-ins per scenario")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds the identity provider takes per call")
+    parser.add_argument("--store", choices=["file", "database"], default="file", help="Where the caches are shared")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bancroff_msal_")
+    app = create_bench_app(os.path.join(work_dir, "bench.db"))
+    redirect_uri = "http://localhost/getAToken"
+    failures = []
+
+    def login_once(client_id, secret, authority):
+        return (lambda: build_auth_url(client_id, secret, authority, config.SCOPE, redirect_uri),
+                lambda: get_token_from_code(client_id, secret, authority, "code", config.SCOPE, redirect_uri))
+
+    def new_store():
+        return FileCacheStore(os.path.join(work_dir, "msal")) if args.store == "file" else DatabaseCacheStore(app)
+
+    try:
+        # A new ConfidentialClientApplication for every sign-in, as before
+        idp = FakeIdentityProvider(config.AUTHORITY, config.CLIENT_ID, args.latency)
+        def per_login_client():
+            return msal.ConfidentialClientApplication(config.CLIENT_ID, authority=config.AUTHORITY,
+                                                      client_credential=config.CLIENT_SECRET, http_client=idp)
+        elapsed = sign_in(app, args.logins,
+                          lambda: per_login_client().get_authorization_request_url(config.SCOPE,
+                                                                                   redirect_uri=redirect_uri),
+                          lambda: per_login_client().acquire_token_by_authorization_code(
+                              "code", config.SCOPE, redirect_uri=redirect_uri))
+        print(f"client per sign-in   {elapsed * 1000:7.1f} ms/sign-in  "
+              f"{idp.discovery_calls():>3} discovery calls  {idp.calls['token']:>3} token calls")
+
+        # The shared client of one worker
+        idp = FakeIdentityProvider(config.AUTHORITY, config.CLIENT_ID, args.latency)
+        configure_msal(new_store(), http_client=idp)
+        elapsed = sign_in(app, args.logins, *login_once(config.CLIENT_ID, config.CLIENT_SECRET, config.AUTHORITY))
+        print(f"shared client        {elapsed * 1000:7.1f} ms/sign-in  "
+              f"{idp.discovery_calls():>3} discovery calls  {idp.calls['token']:>3} token calls")
+        if idp.discovery_calls() > 2:
+            failures.append("the shared client repeated discovery")
+
+        # Another worker starting on the same cache store
+        idp = FakeIdentityProvider(config.AUTHORITY, config.CLIENT_ID, args.latency)
+        configure_msal(new_store(), http_client=idp)
+        store = new_store()
+        configure_msal(store, http_client=idp)
+        elapsed = sign_in(app, args.logins, *login_once(config.CLIENT_ID, config.CLIENT_SECRET, config.AUTHORITY))
+        print(f"second worker        {elapsed * 1000:7.1f} ms/sign-in  "
+              f"{idp.discovery_calls():>3} discovery calls  {idp.calls['token']:>3} token calls")
+        if idp.discovery_calls():
+            failures.append("the second worker repeated discovery")
+        # Only the discovery cache is shared; sign-in tokens stay in the request that got them
+        persisted = store.read("http_cache") or b""
+        if store.read("token_cache") is not None or b"access-token" in persisted or b"refresh-token" in persisted:
+            failures.append("tokens were written to the cache store")
+    finally:
+        configure_msal(None)
+        with app.app_context():
+            from models import db
+            db.engine.dispose()
+        shutil.rmtree(work_dir)
+
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("OK: discovery runs once for all workers sharing the cache")
+
+if __name__ == "__main__":
+    main()
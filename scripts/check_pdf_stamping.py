@@ -0,0 +1,73 @@
+"""
+Check that incremental stamping still works with the installed PyPDF2.
+
+Stamping draws signature boxes onto a base document through PdfWriter's
+private _add_object, so PyPDF2 is pinned in requirements.txt. This stamps the
+last document of a three-step RCL workflow and exits with status 1 if the
+installed PyPDF2 is not the pinned version, if stamping failed, or if the
+stamped document lacks any approver's signature box.
+Run from the repository root:
+python -m scripts.check_pdf_stamping
+"""
+import os
+import re
+import shutil
+import sys
+import tempfile
+
+import PyPDF2
+from PIL import Image, ImageDraw
+from PyPDF2 import PdfReader
+from routes.pdf_renderers import RENDERERS, _field_values, _signature_parts
+from scripts.bench_pdf_stamping import STEPS, workflow_documents
+
+def pinned_version():
+    """The PyPDF2 version pinned in requirements.txt, or None."""
+    with open("requirements.txt", encoding="utf-8") as f:
+        match = re.search(r"^PyPDF2==(\S+)", f.read(), re.MULTILINE)
+    return match.group(1) if match else None
+
+def main():
+    failures = []
+    pinned = pinned_version()
+    if pinned != PyPDF2.__version__:
+        failures.append(f"PyPDF2 {PyPDF2.__version__} is installed but requirements.txt pins {pinned}")
+
+    output_dir = tempfile.mkdtemp(prefix="bancroff_check_")
+    try:
+        signature = os.path.join(output_dir, "sample_signature.png")
+        image = Image.new("RGB", (400, 100), color="white")
+        ImageDraw.Draw(image).line((20, 70, 380, 30), fill="black", width=4)
+        image.save(signature)
+
+        renderer = RENDERERS["reportlab"]
+        documents = workflow_documents(signature)
+        base_fields, base_signatures = documents[0]
+        base_dir = os.path.join(output_dir, "base")
+        base_pdf_path, geometry = renderer.base_document(base_dir, "check", "rcl", base_fields, base_signatures)
+        fields, signatures = documents[-1]
+
+        values = _field_values(fields)
+        boxes = [renderer.signature_box(part, values, signatures) for part in _signature_parts("rcl")]
+        output_path = os.path.join(output_dir, "stamped.pdf")
+        renderer.stamp(base_pdf_path, geometry, boxes, output_path)
+
+        text = "".join(page.extract_text() for page in PdfReader(output_path).pages)
+        for _, title in STEPS:
+            status = "ok" if f"{title} Name" in text else "MISSING"
+            print(f"{status:<8} {title} signature box")
+            if status != "ok":
+                failures.append(f"{title} signature box was not stamped")
+    except Exception as e:
+        failures.append(f"Stamping failed: {e}")
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        sys.exit(1)
+    print(f"OK: stamping works with PyPDF2 {PyPDF2.__version__}")
+
+if __name__ == "__main__":
+    main()
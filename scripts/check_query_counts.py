@@ -0,0 +1,74 @@
+"""
+Check that the pending approvals, my requests and approval management views
+issue the same number of queries however many requests are stored or shown.
+
+Each view is rendered against a small and a larger seeded database, with and
+without filters, and the SQL statements executed for each page are counted.
+Exits with status 1 if the counts differ. The databases are SQLite files
+unless --database-url names another database (e.g. PostgreSQL) to run the
+same checks against; its tables are dropped.
+Run from the repository root:
+python -m scripts.check_query_counts
+python -m scripts.check_query_counts --database-url postgresql://localhost/bancroff_check
+"""
+import argparse
+import sys
+
+from sqlalchemy import event
+from scripts.bench_pending_approvals import (create_bench_app, seed_requests, login, bench_database,
+                                            remove_bench_database)
+
+def count_queries(app, client, url):
+    from models import db
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    if response.status_code != 200:
+        raise RuntimeError(f"{url} returned {response.status_code}")
+    return len(statements)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[300, 2000],
+                        help="Requests to seed (enough for two pages of the admin's own requests)")
+    parser.add_argument("--database-url", help="Check this database instead of SQLite (its tables are dropped)")
+    args = parser.parse_args()
+
+    urls = ["/pending_approvals", "/pending_approvals?page=2", "/pending_approvals?status=submitted",
+            "/pending_approvals?role_id=3&status=submitted", "/pending_approvals?semester=fall",
+            "/pending_approvals?withdrawal_type=medical&status=submitted", "/pending_approvals?ps_id=1234567",
+            "/my_requests", "/my_requests?page=2",
+            "/approval_management", "/approval_management?page=2"]
+    counts = {}
+    for size in args.sizes:
+        database = bench_database(args.database_url, "bancroff_check_")
+        app = create_bench_app(database)
+        with app.app_context():
+            email = seed_requests(size, type_names=('RCL', 'Withdrawal'))
+        client = app.test_client()
+        login(client, email)
+        # Signing in resolves the user; later pages find them in the current user cache
+        client.get(urls[0])
+        for url in urls:
+            counts[(size, url)] = count_queries(app, client, url)
+            print(f"{size:>6} requests  {counts[(size, url)]:>3} queries  {url}")
+        with app.app_context():
+            from models import db
+            db.engine.dispose()
+        remove_bench_database(database)
+
+    # Each view may take a different number of queries, but never more with more data
+    if any(len({counts[(size, url)] for size in args.sizes}) != 1 for url in urls):
+        print("FAIL: the number of queries depends on the data")
+        sys.exit(1)
+    print("OK: constant number of queries")
+
+if __name__ == "__main__":
+    main()
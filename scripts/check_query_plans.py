@@ -0,0 +1,124 @@
+"""
+Check that the approval workflow's hot queries are answered from indexes.
+
+Builds a SQLite database from the Alembic migrations, seeds it, and runs
+EXPLAIN QUERY PLAN on each query the approval pages and form submission run
+for a single user, request or role. Exits with status 1 if any of them scans a
+whole table instead of searching an index.
+Run from the repository root:
+python -m scripts.check_query_plans
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+from flask_migrate import upgrade
+from sqlalchemy import event
+from sqlalchemy.orm import with_parent
+from scripts.bench_pending_approvals import create_bench_app, seed_requests
+from utils.approval_queries import approval_timelines, pending_approvals_page
+
+def captured_queries(db, load):
+    """Run load() and return the (sql, parameters) of every statement it executes."""
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        load()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+    return statements
+
+def hot_queries(db, email):
+    """(description, query) pairs for the queries that must use an index."""
+    from models import (User, UserSignature, RequestType, ApprovalWorkflow, ApprovalStep, Request,
+                        RequestApproval)
+    user = User.query.filter_by(email=email).first()
+    req = db.session.scalars(db.select(Request).filter_by(requester_id=user.id).limit(1)).first()
+    request_ids = [r.id for r in db.session.scalars(db.select(Request).limit(25))]
+
+    # Queries built inside the data-access layer are captured as they run
+    timelines = captured_queries(db, lambda: approval_timelines(request_ids))
+    page = captured_queries(db, lambda: pending_approvals_page(1, 25).items)
+    page_approvals = next(q for q in page if "FROM request_approvals" in q[0])
+
+    return [
+        ("user by email", db.select(User).filter_by(email=email)),
+        ("active signature", db.select(UserSignature)
+            .filter_by(user_id=user.id, is_active=True)
+            .order_by(UserSignature.uploaded_at.desc()).limit(1)),
+        ("request type by name", db.select(RequestType).filter_by(name='RCL')),
+        ("workflow of a request type", db.select(ApprovalWorkflow).filter_by(request_type_id=req.type_id)),
+        ("steps of a workflow", db.select(ApprovalStep).filter_by(workflow_id=1).order_by(ApprovalStep.step_order)),
+        ("approvals of a request", db.select(RequestApproval).join(ApprovalStep)
+            .filter(RequestApproval.request_id == req.id).order_by(ApprovalStep.step_order)),
+        ("latest approval", db.select(Request.latest_approval.property.entity)
+            .where(with_parent(req, Request.latest_approval))),
+        ("approval timelines of a page", timelines[-1]),
+        ("approvals of a pending approvals page", page_approvals),
+        ("my requests", db.select(Request).filter(Request.requester_id == user.id)
+            .order_by(Request.id.desc()).limit(25)),
+        ("my requests by status", db.select(Request)
+            .filter(Request.requester_id == user.id, Request.status == 'returned')),
+        ("requests by status", db.select(Request).filter(Request.status == 'rejected')),
+        ("inbox of a role", db.select(Request).filter(Request.current_role_id == 3)
+            .order_by(Request.id.desc()).limit(25)),
+    ]
+
+def query_plan(db, query):
+    """EXPLAIN QUERY PLAN detail lines for a select or a (sql, parameters) pair."""
+    if isinstance(query, tuple):
+        sql, parameters = query
+    else:
+        compiled = query.compile(db.engine, compile_kwargs={"render_postcompile": True})
+        sql = str(compiled)
+        parameters = tuple(compiled.params[name] for name in compiled.positiontup)
+    with db.engine.connect() as conn:
+        return [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql, parameters)]
+
+def full_scans(plan):
+    """Plan lines that read a whole table; scans of subqueries are fine."""
+    return [line for line in plan
+            if line.startswith("SCAN ") and not line.startswith(("SCAN (subquery", "SCAN anon_"))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests to seed")
+    parser.add_argument("--verbose", action="store_true", help="Print every query plan")
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bancroff_plans_"), "plans.db")
+    app = create_bench_app(db_path)
+    failures = 0
+    try:
+        with app.app_context():
+            from models import db
+            # Rebuild the schema from the migrations so indexes missing there are caught too
+            db.drop_all()
+            db.session.execute(db.text("DROP TABLE IF EXISTS alembic_version"))
+            db.session.commit()
+            upgrade()
+            from utils.data_helpers import initialize_database
+            from form_schema import rcl_form_schema, withdrawal_form_schema
+            initialize_database(rcl_form_schema, withdrawal_form_schema)
+            email = seed_requests(args.requests)
+
+            for description, query in hot_queries(db, email):
+                plan = query_plan(db, query)
+                scans = full_scans(plan)
+                failures += bool(scans)
+                print(f"{'FULL SCAN' if scans else 'ok':<10} {description}")
+                for line in (plan if args.verbose else scans):
+                    print(f"           {line}")
+    finally:
+        os.remove(db_path)
+
+    if failures:
+        print(f"FAIL: {failures} hot queries scan a whole table")
+        sys.exit(1)
+    print("OK: every hot query uses an index")
+
+if __name__ == "__main__":
+    main()
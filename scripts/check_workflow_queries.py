@@ -0,0 +1,75 @@
+"""
+Check that submitting requests and listing them reads request types,
+workflows, steps and roles from the workflow registry instead of the database.
+
+Seeds a SQLite database, submits requests of each type through
+submit_request() and renders the request lists, and counts the statements
+that select from the workflow tables on their own (joins used to filter or
+order requests do not count). Exits with status 1 if there are any.
+Run from the repository root:
+python -m scripts.check_workflow_queries
+"""
+import argparse
+import random
+import re
+import sys
+
+from sqlalchemy import event
+from scripts.bench_pending_approvals import (create_bench_app, seed_requests, form_data_for, login, bench_database,
+                                            remove_bench_database)
+
+# A query of one of the workflow tables, rather than a join to them
+WORKFLOW_QUERY = re.compile(r"\bFROM (roles|request_types|approval_workflows|approval_steps)\b(?!\s+JOIN)",
+                            re.IGNORECASE)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Requests to seed")
+    parser.add_argument("--submissions", type=int, default=20, help="Requests submitted per type while counting")
+    args = parser.parse_args()
+
+    from models import db, User
+    from utils.submissions import submit_request
+    database = bench_database(None, "bancroff_workflows_")
+    try:
+        app = create_bench_app(database)
+        with app.app_context():
+            email = seed_requests(args.requests, type_names=('RCL', 'Withdrawal'))
+            requester_id = User.query.filter_by(email=email).one().id
+        client = app.test_client()
+        login(client, email)
+        urls = ["/pending_approvals", "/my_requests", "/approval_management", "/available_forms"]
+        for url in urls:
+            client.get(url)
+
+        statements = []
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if WORKFLOW_QUERY.search(statement):
+                statements.append(statement)
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            rng = random.Random(1)
+            with app.app_context():
+                for type_name in ('RCL', 'Withdrawal'):
+                    for _ in range(args.submissions):
+                        submit_request(type_name, requester_id, f"{type_name} Request", form_data_for(type_name, rng))
+            for url in urls:
+                if client.get(url).status_code != 200:
+                    raise RuntimeError(f"{url} failed")
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+    finally:
+        remove_bench_database(database)
+
+    print(f"{len(statements)} workflow table queries for {2 * args.submissions} submissions and {len(urls)} pages")
+    for statement in statements:
+        print(" ", " ".join(statement.split())[:120])
+    if statements:
+        print("FAILED: workflow metadata was read from the database")
+        sys.exit(1)
+    print("OK: workflow metadata came from the registry")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Reconcile the document registry with the document store once.
+
+Registers stored documents that are referenced but missing from the registry,
+drops records whose document is gone and deletes unreferenced documents older
+than the grace period. `python app.py` does this every
+DOCUMENT_RECONCILE_INTERVAL seconds, but a WSGI server does not, so schedule
+this script (from cron, say) when the app is served by one.
+Run from the repository root:
+python -m scripts.reconcile_documents --grace 3600
+"""
+import argparse
+import config
+from app import app
+from utils.document_registry import reconcile_documents
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--grace", type=int, default=config.DOCUMENT_ORPHAN_GRACE,
+                        help="Seconds an unreferenced document is kept before it is deleted")
+    args = parser.parse_args()
+
+    with app.app_context():
+        counts = reconcile_documents(args.grace)
+    for name, count in counts.items():
+        print(f"{name:<16} {count}")
+
+if __name__ == "__main__":
+    main()
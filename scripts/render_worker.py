@@ -0,0 +1,29 @@
+"""
+Run PDF render workers outside the web process.
+
+`python app.py` starts RENDER_WORKERS workers itself, but a WSGI server does
+not: when the app is served by one with RENDER_WORKERS above 0, renders are
+only queued and this script must run alongside it to process them. With
+RENDER_WORKERS=0 the web process renders inline and no worker is needed.
+Run from the repository root:
+python -m scripts.render_worker --workers 4
+"""
+import argparse
+import config
+from utils.render_queue import start_worker_pool
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=config.RENDER_WORKERS or 1)
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to wait when the queue is empty")
+    parser.add_argument("--app-factory", default="app_factory:create_app",
+                        help="Import path of the factory each worker builds its app with")
+    args = parser.parse_args()
+
+    workers = start_worker_pool(args.workers, args.app_factory, args.poll_interval)
+    print(f"Started {len(workers)} render workers")
+    for worker in workers:
+        worker.join()
+
+if __name__ == "__main__":
+    main()
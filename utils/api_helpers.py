@@ -0,0 +1,183 @@
+import base64
+import gzip
+import hashlib
+import json
+import zlib
+from collections import namedtuple
+from datetime import date, datetime
+from flask import Response, current_app, request, stream_with_context, url_for
+from models import db
+
+# Bodies smaller than this are sent uncompressed, gzip would barely shrink them
+GZIP_MIN_SIZE = 1024
+
+# The list arguments of a request to an /api/ endpoint
+ListArgs = namedtuple('ListArgs', ['fields', 'after', 'limit', 'ndjson'])
+
+def encode_cursor(values):
+    """An opaque cursor for the sort key of the last row of a page."""
+    return base64.urlsafe_b64encode(json.dumps(list(values), default=json_default).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, length):
+    """The sort key encoded in a cursor, as a list of `length` values. Raises ValueError if it is not valid."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != length:
+        raise ValueError('Invalid cursor')
+    return values
+
+def parse_fields(value, allowed, default):
+    """Field names from a comma-separated `fields` argument, in the order given. Raises ValueError for unknown names."""
+    if not value:
+        return list(default)
+    fields = list(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in allowed]
+    if unknown or not fields:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}; choose from {', '.join(allowed)}")
+    return fields
+
+def parse_limit(value):
+    """The page size from a `limit` argument, API_PAGE_SIZE by default and at most API_MAX_PAGE_SIZE."""
+    if value is None:
+        return current_app.config['API_PAGE_SIZE']
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError('limit must be a whole number')
+    if limit < 1:
+        raise ValueError('limit must be at least 1')
+    return min(limit, current_app.config['API_MAX_PAGE_SIZE'])
+
+def parse_datetime(name):
+    """The ISO 8601 date or time in the argument `name`, or None. Raises ValueError if it cannot be read."""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO 8601 date or time")
+
+def parse_list_args(allowed_fields, default_fields):
+    """
+    The fields, cursor position, page size and format asked for, as ListArgs.
+    NDJSON exports are unlimited unless ?limit= is given. Raises ValueError
+    for arguments that cannot be used.
+    """
+    fields = parse_fields(request.args.get('fields'), allowed_fields, default_fields)
+    after = None
+    if 'cursor' in request.args:
+        after = decode_cursor(request.args['cursor'], 1)[0]
+        # Lists are paged by integer ids; anything else would only fail in the database
+        if not isinstance(after, int) or isinstance(after, bool):
+            raise ValueError('Invalid cursor')
+    ndjson = wants_ndjson()
+    limit = None if ndjson and 'limit' not in request.args else parse_limit(request.args.get('limit'))
+    return ListArgs(fields, after, limit, ndjson)
+
+def wants_ndjson():
+    """True when the client asked for newline-delimited JSON, with ?format=ndjson or an Accept header."""
+    if request.args.get('format') == 'ndjson':
+        return True
+    return request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson']) == 'application/x-ndjson'
+
+def wants_gzip():
+    return 'gzip' in request.accept_encodings
+
+def api_etag(*versions):
+    """A weak ETag for a response built from data at the given versions and the request's arguments."""
+    key = json.dumps([versions, sorted(request.args.items(multi=True)), wants_ndjson()])
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def not_modified(etag):
+    """A 304 response if the client already has the representation tagged `etag`, else None."""
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag, weak=True)
+        return response
+    return None
+
+def json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+_encoder = json.JSONEncoder(default=json_default)
+
+def row_dict(row, fields):
+    mapping = row._mapping
+    return {name: mapping[name] for name in fields}
+
+def list_response(query, key, args, etag=None, descending=False):
+    """
+    The rows of `query` (a select of labelled columns named after the
+    fields) for ListArgs `args`, ordered and paged by the unique column `key`.
+
+    JSON responses hold up to args.limit rows, and link the next page in the
+    Link header when there is one. NDJSON responses stream every row after
+    the cursor, fetched API_STREAM_BATCH_SIZE at a time.
+    """
+    query = query.add_columns(key.label('cursor_key'))
+    if args.after is not None:
+        query = query.where(key < args.after if descending else key > args.after)
+    query = query.order_by(key.desc() if descending else key)
+    if args.ndjson:
+        if args.limit:
+            query = query.limit(args.limit)
+        result = db.session.execute(query.execution_options(yield_per=current_app.config['API_STREAM_BATCH_SIZE']))
+        return ndjson_stream(result, args.fields, etag)
+    rows = db.session.execute(query.limit(args.limit + 1))
+    return json_page(rows, args.fields, args.limit, lambda row: [row.cursor_key], etag)
+
+def json_page(rows, fields, limit, sort_key, etag=None):
+    """
+    A JSON list of up to `limit` rows with their `fields`. `rows` holds one
+    row more than a page when there is a next one, which is then linked with
+    a cursor built from sort_key(last row) in the Link header.
+    """
+    rows = list(rows)
+    body = _encoder.encode([row_dict(row, fields) for row in rows[:limit]]).encode()
+    response = Response(mimetype='application/json')
+    if wants_gzip() and len(body) >= GZIP_MIN_SIZE:
+        body = gzip.compress(body, compresslevel=current_app.config['API_GZIP_LEVEL'])
+        response.headers['Content-Encoding'] = 'gzip'
+    response.set_data(body)
+    if len(rows) > limit:
+        args = request.args.to_dict()
+        args['cursor'] = encode_cursor(sort_key(rows[limit - 1]))
+        response.headers['Link'] = f'<{url_for(request.endpoint, **args)}>; rel="next"'
+    return _api_headers(response, etag)
+
+def ndjson_stream(result, fields, etag=None):
+    """
+    A streamed response with one JSON object per row of `result`, written a
+    batch at a time as the rows are fetched (see the yield_per option), and
+    gzipped batch by batch when the client accepts it.
+    """
+    def generate():
+        for rows in result.partitions():
+            yield ''.join(_encoder.encode(row_dict(row, fields)) + '\n' for row in rows).encode()
+
+    def generate_gzip(level):
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip header and trailer
+        for chunk in generate():
+            # Flushed so each batch reaches the client as soon as it is read
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+    if wants_gzip():
+        response = Response(stream_with_context(generate_gzip(current_app.config['API_GZIP_LEVEL'])),
+                            mimetype='application/x-ndjson')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    return _api_headers(response, etag)
+
+def _api_headers(response, etag):
+    response.vary.add('Accept-Encoding')
+    if etag:
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
@@ -0,0 +1,173 @@
+from collections import namedtuple
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import joinedload, selectinload
+from models import db, Role, User, Request, RequestApproval, ApprovalStep
+from utils.workflow_registry import request_type_of, step_of
+
+# Request statuses the pending approvals view can be filtered by
+REQUEST_STATUSES = ['submitted', 'approved', 'rejected', 'returned']
+
+# Filters on the submitted form, mapped to the form_data keys each request type stores them under
+FORM_DATA_FILTERS = {
+    'semester': ['semester'],
+    'ps_id': ['ps_id', 'myUHID'],
+    'withdrawal_type': ['withdrawalType'],
+}
+
+def form_data_filter(name, value):
+    """
+    SQL condition matching requests whose form has `value` for the filter `name`
+    (a key of FORM_DATA_FILTERS).
+
+    On PostgreSQL this is a JSONB containment test (form_data @> '{"key": value}')
+    answered from the GIN index on form_data; other databases compare the
+    extracted value, so the filter never has to load forms into Python.
+    """
+    keys = FORM_DATA_FILTERS[name]
+    if db.session.get_bind().dialect.name == 'postgresql':
+        form_data = db.type_coerce(Request.form_data, JSONB)
+        conditions = [form_data.contains({key: value}) for key in keys]
+    else:
+        conditions = [Request.form_data[key].as_string() == value for key in keys]
+    return db.or_(*conditions)
+
+def pending_approvals_page(page=1, per_page=25, role_id=None, status=None, form_filters=None):
+    """
+    One page of requests for the pending approvals view.
+
+    The page is loaded with a count query, one query for the requests joined
+    to their requester, and one query for all of their approvals with each
+    approver, so the number of queries does not depend on how many requests
+    are shown or stored. Types, steps and roles come from the workflow registry.
+
+    Args:
+        page (int): 1-based page number
+        per_page (int): Requests per page
+        role_id (int): Only requests currently waiting on this role
+        status (str): Only requests in this status
+        form_filters (dict): Only requests whose form matches these FORM_DATA_FILTERS values
+
+    Returns:
+        Pagination: Requests on the page, newest first
+    """
+    query = (db.select(Request)
+             .options(joinedload(Request.requester),
+                      selectinload(Request.approvals).joinedload(RequestApproval.approver))
+             .order_by(Request.id.desc()))
+    if status:
+        query = query.filter(Request.status == status)
+    if role_id:
+        # Indexed, so a role's inbox costs as much as the requests waiting on it
+        query = query.filter(Request.current_role_id == role_id)
+    for name, value in (form_filters or {}).items():
+        if value:
+            query = query.filter(form_data_filter(name, value))
+    return db.paginate(query, page=page, per_page=per_page, error_out=False)
+
+def pending_approval_rows(requests, current_user):
+    """
+    Build the rows of the pending approvals table from eager-loaded requests
+    without issuing further queries. Requests without approval steps are skipped.
+    """
+    rows = []
+    for req in requests:
+        steps = {a.id: step_of(a) for a in req.approvals}
+        request_approvals = sorted(req.approvals, key=lambda a: steps[a.id].step_order)
+        if not request_approvals:
+            continue
+
+        # The current pending step, or the last step if none are pending
+        current_step = next((a for a in request_approvals if a.status == 'pending'), request_approvals[-1])
+        step = steps[current_step.id]
+        approver_role = step.approver_role
+
+        can_approve = False
+        if current_step.status == 'pending' or req.status == 'submitted':
+            if 'approve_any_step' in current_user.permissions:
+                can_approve = True
+            elif approver_role and current_user.role_name == approver_role.name:
+                can_approve = True
+            elif current_user.role_id == step.approver_role_id:
+                can_approve = True
+
+        rows.append({
+            'approval_id': current_step.id,
+            'request': req,
+            'request_type': request_type_of(req).name,
+            'requester': req.requester.full_name,
+            'submitted': req.created_at,
+            'step': step.name,
+            'status': req.status,
+            'can_approve': can_approve,
+            'latest_approval': request_approvals[-1],
+            'pdf_path': current_step.pdf_path,
+            'approval_status': [{
+                'step': steps[a.id].name,
+                'status': a.status,
+                'approver': a.approver.full_name if a.approver else 'Pending'
+            } for a in request_approvals],
+            'debug_info': {
+                'user_role_name': current_user.role_name,
+                'user_role_id': current_user.role_id,
+                'step_approver_role_name': approver_role.name if approver_role else "Unknown",
+                'step_approver_role_id': step.approver_role_id,
+                'step_status': current_step.status
+            }
+        })
+    return rows
+
+# One approval step of a request's timeline
+TimelineStep = namedtuple('TimelineStep', ['id', 'role', 'step', 'status', 'approver', 'comments'])
+
+# A request with its approval timeline, as shown by my_requests and approval_management
+RequestRow = namedtuple('RequestRow', ['id', 'title', 'status', 'request_type', 'requester', 'created_at',
+                                       'latest_approval_id', 'approval_status'])
+
+def approval_timelines(request_ids):
+    """
+    Load the approval steps of many requests in one query.
+    Returns a dict mapping each request id to its TimelineSteps in step order.
+    """
+    timelines = {request_id: [] for request_id in request_ids}
+    if not timelines:
+        return timelines
+    rows = (db.session.query(RequestApproval.request_id, RequestApproval.id, Role.name, ApprovalStep.name,
+                             RequestApproval.status, User.full_name, RequestApproval.comments)
+            .join(ApprovalStep, RequestApproval.step_id == ApprovalStep.id)
+            .outerjoin(Role, ApprovalStep.approver_role_id == Role.id)
+            .outerjoin(User, RequestApproval.approver_id == User.id)
+            .filter(RequestApproval.request_id.in_(timelines))
+            .order_by(RequestApproval.request_id, ApprovalStep.step_order))
+    for request_id, approval_id, role, step, status, approver, comments in rows:
+        timelines[request_id].append(TimelineStep(approval_id, role or "Unknown", step, status,
+                                                  approver or 'Pending', comments))
+    return timelines
+
+def request_rows_page(query, page=1, per_page=25):
+    """
+    Paginate a select of Requests and attach each request's approval timeline.
+
+    Takes a count query, one query for the requests with their requester and
+    one for all of their approvals, whatever the page size.
+
+    Returns:
+        tuple: (pagination, list of RequestRow)
+    """
+    query = query.options(joinedload(Request.requester))
+    pagination = db.paginate(query, page=page, per_page=per_page, error_out=False)
+    timelines = approval_timelines([req.id for req in pagination.items])
+    rows = []
+    for req in pagination.items:
+        timeline = timelines[req.id]
+        rows.append(RequestRow(
+            id=req.id,
+            title=req.title,
+            status=req.status,
+            request_type=request_type_of(req).name,
+            requester=req.requester.full_name if req.requester else "Unknown",
+            created_at=req.created_at,
+            # The approval of the last step, which carries the request's latest document
+            latest_approval_id=timeline[-1].id if timeline else None,
+            approval_status=timeline,
+        ))
+    return pagination, rows
@@ -1,43 +1,145 @@
+import threading
+import time
 import uuid
-import msal
-from flask import url_for, session
+from collections import namedtuple
+from flask import url_for, session, g, current_app, has_request_context, jsonify
 from functools import wraps
 from flask import redirect, flash, url_for
+from utils.rbac import role_permissions, NO_PERMISSIONS
+from utils.msal_client import get_msal_client
 
-def admin_required(f):
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if session.get("role") != "admin":
-            flash("You do not have permission to access this page.", "danger")
-            return redirect(url_for("index"))
-        return f(*args, **kwargs)
-    return decorated_function
+# The signed-in user with their role and permission names, as resolved for a request
+CurrentUser = namedtuple('CurrentUser', ['id', 'email', 'full_name', 'status', 'role_id', 'role_name',
+                                         'permissions', 'signature_path'])
 
-def management_access_required(f):
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        allowed_roles = ["admin", "chair", "dean", "advisor"]
-        if session.get("role") not in allowed_roles:
-            flash("You do not have permission to access this page.", "danger")
-            return redirect(url_for("index"))
-        return f(*args, **kwargs)
-    return decorated_function
+# Guards each app's cache of email -> (expiry, CurrentUser), shared by the threads of this process
+_user_cache_lock = threading.Lock()
+
+def _user_cache():
+    return current_app.extensions.setdefault('current_user_cache', {})
+
+def _load_user(email):
+    """Read a user, their role and its permissions from the database."""
+    from models import db, User, Role
+    row = (db.session.query(User.id, User.email, User.full_name, User.status, User.role_id, Role.name,
+                            User.signature_path)
+           .outerjoin(Role, User.role_id == Role.id)
+           .filter(User.email == email)
+           .first())
+    if row is None:
+        return None
+    return CurrentUser(*row[:6], NO_PERMISSIONS, row.signature_path)
+
+def get_current_user():
+    """
+    The signed-in user as a CurrentUser, or None if nobody is signed in or
+    their account no longer exists.
+
+    Resolved once per request and kept on flask.g. Found users are also kept
+    in a per-process cache for CURRENT_USER_CACHE_TTL seconds, so most requests
+    do not query the users table at all. Their permissions are those of their
+    role in utils.rbac.
+    """
+    if 'current_user' not in g:
+        user_info = session.get('user')
+        email = (user_info or {}).get('preferred_username')
+        user = _cached_user(email.lower()) if email else None
+        # Permissions come from the shared role snapshot, so role changes apply without reloading users
+        g.current_user = user._replace(permissions=role_permissions(user.role_id)) if user else None
+    return g.current_user
+
+def _cached_user(email):
+    ttl = current_app.config['CURRENT_USER_CACHE_TTL']
+    now = time.monotonic()
+    with _user_cache_lock:
+        entry = _user_cache().get(email)
+    if entry and entry[0] > now:
+        return entry[1]
+    user = _load_user(email)
+    # Unknown emails are not cached, so an account created at sign-in is found straight away
+    if user and ttl:
+        with _user_cache_lock:
+            _user_cache()[email] = (now + ttl, user)
+    return user
+
+def invalidate_user_cache(user_id):
+    """Forget the cached copy of a user after their account, role or signature changes."""
+    with _user_cache_lock:
+        cache = _user_cache()
+        for email, (expiry, user) in list(cache.items()):
+            if user.id == user_id:
+                del cache[email]
+    if has_request_context() and getattr(g.get('current_user'), 'id', None) == user_id:
+        g.pop('current_user')
+
+def permission_required(*permissions):
+    """
+    Only let users whose role has all of the given permissions into the view.
+    The check is a subset test against the user's permission frozenset.
+    """
+    required = frozenset(permissions)
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            user = get_current_user()
+            if not user:
+                return redirect(url_for("login"))
+            if not required <= user.permissions:
+                flash("You do not have permission to access this page.", "danger")
+                return redirect(url_for("index"))
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+def api_permission_required(*permissions):
+    """
+    permission_required for JSON endpoints: answers 401 when nobody is signed
+    in and 403 when the user is deactivated or lacks a permission, instead of
+    redirecting to a page.
+    """
+    required = frozenset(permissions)
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            user = get_current_user()
+            if not user:
+                return jsonify({'error': 'Sign in to use this endpoint'}), 401
+            if user.status == "deactivated" or not required <= user.permissions:
+                return jsonify({'error': 'You do not have permission to use this endpoint'}), 403
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+admin_required = permission_required('manage_roles')
+
+management_access_required = permission_required('manage_users')
 
 def active_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if session.get("status") == "deactivated":
+        user = get_current_user()
+        if user and user.status == "deactivated":
             flash("Your account is deactivated. Please contact the administrator.", "danger")
             return redirect(url_for("index"))
         return f(*args, **kwargs)
     return decorated_function
 
-def build_auth_url(client_id, authority, scope, redirect_uri):
+def can_view_request(user, request_obj):
+    """
+    Whether a user may see a request and its documents: its requester, an
+    approver on it (one who has acted on a step, or whose role a step waits
+    on), or anyone with view_all_requests.
+    """
+    from utils.workflow_registry import step_of
+    if user.id == request_obj.requester_id or 'view_all_requests' in user.permissions:
+        return True
+    return any(approval.approver_id == user.id or step_of(approval).approver_role_id == user.role_id
+               for approval in request_obj.approvals)
+
+def build_auth_url(client_id, client_secret, authority, scope, redirect_uri):
     session["state"] = str(uuid.uuid4())
-    msal_app = msal.ConfidentialClientApplication(
-        client_id, authority=authority, client_credential=None
-    )
-    auth_url = msal_app.get_authorization_request_url(
+    auth_url = get_msal_client(client_id, authority, client_secret).call(
+        "get_authorization_request_url",
         scopes=scope,
         state=session["state"],
         redirect_uri=redirect_uri
@@ -45,10 +147,8 @@ def build_auth_url(client_id, authority, scope, redirect_uri):
     return auth_url
 
 def get_token_from_code(client_id, client_secret, authority, code, scope, redirect_uri):
-    msal_app = msal.ConfidentialClientApplication(
-        client_id, authority=authority, client_credential=client_secret
-    )
-    result = msal_app.acquire_token_by_authorization_code(
+    result = get_msal_client(client_id, authority, client_secret).call(
+        "acquire_token_by_authorization_code",
         code,
         scopes=scope,
         redirect_uri=redirect_uri
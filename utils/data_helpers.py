@@ -1,6 +1,8 @@
 from faker import Faker
 from models import db, User, Role, Permission, RolePermission
 from models import RequestType, ApprovalWorkflow, ApprovalStep
+from utils.rbac import DEFAULT_ROLE_PERMISSIONS, invalidate_permissions
+from utils.workflow_registry import invalidate_workflows
 
 def add_fake_data(num_users=5):
     fake = Faker()
@@ -46,6 +48,7 @@ def add_fake_data(num_users=5):
     except Exception as e:
         print(f"An error occurred: {e}")
         db.session.rollback()
+    invalidate_workflows()
 
 def add_rcl_data(rcl_form_schema):
     """Add RCL (Reduced Course Load) related data to the database"""
@@ -134,6 +137,7 @@ def add_rcl_data(rcl_form_schema):
     except Exception as e:
         print(f"An error occurred while adding RCL data: {e}")
         db.session.rollback()
+    invalidate_workflows()
 
 def add_withdrawal_form_data(withdrawal_form_schema):
     """Add Withdrawal form related data to the database"""
@@ -222,6 +226,7 @@ def add_withdrawal_form_data(withdrawal_form_schema):
     except Exception as e:
         print(f"An error occurred while adding Withdrawal form data: {e}")
         db.session.rollback()
+    invalidate_workflows()
 
 def add_email_alias_voe_data():
     """
@@ -262,6 +267,26 @@ def add_email_alias_voe_data():
     except Exception as e:
         print(f"An error occurred while adding Email Alias & VOE data: {e}")
         db.session.rollback()
+    invalidate_workflows()
+
+def add_permission_data():
+    """Give the approval roles the permissions the application checks (see utils.rbac)"""
+    try:
+        for permission_name, role_names in DEFAULT_ROLE_PERMISSIONS.items():
+            permission = Permission.query.filter_by(name=permission_name).first()
+            if not permission:
+                permission = Permission(name=permission_name)
+                db.session.add(permission)
+                db.session.flush()
+            for role in Role.query.filter(Role.name.in_(role_names)):
+                if not db.session.get(RolePermission, (role.id, permission.id)):
+                    db.session.add(RolePermission(role_id=role.id, permission_id=permission.id))
+        db.session.commit()
+        invalidate_permissions()
+        print("Role permissions added")
+    except Exception as e:
+        db.session.rollback()
+        print(f"An error occurred while adding role permissions: {e}")
 
 def initialize_database(rcl_form_schema, withdrawal_form_schema):
     """Initialize the database with necessary data"""
@@ -269,3 +294,4 @@ def initialize_database(rcl_form_schema, withdrawal_form_schema):
     add_rcl_data(rcl_form_schema)
     add_withdrawal_form_data(withdrawal_form_schema)
     add_email_alias_voe_data()  # <-- call your new function here
+    add_permission_data()
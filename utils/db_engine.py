@@ -0,0 +1,58 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+def is_sqlite_file(database_uri):
+    """True for SQLite databases stored in a file (not in memory)."""
+    url = make_url(database_uri)
+    database = url.database or ''
+    return (url.get_backend_name() == 'sqlite' and database not in ('', ':memory:')
+            and not database.startswith('file::memory:') and url.query.get('mode') != 'memory')
+
+def engine_options(database_uri, pool_size, max_overflow, pool_timeout, busy_timeout=None):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for the application database.
+
+    Sizes the connection pool (in-memory SQLite keeps Flask-SQLAlchemy's single
+    shared connection) and, when busy_timeout is given for a SQLite file, makes
+    the driver wait that many milliseconds for a lock instead of failing with
+    "database is locked".
+    """
+    url = make_url(database_uri)
+    if url.get_backend_name() == 'sqlite' and not is_sqlite_file(database_uri):
+        return {}
+
+    options = {
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': pool_timeout,
+    }
+    if busy_timeout is not None and is_sqlite_file(database_uri):
+        options['connect_args'] = {'timeout': busy_timeout / 1000}
+    return options
+
+def configure_sqlite(engine, pragmas, busy_timeout):
+    """
+    Apply PRAGMA settings to every new connection of a SQLite file engine.
+
+    journal_mode=WAL lets readers carry on while a request is being written,
+    which is what removes the "database is locked" stalls under concurrent
+    approvals. It is stored in the database file; the other pragmas only last
+    for the connection, hence the connect hook.
+    """
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f"PRAGMA busy_timeout = {int(busy_timeout)}")
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+    event.listen(engine, 'connect', set_pragmas)
+
+def configure_database(app, db):
+    """Tune the application's engine according to its SQLite settings."""
+    if not app.config['SQLITE_TUNING'] or not is_sqlite_file(app.config['SQLALCHEMY_DATABASE_URI']):
+        return
+    with app.app_context():
+        configure_sqlite(db.engine, app.config['SQLITE_PRAGMAS'], app.config['SQLITE_BUSY_TIMEOUT'])
@@ -0,0 +1,122 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from models import db, ApprovalDocument, DocumentRecord, Request, RequestApproval
+from utils.document_store import DatabaseDocumentStore, FilesystemDocumentStore, store_for_key
+
+# File names the PDF generators produce in pdf/
+GENERATED_PDF = re.compile(r'^(rcl|withdrawal|approval)_\d+_\d+\.pdf$')
+
+def latest_request_document(request_id):
+    """
+    Newest registered document of a request that still exists in its store.
+    Uses the (request_id, created_at) index, so it does not depend on how
+    many documents are stored.
+    """
+    records = (DocumentRecord.query
+               .filter_by(request_id=request_id)
+               .order_by(DocumentRecord.created_at.desc(), DocumentRecord.id.desc())
+               .limit(5)
+               .all())
+    for record in records:
+        if store_for_key(record.storage_key).exists(record.storage_key):
+            return record
+    return None
+
+def _referenced_documents():
+    """Map each document key in use to the (request_id, approval_id) that points at it."""
+    referenced = {}
+    for approval_id, request_id, key in (db.session.query(RequestApproval.id, RequestApproval.request_id,
+                                                          RequestApproval.pdf_path)
+                                         .filter(RequestApproval.pdf_path.isnot(None))):
+        referenced[key] = (request_id, approval_id)
+    for request_id, key in (db.session.query(Request.id, Request.final_document_path)
+                            .filter(Request.final_document_path.isnot(None))):
+        referenced[key] = (request_id, None)
+    return referenced
+
+def _stored_documents(fs_store):
+    """Map every key in both stores to the time the document was stored."""
+    stored = {}
+    if os.path.isdir(fs_store.root):
+        for entry in os.scandir(fs_store.root):
+            if GENERATED_PDF.match(entry.name) and entry.is_file():
+                stored[entry.name] = datetime.fromtimestamp(entry.stat().st_mtime)
+    for document_id, created_at in db.session.query(ApprovalDocument.id, ApprovalDocument.created_at):
+        stored[f"{DatabaseDocumentStore.prefix}{document_id}"] = created_at
+    return stored
+
+def _digest(store, key):
+    size = store.size(key)
+    digest = hashlib.sha256()
+    for chunk in store.iter_range(key, 0, size):
+        digest.update(chunk)
+    return size, digest.hexdigest()
+
+def reconcile_documents(grace_seconds=3600):
+    """
+    Bring the document registry in line with what is actually stored.
+
+    - Records whose document no longer exists are dropped.
+    - Stored documents that no request or approval points at are deleted once
+      they are older than grace_seconds (younger ones may belong to a render
+      that has not been saved yet).
+    - Referenced documents without a record are registered.
+
+    Returns a dict counting each kind of change.
+    """
+    fs_store = FilesystemDocumentStore(os.path.join(current_app.root_path, 'pdf'))
+    stored = _stored_documents(fs_store)
+    referenced = _referenced_documents()
+    records = {record.storage_key: record for record in DocumentRecord.query}
+    cutoff = datetime.now() - timedelta(seconds=grace_seconds)
+    counts = {'dropped_records': 0, 'deleted_orphans': 0, 'registered': 0}
+
+    for key, record in records.items():
+        if key not in stored:
+            db.session.delete(record)
+            counts['dropped_records'] += 1
+
+    for key, stored_at in stored.items():
+        if key in referenced:
+            continue
+        record = records.get(key)
+        created_at = record.created_at if record else stored_at
+        if created_at and created_at < cutoff:
+            store_for_key(key).delete(key)
+            if record:
+                db.session.delete(record)
+            counts['deleted_orphans'] += 1
+
+    for key, (request_id, approval_id) in referenced.items():
+        if key in stored and key not in records:
+            size, sha256 = _digest(store_for_key(key), key)
+            db.session.add(DocumentRecord(storage_key=key, request_id=request_id, approval_id=approval_id,
+                                          size=size, sha256=sha256, created_at=stored[key]))
+            counts['registered'] += 1
+
+    db.session.commit()
+    return counts
+
+def start_document_reconciler(app, interval, grace_seconds):
+    """Run reconcile_documents every `interval` seconds in a daemon thread."""
+    def run():
+        while True:
+            time.sleep(interval)
+            with app.app_context():
+                try:
+                    counts = reconcile_documents(grace_seconds)
+                    app.logger.info(f"Document registry reconciled: {counts}")
+                except Exception as e:
+                    db.session.rollback()
+                    app.logger.error(f"Document reconciler error: {e}")
+                finally:
+                    db.session.remove()
+
+    thread = threading.Thread(target=run, name="document-reconciler", daemon=True)
+    thread.start()
+    return thread
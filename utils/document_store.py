@@ -0,0 +1,182 @@
+import hashlib
+import os
+from datetime import datetime
+from flask import Response, current_app, request, send_file, stream_with_context
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
+from models import db, ApprovalDocument, DocumentRecord
+
+# Bytes read from storage per chunk when streaming a document
+CHUNK_SIZE = 64 * 1024
+
+class FilesystemDocumentStore:
+    """Keeps documents as files in a directory; the key is the file name."""
+    name = 'filesystem'
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, key):
+        # Keys are plain file names; never let one escape the store directory
+        return os.path.join(self.root, os.path.basename(key))
+
+    def save(self, pdf_path):
+        """Add the PDF at pdf_path to the store and return its key."""
+        key = os.path.basename(pdf_path)
+        target = self.path(key)
+        if os.path.abspath(pdf_path) != os.path.abspath(target):
+            os.makedirs(self.root, exist_ok=True)
+            os.replace(pdf_path, target)
+        return key
+
+    def exists(self, key):
+        return bool(key) and os.path.isfile(self.path(key))
+
+    def size(self, key):
+        return os.path.getsize(self.path(key))
+
+    def iter_range(self, key, start, length, chunk_size=CHUNK_SIZE):
+        with open(self.path(key), 'rb') as f:
+            f.seek(start)
+            while length > 0:
+                chunk = f.read(min(chunk_size, length))
+                if not chunk:
+                    break
+                length -= len(chunk)
+                yield chunk
+
+    def delete(self, key):
+        if self.exists(key):
+            os.remove(self.path(key))
+
+    def send(self, key):
+        # Werkzeug streams the file and handles Range and conditional requests itself
+        return send_file(self.path(key), mimetype='application/pdf', conditional=True)
+
+class DatabaseDocumentStore:
+    """Keeps documents as blobs in the approval_documents table; keys look like 'db:<id>'."""
+    name = 'database'
+    prefix = 'db:'
+
+    def _id(self, key):
+        if not key or not key.startswith(self.prefix):
+            return None
+        try:
+            return int(key[len(self.prefix):])
+        except ValueError:
+            return None
+
+    def save(self, pdf_path):
+        """Copy the PDF at pdf_path into the database, remove the file and return its key."""
+        with open(pdf_path, 'rb') as f:
+            data = f.read()
+        document = ApprovalDocument(filename=os.path.basename(pdf_path), size=len(data), pdf_data=data)
+        db.session.add(document)
+        db.session.commit()
+        os.remove(pdf_path)
+        return f"{self.prefix}{document.id}"
+
+    def exists(self, key):
+        document_id = self._id(key)
+        return document_id is not None and db.session.query(
+            ApprovalDocument.query.filter_by(id=document_id).exists()).scalar()
+
+    def size(self, key):
+        document_id = self._id(key)
+        size, actual = (db.session.query(ApprovalDocument.size, db.func.length(ApprovalDocument.pdf_data))
+                        .filter(ApprovalDocument.id == document_id)
+                        .one())
+        return size if size is not None else actual
+
+    def iter_range(self, key, start, length, chunk_size=CHUNK_SIZE):
+        """Read the blob in slices with SUBSTR so it is never loaded whole."""
+        document_id = self._id(key)
+        while length > 0:
+            count = min(chunk_size, length)
+            chunk = (db.session.query(db.func.substr(ApprovalDocument.pdf_data, start + 1, count))
+                     .filter(ApprovalDocument.id == document_id)
+                     .scalar())
+            if not chunk:
+                break
+            yield bytes(chunk)
+            start += len(chunk)
+            length -= len(chunk)
+
+    def delete(self, key):
+        ApprovalDocument.query.filter_by(id=self._id(key)).delete()
+        db.session.commit()
+
+    def send(self, key):
+        return stream_document(self, key)
+
+def stream_document(store, key):
+    """
+    Stream a stored document in chunks, answering Range requests with 206
+    Partial Content so viewers can fetch pages on demand.
+    """
+    size = store.size(key)
+    start, stop, status = 0, size, 200
+    # Multi-range requests are answered with the whole document
+    if request.range is not None and request.range.units == 'bytes' and len(request.range.ranges) == 1:
+        byte_range = request.range.range_for_length(size)
+        if byte_range is None:
+            raise RequestedRangeNotSatisfiable(length=size)
+        start, stop = byte_range
+        status = 206
+
+    response = Response(stream_with_context(store.iter_range(key, start, stop - start)),
+                        status=status, mimetype='application/pdf', direct_passthrough=True)
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.content_length = stop - start
+    if status == 206:
+        response.headers['Content-Range'] = f"bytes {start}-{stop - 1}/{size}"
+    return response
+
+def get_document_store():
+    """The store new documents are saved to, chosen with DOCUMENT_STORE in config.py."""
+    if current_app.config.get('DOCUMENT_STORE') == DatabaseDocumentStore.name:
+        return DatabaseDocumentStore()
+    return FilesystemDocumentStore(os.path.join(current_app.root_path, 'pdf'))
+
+def store_for_key(key):
+    """The store holding `key`, so documents saved before a backend switch stay readable."""
+    if key and key.startswith(DatabaseDocumentStore.prefix):
+        return DatabaseDocumentStore()
+    return FilesystemDocumentStore(os.path.join(current_app.root_path, 'pdf'))
+
+def file_digest(path):
+    """Return (size, sha256 hex digest) of a file, reading it in chunks."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+            size += len(chunk)
+    return size, digest.hexdigest()
+
+def save_document(pdf_path, request_id=None, approval_id=None):
+    """
+    Move a freshly generated PDF into the configured store, record it in the
+    document registry and return its key.
+    """
+    size, sha256 = file_digest(pdf_path)
+    key = get_document_store().save(pdf_path)
+
+    # Keys can repeat when a document is regenerated within the same second
+    record = DocumentRecord.query.filter_by(storage_key=key).first()
+    if record is None:
+        record = DocumentRecord(storage_key=key)
+        db.session.add(record)
+    record.request_id = request_id
+    record.approval_id = approval_id
+    record.size = size
+    record.sha256 = sha256
+    record.created_at = datetime.now()
+    db.session.commit()
+    return key
+
+def document_exists(key):
+    return store_for_key(key).exists(key)
+
+def send_document(key):
+    """Response streaming the stored document."""
+    return store_for_key(key).send(key)
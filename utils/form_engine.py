@@ -0,0 +1,148 @@
+import re
+from collections import namedtuple
+from datetime import date
+
+# Values of a checkbox or yes/no radio that mean True
+TRUE_VALUES = frozenset(['yes', 'on', 'true', '1'])
+
+# A field of a compiled form: what templates need to draw it, and the function that reads it from a submission
+FormField = namedtuple('FormField', ['id', 'title', 'widget', 'options', 'required', 'minimum', 'maximum',
+                                     'condition', 'parse'])
+FormSection = namedtuple('FormSection', ['id', 'title', 'description', 'fields'])
+
+class CompiledForm:
+    """
+    A form schema from form_schema.py turned into one parser per field.
+
+    Everything the schema says about a field (its type, choices, pattern,
+    range, whether it is required and when it applies) is worked out once by
+    compile_form(), so parsing a submission only runs the field parsers.
+    """
+
+    def __init__(self, title, description, sections):
+        self.title = title
+        self.description = description
+        self.sections = sections
+        self.fields = tuple(field for section in sections for field in section.fields)
+        self._parsers = tuple((field.id, field.condition, field.parse) for field in self.fields)
+
+    def parse(self, form, **values):
+        """
+        Read and validate a submission. `form` is a MultiDict such as
+        request.form; `values` are filled in by the application and take the
+        place of form fields with the same id (signature_date, for example).
+
+        Returns:
+            tuple: (data, errors) - the field values by id, and an error message
+            by field id for every invalid field. Fields whose condition does not
+            hold are left out of data.
+        """
+        data = {}
+        errors = {}
+        for field_id, condition, parse in self._parsers:
+            if condition and data.get(condition[0]) != condition[1]:
+                continue
+            if field_id in values:
+                data[field_id] = values[field_id]
+                continue
+            value, error = parse(form)
+            data[field_id] = value
+            if error:
+                errors[field_id] = error
+        return data, errors
+
+def _string_parser(field_id, title, required, choices, pattern, date_format):
+    def parse(form):
+        value = form.get(field_id, '').strip()
+        if not value:
+            return value, f"{title} is required" if required else None
+        if choices is not None and value not in choices:
+            return value, f"{title} must be one of {', '.join(sorted(choices))}"
+        if pattern is not None and not pattern.search(value):
+            return value, f"{title} is not in the expected format"
+        if date_format:
+            try:
+                date.fromisoformat(value)
+            except ValueError:
+                return value, f"{title} must be a date (YYYY-MM-DD)"
+        return value, None
+    return parse
+
+def _integer_parser(field_id, title, required, minimum, maximum):
+    if minimum is not None and maximum is not None:
+        range_error = f"{title} must be between {minimum} and {maximum}"
+    elif minimum is not None:
+        range_error = f"{title} must be at least {minimum}"
+    else:
+        range_error = f"{title} must be at most {maximum}"
+    def parse(form):
+        value = form.get(field_id, '').strip()
+        if not value:
+            return None, f"{title} is required" if required else None
+        try:
+            number = int(value)
+        except ValueError:
+            return None, f"{title} must be a whole number"
+        if (minimum is not None and number < minimum) or (maximum is not None and number > maximum):
+            return number, range_error
+        return number, None
+    return parse
+
+def _boolean_parser(field_id, default):
+    def parse(form):
+        value = form.get(field_id)
+        return (value.lower() in TRUE_VALUES if value is not None else default), None
+    return parse
+
+def _array_parser(field_id, title, required, choices, unique):
+    # Checkbox groups may be named "id" or "id[]"
+    names = (field_id, f"{field_id}[]")
+    def parse(form):
+        values = [value for name in names for value in form.getlist(name) if value]
+        if unique:
+            values = list(dict.fromkeys(values))
+        if not values and required:
+            return values, f"{title} is required"
+        if choices is not None and not choices.issuperset(values):
+            return values, f"{title} must be chosen from {', '.join(sorted(choices))}"
+        return values, None
+    return parse
+
+def compile_field(spec):
+    """Compile one field of a schema section into a FormField. Raises ValueError for types it cannot handle."""
+    field_id = spec['id']
+    title = spec.get('title', field_id)
+    field_type = spec.get('type', 'string')
+    required = bool(spec.get('required'))
+    minimum, maximum = spec.get('minimum'), spec.get('maximum')
+    condition = (spec['conditional']['field'], spec['conditional']['value']) if spec.get('conditional') else None
+    options = ()
+    if field_type == 'string':
+        choices = frozenset(spec['enum']) if 'enum' in spec else None
+        pattern = re.compile(spec['pattern']) if 'pattern' in spec else None
+        is_date = spec.get('format') == 'date'
+        parse = _string_parser(field_id, title, required, choices, pattern, is_date)
+        widget = 'radio' if choices is not None else 'date' if is_date else 'text'
+        options = tuple(spec.get('enum', ()))
+    elif field_type == 'integer':
+        parse = _integer_parser(field_id, title, required, minimum, maximum)
+        widget = 'number'
+    elif field_type == 'boolean':
+        parse = _boolean_parser(field_id, bool(spec.get('default', False)))
+        widget = 'checkbox'
+    elif field_type == 'array':
+        items = spec.get('items', {})
+        choices = frozenset(items['enum']) if 'enum' in items else None
+        parse = _array_parser(field_id, title, required, choices, bool(spec.get('uniqueItems')))
+        widget = 'checkboxes'
+        options = tuple(items.get('enum', ()))
+    else:
+        raise ValueError(f"Field {field_id} has unsupported type {field_type!r}")
+    return FormField(field_id, title, widget, options, required, minimum, maximum, condition, parse)
+
+def compile_form(schema):
+    """Compile a form schema (a dict like rcl_form_schema) into a CompiledForm."""
+    sections = tuple(FormSection(section['id'], section.get('title', ''), section.get('description', ''),
+                                 tuple(compile_field(field) for field in section.get('fields', [])))
+                     for section in schema.get('sections', []))
+    return CompiledForm(schema.get('title', ''), schema.get('description', ''), sections)
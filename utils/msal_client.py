@@ -0,0 +1,236 @@
+import json
+import os
+import tempfile
+import threading
+import msal
+import requests
+
+class FileCacheStore:
+    """Keeps each MSAL cache in a file of its own in `directory`, readable only by the app's user."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.bin")
+
+    def version(self, name):
+        """Changes whenever the cache is written, by this process or another one."""
+        try:
+            stat = os.stat(self._path(name))
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def read(self, name):
+        try:
+            with open(self._path(name), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def remove(self, name):
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    def write(self, name, data):
+        # Write a new file and swap it in, so other workers never read half a cache
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{name}.")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(name))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+class DatabaseCacheStore:
+    """Keeps each MSAL cache in a row of the auth_caches table."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def _row(self, name, column):
+        from models import db, AuthCache
+        with self.app.app_context():
+            with db.engine.connect() as conn:
+                return conn.execute(db.select(column).where(AuthCache.name == name)).scalar()
+
+    def version(self, name):
+        from models import AuthCache
+        return self._row(name, AuthCache.version)
+
+    def read(self, name):
+        from models import AuthCache
+        return self._row(name, AuthCache.data)
+
+    def remove(self, name):
+        from models import db, AuthCache
+        with self.app.app_context():
+            with db.engine.begin() as conn:
+                conn.execute(db.delete(AuthCache).where(AuthCache.name == name))
+
+    def write(self, name, data):
+        from models import db, AuthCache
+        with self.app.app_context():
+            with db.engine.begin() as conn:
+                updated = conn.execute(db.update(AuthCache).where(AuthCache.name == name)
+                                       .values(data=data, version=AuthCache.version + 1)).rowcount
+                if not updated:
+                    conn.execute(db.insert(AuthCache).values(name=name, data=data, version=1))
+
+class CachedResponse:
+    """A response read back from a persisted HTTP cache, with the parts of requests.Response MSAL uses."""
+
+    def __init__(self, status_code, headers, text):
+        self.status_code = status_code
+        self.headers = headers
+        self.text = text
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}: {self.text}")
+
+# Key of the bookkeeping entry MSAL keeps in its HTTP cache next to the cached responses
+_HTTP_CACHE_INDEX = '_index_'
+
+def dump_http_cache(http_cache):
+    """Serialize MSAL's HTTP cache as JSON: its index, and each response's status, headers and body."""
+    entries = {}
+    for key, value in http_cache.items():
+        if key == _HTTP_CACHE_INDEX:
+            entries[key] = value
+        else:
+            entries[key] = {'status_code': value.status_code, 'headers': dict(getattr(value, 'headers', None) or {}),
+                            'text': value.text}
+    return json.dumps(entries, sort_keys=True).encode('utf-8')
+
+def load_http_cache(data):
+    """The HTTP cache serialized by dump_http_cache, or an empty one if it cannot be read."""
+    try:
+        entries = json.loads(data.decode('utf-8'))
+        return {key: value if key == _HTTP_CACHE_INDEX
+                else CachedResponse(int(value['status_code']), dict(value['headers']), str(value['text']))
+                for key, value in entries.items()}
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return {}  # Unreadable; discovery simply runs again
+
+def _default_http_client():
+    """A session like the one MSAL makes by default, shared by the applications of a SharedClient."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(max_retries=1)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+class SharedClient:
+    """
+    An application registration's MSAL HTTP cache, shared by every sign-in.
+
+    The HTTP cache holds the authority's discovery documents, so only the
+    first sign-in of a process (or, with a store, of all workers sharing it)
+    fetches them. It is reloaded from the store when another worker has
+    changed it and written back, as JSON, after each call that changes it.
+
+    Each call runs on its own ConfidentialClientApplication with an empty
+    in-memory token cache. The app only reads the ID token claims of a
+    sign-in and never redeems a cached token, so no user's tokens are kept
+    or written anywhere.
+    """
+
+    def __init__(self, client_id, authority, client_credential, store=None, http_client=None):
+        self.client_id = client_id
+        self.authority = authority
+        self.client_credential = client_credential
+        self.store = store
+        self.http_client = http_client or _default_http_client()
+        # Guards the HTTP cache's loading and saving, never a call to the identity provider
+        self.lock = threading.Lock()
+        self.http_cache = {}
+        self._version = None
+        self._saved_http_cache = None
+        if self.store:
+            # Earlier versions persisted every signed-in user's tokens
+            self.store.remove('token_cache')
+        with self.lock:
+            self._load()
+        # Creating an application runs authority discovery
+        self._application()
+        with self.lock:
+            self._save()
+
+    def _application(self):
+        return msal.ConfidentialClientApplication(
+            self.client_id, authority=self.authority, client_credential=self.client_credential,
+            token_cache=msal.SerializableTokenCache(), http_cache=self.http_cache, http_client=self.http_client)
+
+    def call(self, method, *args, **kwargs):
+        """Run an MSAL method of a fresh application with the latest HTTP cache and save any changes."""
+        with self.lock:
+            self._load()
+        try:
+            return getattr(self._application(), method)(*args, **kwargs)
+        finally:
+            with self.lock:
+                self._save()
+
+    def _load(self):
+        if not self.store:
+            return
+        version = self.store.version('http_cache')
+        if version is not None and version != self._version:
+            data = self.store.read('http_cache')
+            self.http_cache.clear()
+            self.http_cache.update(load_http_cache(data))
+            self._saved_http_cache = data
+            self._version = version
+
+    def _save(self):
+        if not self.store:
+            return
+        data = dump_http_cache(self.http_cache)
+        if data != self._saved_http_cache:
+            self.store.write('http_cache', data)
+            self._saved_http_cache = data
+            self._version = self.store.version('http_cache')
+
+# Shared clients of this process, by (client_id, authority, client_credential)
+_clients = {}
+_clients_lock = threading.Lock()
+
+# Where caches are persisted and the HTTP client MSAL uses, set by configure_msal()
+_store = None
+_http_client = None
+
+def configure_msal(store=None, http_client=None):
+    """
+    Persist MSAL caches in `store` (a FileCacheStore or DatabaseCacheStore,
+    None keeps them in memory) and send MSAL's requests through `http_client`
+    (None uses MSAL's default). Forgets clients created so far.
+    """
+    global _store, _http_client
+    with _clients_lock:
+        _store = store
+        _http_client = http_client
+        _clients.clear()
+
+def get_msal_client(client_id, authority, client_credential):
+    """The process-wide SharedClient for an application registration, created on first use."""
+    key = (client_id, authority, client_credential)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = SharedClient(client_id, authority, client_credential,
+                                                  store=_store, http_client=_http_client)
+    return client
+
+def msal_cache_store(app, kind, directory):
+    """The cache store for the MSAL_CACHE setting: 'memory', 'file' or 'database'."""
+    if kind == 'file':
+        return FileCacheStore(directory)
+    if kind == 'database':
+        return DatabaseCacheStore(app)
+    return None
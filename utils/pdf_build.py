@@ -0,0 +1,268 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from utils import render_cache
+
+# Limits how many pdflatex builds may run at once in this process
+_build_slots = threading.BoundedSemaphore(os.cpu_count() or 1)
+
+# Directory of precompiled preamble formats; None builds every document cold
+_format_dir = None
+_format_lock = threading.Lock()
+# Seconds before a format that could not be dumped, or failed again after a rebuild, is tried again
+FORMAT_RETRY_INTERVAL = 600
+# Formats that could not be dumped or loaded, by when they failed, so they are not retried on every build
+_unusable_formats = {}
+# Formats deleted as stale by this process and rebuilt; one that fails to load again is unusable
+_rebuilt_formats = set()
+
+# Files linked or copied into build sandboxes, see link_into_sandbox
+_staging_stats = {'symlinks': 0, 'hard_links': 0, 'copies': 0, 'bytes_copied': 0}
+_staging_lock = threading.Lock()
+
+def configure_pdf_builds(concurrency, format_dir=None):
+    """
+    Set the maximum number of concurrent LaTeX builds for this process and
+    where precompiled preamble formats are kept (None disables them).
+    """
+    global _build_slots, _format_dir
+    _build_slots = threading.BoundedSemaphore(max(1, int(concurrency or 1)))
+    _format_dir = format_dir
+    if _format_dir:
+        os.makedirs(_format_dir, exist_ok=True)
+
+def _count_staging(name, size=0):
+    with _staging_lock:
+        _staging_stats[name] += 1
+        _staging_stats['bytes_copied'] += size
+
+def link_into_sandbox(src_path, sandbox, name):
+    """
+    Expose src_path inside the sandbox as `name` without copying the file:
+    as a symlink, or a hard link where symlinks are not supported. Only when
+    neither works (e.g. a volume without symlinks on another filesystem) is
+    the file copied.
+    """
+    dest_path = os.path.join(sandbox, name)
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    try:
+        os.symlink(src_path, dest_path)
+        _count_staging('symlinks')
+        return
+    except OSError:
+        pass
+    # Filesystems without symlink support (e.g. some Docker volumes)
+    try:
+        os.link(src_path, dest_path)
+        _count_staging('hard_links')
+    except OSError:
+        shutil.copy2(src_path, dest_path)
+        _count_staging('copies', os.path.getsize(dest_path))
+
+def staging_stats():
+    """How the files of builds in this process were put into their sandboxes, and the bytes copied."""
+    with _staging_lock:
+        return dict(_staging_stats)
+
+def _run_make(makefile, sandbox, target=None, fmt_name=None):
+    command = ["make", "-f", makefile]
+    if target:
+        command.append(target)
+    if fmt_name:
+        command.append(f"FMT={fmt_name}")
+    return subprocess.run(command, cwd=sandbox, capture_output=True, text=True)
+
+def format_name_for(tex_source):
+    """
+    Name the precompiled format for a document after a hash of its preamble.
+
+    Documents filled from the same template share a preamble and therefore a
+    format. Editing a template's preamble changes the name, so an outdated
+    format is never loaded. Returns None if the document has no preamble.
+    """
+    marker = tex_source.find("\\begin{document}")
+    if marker == -1:
+        return None
+    digest = hashlib.sha256(tex_source[:marker].encode("utf-8")).hexdigest()
+    return f"preamble_{digest[:16]}"
+
+def ensure_format(makefile, tex_source):
+    """
+    Return (format_name, format_path) for the document's preamble, dumping the
+    format with mylatexformat the first time it is needed. Returns None when
+    formats are disabled or the preamble cannot be precompiled.
+    """
+    if not _format_dir:
+        return None
+    fmt_name = format_name_for(tex_source)
+    if not fmt_name:
+        return None
+    failed_at = _unusable_formats.get(fmt_name)
+    if failed_at is not None and time.monotonic() - failed_at < FORMAT_RETRY_INTERVAL:
+        return None
+
+    fmt_path = os.path.join(_format_dir, f"{fmt_name}.fmt")
+    if os.path.exists(fmt_path):
+        return fmt_name, fmt_path
+
+    with _format_lock:
+        if os.path.exists(fmt_path):
+            return fmt_name, fmt_path
+        return _dump_format(makefile, tex_source, fmt_name, fmt_path)
+
+def _dump_format(makefile, tex_source, fmt_name, fmt_path):
+    """Dump the format of a document's preamble to fmt_path. Call with _format_lock held."""
+    sandbox = tempfile.mkdtemp(prefix="bancroff_fmt_")
+    try:
+        with open(os.path.join(sandbox, f"{fmt_name}.tex"), "w", encoding="utf-8") as f:
+            f.write(tex_source)
+        result = _run_make(makefile, sandbox, target=f"{fmt_name}.fmt")
+        dumped_path = os.path.join(sandbox, f"{fmt_name}.fmt")
+        if result.returncode != 0 or not os.path.exists(dumped_path):
+            print(f"Warning: Could not build preamble format {fmt_name}, using normal builds: {result.stderr}")
+            _unusable_formats[fmt_name] = time.monotonic()
+            return None
+        # Another process may be dumping the same format; the rename is atomic
+        os.replace(dumped_path, fmt_path)
+        _unusable_formats.pop(fmt_name, None)
+        return fmt_name, fmt_path
+    except Exception as e:
+        print(f"Warning: Could not build preamble format {fmt_name}: {e}")
+        _unusable_formats[fmt_name] = time.monotonic()
+        return None
+    finally:
+        shutil.rmtree(sandbox, ignore_errors=True)
+
+def _file_identity(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+def rebuild_stale_format(makefile, tex_source, fmt_name, fmt_path, identity):
+    """
+    Replace a format that documents cannot be built with (e.g. after a TeX
+    upgrade): delete it and dump it again, under _format_lock. identity is the
+    (inode, mtime) of the file the failed build used; if the file has changed
+    since, another build has already replaced it and it is left alone. A
+    format that fails again after being rebuilt is not used for
+    FORMAT_RETRY_INTERVAL seconds.
+    """
+    with _format_lock:
+        if _file_identity(fmt_path) != identity:
+            return
+        try:
+            os.remove(fmt_path)
+        except FileNotFoundError:
+            pass
+        if fmt_name in _rebuilt_formats:
+            print(f"Warning: Rebuilt preamble format {fmt_name} still fails, using normal builds")
+            _rebuilt_formats.discard(fmt_name)
+            _unusable_formats[fmt_name] = time.monotonic()
+            return
+        _rebuilt_formats.add(fmt_name)
+        _dump_format(makefile, tex_source, fmt_name, fmt_path)
+
+def build_latex_pdf(pdf_dir, tex_source, output_filename, signature_files=None, label="PDF", cache_key=None):
+    """
+    Compile a filled LaTeX document in its own temporary build directory.
+
+    Each build gets a private sandbox holding document.tex and links to the
+    signature images it references, so concurrent builds never share inputs or
+    outputs. The Makefile in pdf_dir drives the build and the resulting PDF is
+    moved to pdf_dir/output_filename.
+
+    When precompiled formats are enabled the document's preamble is loaded
+    from a format file instead of being processed again. If a format-backed
+    build fails but a normal one succeeds, the format is stale: it is deleted
+    and dumped again for the next build.
+
+    When cache_key is given and the render cache already holds that document,
+    it is linked into place without running pdflatex.
+
+    Args:
+        pdf_dir (str): Directory holding the Makefile and the final PDFs
+        tex_source (str): Filled LaTeX document
+        output_filename (str): Name of the PDF to create in pdf_dir
+        signature_files (dict): Maps the file name used in the .tex to its path on disk
+        label (str): Document description used in error messages
+        cache_key (str): Render cache key describing the document's inputs
+
+    Returns:
+        tuple: (final_pdf_path, error_message)
+    """
+    makefile = os.path.join(pdf_dir, "Makefile")
+    final_pdf_path = os.path.join(pdf_dir, output_filename)
+
+    if cache_key and render_cache.restore(cache_key, final_pdf_path):
+        return final_pdf_path, None
+
+    with _build_slots:
+        sandbox = tempfile.mkdtemp(prefix="bancroff_pdf_")
+        try:
+            try:
+                with open(os.path.join(sandbox, "document.tex"), "w", encoding="utf-8") as f:
+                    f.write(tex_source)
+            except Exception as e:
+                return None, f"Error writing LaTeX file: {e}"
+
+            for name, src_path in (signature_files or {}).items():
+                try:
+                    link_into_sandbox(src_path, sandbox, name)
+                except Exception as e:
+                    print(f"Warning: Could not link signature file {name}: {e}")
+
+            try:
+                result = None
+                fmt = ensure_format(makefile, tex_source)
+                if fmt:
+                    fmt_name, fmt_path = fmt
+                    fmt_identity = _file_identity(fmt_path)
+                    link_into_sandbox(fmt_path, sandbox, f"{fmt_name}.fmt")
+                    result = _run_make(makefile, sandbox, fmt_name=fmt_name)
+                    if result.returncode == 0:
+                        _rebuilt_formats.discard(fmt_name)
+                    else:
+                        # Stale or incompatible format (e.g. after a TeX upgrade): fall back
+                        print(f"Warning: Build with format {fmt_name} failed, retrying without it")
+                        for leftover in ("document.pdf", "document.aux"):
+                            if os.path.exists(os.path.join(sandbox, leftover)):
+                                os.remove(os.path.join(sandbox, leftover))
+                        result = None
+                if result is None:
+                    result = _run_make(makefile, sandbox)
+                    if fmt and result.returncode == 0:
+                        rebuild_stale_format(makefile, tex_source, fmt_name, fmt_path, fmt_identity)
+            except Exception as e:
+                return None, f"Subprocess error: {e}"
+
+            if result.returncode != 0:
+                # Try to read the log file for more details
+                log_path = os.path.join(sandbox, "document.log")
+                log_content = ""
+                if os.path.exists(log_path):
+                    with open(log_path, "r", encoding="utf-8", errors="replace") as f:
+                        log_content = f.read()
+
+                error_message = f"pdflatex (Makefile) failed for {label}.\n"
+                error_message += f"Make error: {result.stderr}\n"
+                error_message += f"Make output: {result.stdout}\n"
+                if log_content:
+                    error_message += f"LaTeX log:\n{log_content}"
+                return None, error_message
+
+            generated_pdf_path = os.path.join(sandbox, "document.pdf")
+            if not os.path.exists(generated_pdf_path):
+                return None, f"document.pdf not found after {label} generation."
+
+            os.makedirs(pdf_dir, exist_ok=True)
+            shutil.move(generated_pdf_path, final_pdf_path)
+            render_cache.store(cache_key, final_pdf_path)
+            return final_pdf_path, None
+        finally:
+            shutil.rmtree(sandbox, ignore_errors=True)
@@ -0,0 +1,65 @@
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+from flask import current_app
+
+# Permissions checked by the application, and the roles that are given them in a new database
+DEFAULT_ROLE_PERMISSIONS = {
+    'manage_roles': ['admin'],
+    'manage_users': ['admin', 'chair', 'dean', 'advisor'],
+    'approve_requests': ['admin', 'advisor', 'chair', 'dean'],
+    'approve_any_step': ['admin'],
+    'view_all_requests': ['admin', 'advisor', 'chair', 'dean'],
+    'delete_any_request': ['admin'],
+}
+
+NO_PERMISSIONS = frozenset()
+
+# Every role's permission names as loaded at one version of the role_permissions table
+PermissionSets = namedtuple('PermissionSets', ['version', 'loaded_at', 'roles'])
+
+_lock = threading.Lock()
+
+def _state():
+    return current_app.extensions.setdefault('rbac', {'version': 0, 'sets': None})
+
+def load_permission_sets(version=0):
+    """Read the permissions of all roles in one query into a read-only mapping of role id -> frozenset."""
+    from models import db, Permission, RolePermission
+    roles = {}
+    for role_id, name in (db.session.query(RolePermission.role_id, Permission.name)
+                          .join(Permission, RolePermission.permission_id == Permission.id)):
+        roles.setdefault(role_id, set()).add(name)
+    return PermissionSets(version, time.monotonic(),
+                          MappingProxyType({role_id: frozenset(names) for role_id, names in roles.items()}))
+
+def permission_sets():
+    """
+    The current PermissionSets of this app.
+
+    Loaded once and shared by every request until invalidate_permissions()
+    moves the version on, or RBAC_CACHE_TTL seconds pass so that changes made
+    by other processes are picked up.
+    """
+    state = _state()
+    sets = state['sets']
+    if _stale(sets, state['version']):
+        with _lock:
+            sets = state['sets']
+            if _stale(sets, state['version']):
+                sets = state['sets'] = load_permission_sets(state['version'])
+    return sets
+
+def _stale(sets, version):
+    return (sets is None or sets.version != version
+            or time.monotonic() - sets.loaded_at > current_app.config['RBAC_CACHE_TTL'])
+
+def role_permissions(role_id):
+    """Permission names of a role, as a frozenset."""
+    return permission_sets().roles.get(role_id, NO_PERMISSIONS)
+
+def invalidate_permissions():
+    """Make the next permission check reload the role permissions, after roles or their permissions change."""
+    with _lock:
+        _state()['version'] += 1
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+# Cache location and size limit, set by configure_render_cache(); None disables the cache
+_cache_dir = None
+_max_bytes = 0
+
+# Hit/miss counters for this process
+_stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+_stats_lock = threading.Lock()
+
+def configure_render_cache(cache_dir, max_bytes):
+    """Enable the render cache in cache_dir, keeping at most max_bytes of PDFs."""
+    global _cache_dir, _max_bytes
+    _cache_dir = cache_dir if max_bytes else None
+    _max_bytes = max_bytes
+    if _cache_dir:
+        os.makedirs(_cache_dir, exist_ok=True)
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+def _file_stamp(path):
+    """Identify a file version by size and modification time without reading it."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+def render_cache_key(template_path, request_obj, approvals, uploads_dir, extra=None):
+    """
+    Hash everything that affects a rendered document.
+
+    The key covers the template source, the request's form_data, the requester
+    and, for each approval, its status, approver, date, comments and signature
+    file, plus `extra`, which holds the other inputs of the render such as
+    dates that default to the day of rendering. Any change to one of these
+    produces a new key.
+    """
+    digest = hashlib.sha256()
+    with open(template_path, 'rb') as f:
+        digest.update(f.read())
+
+    def signature_state(user):
+        if not user or not user.signature_path:
+            return None
+        return [user.signature_path, _file_stamp(os.path.join(uploads_dir, user.signature_path))]
+
+    requester = request_obj.requester
+    state = {
+        'request_id': request_obj.id,
+        'form_data': request_obj.form_data or {},
+        'requester': [requester.full_name if requester else None, signature_state(requester)],
+        'approvals': [
+            [
+                approval.step_id,
+                approval.status,
+                approval.approver_id,
+                approval.approver.full_name if approval.approver else None,
+                approval.approved_at.isoformat() if approval.approved_at else None,
+                approval.comments,
+                signature_state(approval.approver)
+            ]
+            for approval in approvals
+        ],
+        'extra': extra
+    }
+    digest.update(json.dumps(state, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+def _cache_path(key):
+    return os.path.join(_cache_dir, f"{key}.pdf")
+
+def _link_or_copy(src_path, dest_path):
+    try:
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        os.link(src_path, dest_path)
+    except OSError:
+        shutil.copy2(src_path, dest_path)
+
+def lookup(key):
+    """Return the cached PDF path for key, or None. Counts a hit or a miss."""
+    if not _cache_dir or not key:
+        return None
+    path = _cache_path(key)
+    if os.path.exists(path):
+        # Mark as recently used for LRU eviction
+        os.utime(path)
+        _count('hits')
+        return path
+    _count('misses')
+    return None
+
+def restore(key, dest_path):
+    """Place the cached PDF for key at dest_path. Returns True on a cache hit."""
+    cached_path = lookup(key)
+    if not cached_path:
+        return False
+    _link_or_copy(cached_path, dest_path)
+    return True
+
+def store(key, pdf_path):
+    """Add a freshly built PDF to the cache and evict old entries if over the limit."""
+    if not _cache_dir or not key:
+        return
+    try:
+        _link_or_copy(pdf_path, _cache_path(key))
+        _count('stores')
+        _evict()
+    except OSError as e:
+        print(f"Warning: Could not store PDF in render cache: {e}")
+
+def _cache_entries():
+    entries = []
+    for entry in os.scandir(_cache_dir):
+        if entry.name.endswith('.pdf') and entry.is_file():
+            stat = entry.stat()
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+    return entries
+
+def _evict():
+    """Remove least recently used entries until the cache fits in _max_bytes."""
+    entries = sorted(_cache_entries())
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in entries:
+        if total <= _max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+            _count('evictions')
+        except OSError:
+            pass
+
+def cache_stats():
+    """Return this process's hit/miss counters and the cache's current size."""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / lookups if lookups else None
+    stats['enabled'] = bool(_cache_dir)
+    if _cache_dir:
+        entries = _cache_entries()
+        stats['entries'] = len(entries)
+        stats['bytes'] = sum(size for _, size, _ in entries)
+        stats['max_bytes'] = _max_bytes
+    return stats
@@ -0,0 +1,258 @@
+import importlib
+import multiprocessing
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+from models import db, RenderJob
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+def enqueue_render(request_id, approval_id):
+    """
+    Queue a PDF render for a request.
+
+    A request has at most one waiting job, enforced by a partial unique index:
+    if one is already queued it is reused and pointed at the newest approval.
+    When no worker pool is configured (RENDER_WORKERS = 0) the job is
+    rendered immediately.
+    """
+    while True:
+        job = RenderJob.query.filter_by(request_id=request_id, status='queued').first()
+        if job:
+            # Only reuse it if no worker has claimed it since
+            reused = (RenderJob.query
+                      .filter(RenderJob.id == job.id, RenderJob.status == 'queued')
+                      .update({'approval_id': approval_id}, synchronize_session=False))
+            db.session.commit()
+            if reused:
+                break
+        else:
+            job = RenderJob(request_id=request_id, approval_id=approval_id)
+            db.session.add(job)
+            try:
+                db.session.commit()
+                break
+            except IntegrityError:
+                # Another approval queued a job for the request first; reuse that one
+                db.session.rollback()
+
+    if not current_app.config.get('RENDER_WORKERS'):
+        if claim_job(job.id):
+            process_job(db.session.get(RenderJob, job.id))
+    return job
+
+def get_active_job(request_id):
+    """Return the newest queued or running job for a request, if any."""
+    return (RenderJob.query
+            .filter(RenderJob.request_id == request_id, RenderJob.status.in_(ACTIVE_STATUSES))
+            .order_by(RenderJob.id.desc())
+            .first())
+
+def claim_job(job_id):
+    """Atomically move a queued job to running. Returns True if this caller won it."""
+    claimed = (RenderJob.query
+               .filter(RenderJob.id == job_id, RenderJob.status == 'queued')
+               .update({'status': 'running',
+                        'started_at': datetime.now(),
+                        'attempts': RenderJob.attempts + 1},
+                       synchronize_session=False))
+    db.session.commit()
+    return claimed == 1
+
+def claim_next_job():
+    """
+    Claim the oldest job that is ready to run.
+
+    Jobs whose request already has a running render are skipped so that two
+    workers never render the same request at once.
+    """
+    running = aliased(RenderJob)
+    busy_request = (db.session.query(running.id)
+                    .filter(running.request_id == RenderJob.request_id, running.status == 'running')
+                    .exists())
+    candidates = (db.session.query(RenderJob.id)
+                  .filter(RenderJob.status == 'queued',
+                          RenderJob.available_at <= datetime.now(),
+                          ~busy_request)
+                  .order_by(RenderJob.available_at, RenderJob.id)
+                  .limit(5)
+                  .all())
+    for (job_id,) in candidates:
+        if claim_job(job_id):
+            return db.session.get(RenderJob, job_id)
+    return None
+
+def requeue_stale_jobs():
+    """
+    Put back jobs left running by a worker that died mid-render.
+
+    A job that has already used its RENDER_JOB_MAX_ATTEMPTS fails instead, so
+    a document that crashes or hangs its worker is not retried forever, and
+    one whose request has a newer job queued fails in favour of that job.
+    The others are retried with the same backoff as a failed render.
+    """
+    timeout = current_app.config.get('RENDER_JOB_TIMEOUT', 300)
+    max_attempts = current_app.config.get('RENDER_JOB_MAX_ATTEMPTS', 3)
+    now = datetime.now()
+    stale = (RenderJob.status == 'running', RenderJob.started_at < now - timedelta(seconds=timeout))
+    queued = aliased(RenderJob)
+    newer_queued = (db.session.query(queued.id)
+                    .filter(queued.request_id == RenderJob.request_id, queued.status == 'queued')
+                    .exists())
+    try:
+        (RenderJob.query
+         .filter(*stale, RenderJob.attempts >= max_attempts)
+         .update({'status': 'failed', 'finished_at': now,
+                  'last_error': f"Render worker stopped responding on each of {max_attempts} attempts"},
+                 synchronize_session=False))
+        (RenderJob.query
+         .filter(*stale, newer_queued)
+         .update({'status': 'failed', 'finished_at': now,
+                  'last_error': "Render worker stopped responding; superseded by a newer queued job"},
+                 synchronize_session=False))
+        requeued = 0
+        for attempts in range(1, max_attempts):
+            requeued += (RenderJob.query
+                         .filter(*stale, RenderJob.attempts == attempts)
+                         .update({'status': 'queued', 'available_at': _retry_at(attempts, now),
+                                  'last_error': "Render worker stopped responding"},
+                                 synchronize_session=False))
+        db.session.commit()
+    except IntegrityError:
+        # A job was queued for one of the requests meanwhile; the next pass handles it
+        db.session.rollback()
+        return 0
+    return requeued
+
+def process_job(job):
+    """
+    Render the PDF for a claimed job.
+
+    Errors reported by the PDF generators (bad template, LaTeX failure) fail
+    the job. Unexpected exceptions such as a locked database are treated as
+    transient and retried with exponential backoff.
+    """
+    from routes.approvals import generate_request_pdf
+
+    try:
+        pdf_filename, error = generate_request_pdf(job.approval)
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.warning(f"Render job {job.id} attempt {job.attempts} failed: {e}")
+        _retry_or_fail(job, str(e))
+        return job
+
+    if error:
+        job.status = 'failed'
+        job.last_error = error
+    else:
+        job.status = 'done'
+        job.pdf_filename = pdf_filename
+        job.last_error = None
+    job.finished_at = datetime.now()
+    db.session.commit()
+    return job
+
+def _retry_at(attempts, now):
+    """When a job that has failed `attempts` times may run again: the retry delay, doubled per attempt."""
+    retry_delay = current_app.config.get('RENDER_JOB_RETRY_DELAY', 5)
+    return now + timedelta(seconds=retry_delay * 2 ** (attempts - 1))
+
+def _retry_or_fail(job, error):
+    max_attempts = current_app.config.get('RENDER_JOB_MAX_ATTEMPTS', 3)
+    if job.attempts < max_attempts:
+        job.status = 'queued'
+        job.last_error = error
+        job.available_at = _retry_at(job.attempts, datetime.now())
+        try:
+            db.session.commit()
+            return
+        except IntegrityError:
+            # A newer job for the request is already queued and renders its latest state
+            db.session.rollback()
+            error = f"{error}; superseded by a newer queued job"
+    job.status = 'failed'
+    job.last_error = error
+    job.finished_at = datetime.now()
+    db.session.commit()
+
+def queue_stats(window_minutes=60):
+    """Report queue depth and end-to-end latency of recently finished jobs."""
+    now = datetime.now()
+    counts = dict(db.session.query(RenderJob.status, func.count(RenderJob.id))
+                  .group_by(RenderJob.status)
+                  .all())
+    oldest_queued = (db.session.query(func.min(RenderJob.created_at))
+                     .filter(RenderJob.status == 'queued')
+                     .scalar())
+    finished = (db.session.query(RenderJob.created_at, RenderJob.finished_at)
+                .filter(RenderJob.status == 'done',
+                        RenderJob.finished_at >= now - timedelta(minutes=window_minutes))
+                .all())
+    latencies = sorted((finished_at - created_at).total_seconds() for created_at, finished_at in finished)
+
+    def percentile(p):
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+    return {
+        'depth': counts.get('queued', 0) + counts.get('running', 0),
+        'queued': counts.get('queued', 0),
+        'running': counts.get('running', 0),
+        'done': counts.get('done', 0),
+        'failed': counts.get('failed', 0),
+        'oldest_queued_seconds': (now - oldest_queued).total_seconds() if oldest_queued else None,
+        'latency_seconds': {
+            'window_minutes': window_minutes,
+            'count': len(latencies),
+            'avg': sum(latencies) / len(latencies) if latencies else None,
+            'p50': percentile(0.50),
+            'p95': percentile(0.95)
+        }
+    }
+
+def run_worker(app, poll_interval=1.0):
+    """Drain the render queue forever inside the given app."""
+    with app.app_context():
+        while True:
+            try:
+                requeue_stale_jobs()
+                job = claim_next_job()
+                if job is None:
+                    time.sleep(poll_interval)
+                    continue
+                process_job(job)
+            except Exception as e:
+                db.session.rollback()
+                app.logger.error(f"Render worker error: {e}")
+                time.sleep(poll_interval)
+            finally:
+                # Start each job with a fresh session so no stale rows are reused
+                db.session.remove()
+
+def load_app_factory(path):
+    """Import an application factory given as "module:function"."""
+    module_name, _, factory_name = path.partition(':')
+    return getattr(importlib.import_module(module_name), factory_name or 'create_app')
+
+def _worker_main(app_factory, poll_interval):
+    run_worker(load_app_factory(app_factory)(), poll_interval)
+
+def start_worker_pool(num_workers, app_factory='app_factory:create_app', poll_interval=1.0):
+    """
+    Start `num_workers` render worker processes. Each builds its own app by
+    calling the factory at the `app_factory` import path. Returns the process
+    handles.
+    """
+    ctx = multiprocessing.get_context('spawn')
+    workers = []
+    for i in range(num_workers):
+        worker = ctx.Process(target=_worker_main, args=(app_factory, poll_interval),
+                             name=f"render-worker-{i + 1}", daemon=True)
+        worker.start()
+        workers.append(worker)
+    return workers
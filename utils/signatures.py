@@ -0,0 +1,102 @@
+import hashlib
+import io
+import os
+from flask import current_app
+from PIL import Image, ImageOps, ImageStat, UnidentifiedImageError
+
+# How much darker than the paper (the image's median grey level) a pixel must be to count as ink
+INK_CONTRAST = 40
+# Directory of the upload folder holding signatures by content hash
+SIGNATURE_STORE = 'signatures'
+# Blank space kept around the trimmed signature, as a fraction of its longer side
+TRIM_MARGIN = 0.02
+
+class SignatureError(Exception):
+    """An upload that cannot be used as a signature; the message can be shown to the user."""
+
+def _ink_mask(image):
+    """A mask of the ink in an RGB image: 255 for ink, 0 for paper."""
+    grey = image.convert('L')
+    threshold = ImageStat.Stat(grey).median[0] - INK_CONTRAST
+    return grey.point(lambda level: 255 if level < threshold else 0)
+
+def _ink_box(mask):
+    """The bounding box of the ink in a mask, with a small margin, or None if there is no ink."""
+    box = mask.getbbox()
+    if box is None:
+        return None
+    margin = max(2, int(max(box[2] - box[0], box[3] - box[1]) * TRIM_MARGIN))
+    return (max(0, box[0] - margin), max(0, box[1] - margin),
+            min(mask.width, box[2] + margin), min(mask.height, box[3] + margin))
+
+def normalize_signature(stream, max_size, dpi, colors, max_pixels):
+    """
+    Turn an uploaded PNG or JPEG into a compact signature image.
+
+    The image is turned upright (EXIF orientation) and flattened onto white.
+    It is then trimmed to the ink, the paper around the ink is made white,
+    and the result is scaled down to fit max_size pixels.
+    Finally it is saved as a PNG with a palette of `colors` colours, tagged
+    with `dpi`. JPEGs are decoded at a reduced scale when they are much
+    larger than needed, so large phone photos stay quick to process.
+
+    Returns:
+        tuple: (PNG bytes, SHA-256 hex digest of those bytes)
+    """
+    try:
+        image = Image.open(stream)
+        if image.width * image.height > max_pixels:
+            raise SignatureError('The image is too large; please upload a smaller picture of your signature.')
+        image.draft('RGB', (max_size[0] * 2, max_size[1] * 2))
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info):
+            rgba = image.convert('RGBA')
+            image = Image.new('RGB', rgba.size, 'white')
+            image.paste(rgba, mask=rgba.getchannel('A'))
+        else:
+            image = image.convert('RGB')
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        raise SignatureError('The file could not be read as a PNG or JPEG image.')
+
+    mask = _ink_mask(image)
+    box = _ink_box(mask)
+    if box is None:
+        raise SignatureError('The image appears to be blank.')
+    # Clean white paper compresses far better than photographed paper
+    image = image.crop(box)
+    image.paste('white', mask=ImageOps.invert(mask.crop(box)))
+    image.thumbnail(max_size, Image.Resampling.LANCZOS)
+
+    output = io.BytesIO()
+    image.quantize(colors).save(output, 'PNG', optimize=True, dpi=(dpi, dpi))
+    data = output.getvalue()
+    return data, hashlib.sha256(data).hexdigest()
+
+def signature_key(sha256):
+    """Where the signature with this SHA-256 is kept, relative to the upload folder."""
+    return f"{SIGNATURE_STORE}/{sha256}.png"
+
+def save_signature(stream, upload_folder):
+    """
+    Normalize an uploaded signature with the app's SIGNATURE_* settings and
+    add it to the signature store in upload_folder, where each image is kept
+    once under its content hash however many users or uploads share it.
+    Raises SignatureError if the upload cannot be used.
+
+    Returns:
+        tuple: (path relative to upload_folder, SHA-256 hex digest)
+    """
+    dpi = current_app.config['SIGNATURE_DPI']
+    width, height = current_app.config['SIGNATURE_PRINT_SIZE']
+    data, sha256 = normalize_signature(stream, (round(width * dpi), round(height * dpi)), dpi,
+                                       current_app.config['SIGNATURE_COLORS'],
+                                       current_app.config['SIGNATURE_MAX_PIXELS'])
+    key = signature_key(sha256)
+    path = os.path.join(upload_folder, key)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return key, sha256
@@ -0,0 +1,44 @@
+from utils.workflow_registry import workflow_registry
+
+class SubmissionError(Exception):
+    """A request that cannot be submitted; the message can be shown to the requester."""
+
+def submit_request(type_name, requester_id, title, form_data):
+    """
+    Submit a request of the type named `type_name` for approval.
+
+    Inserts the request, already pointing at its first step, and bulk-inserts
+    a pending approval for every step of the type's workflow, all in one
+    transaction with a single commit. Raises SubmissionError, with nothing
+    written, if the type is unknown or has no approval steps.
+
+    Returns:
+        int: The new request's id
+    """
+    from models import db, Request, RequestApproval
+    if not isinstance(form_data, dict):
+        raise SubmissionError('The form could not be read.')
+    if not title or len(title) > Request.title.type.length:
+        raise SubmissionError('The request title is missing or too long.')
+    request_type = workflow_registry().request_type(type_name)
+    if request_type is None:
+        raise SubmissionError(f'{type_name} form type not found in the database')
+    if not request_type.workflow or not request_type.workflow.steps:
+        raise SubmissionError(f'{type_name} forms have no approval workflow')
+
+    steps = request_type.workflow.steps
+    try:
+        new_request = Request(type_id=request_type.id, requester_id=requester_id, title=title,
+                              form_data=form_data, status='submitted',
+                              current_step_id=steps[0].id, current_role_id=steps[0].approver_role_id)
+        db.session.add(new_request)
+        db.session.flush()
+        request_id = new_request.id
+        db.session.execute(db.insert(RequestApproval), [
+            {'request_id': request_id, 'step_id': step.id, 'status': 'pending'}
+            for step in steps])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return request_id
@@ -0,0 +1,43 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Tables whose version is moved on when their rows change, by mapped class
+_tracked = {}
+
+def bump_table_version(connection, name):
+    """Move a table's version on, in the transaction of `connection`."""
+    from models import db, TableVersion
+    updated = connection.execute(db.update(TableVersion).where(TableVersion.name == name)
+                                 .values(version=TableVersion.version + 1)).rowcount
+    if not updated:
+        connection.execute(db.insert(TableVersion).values(name=name, version=1))
+
+def table_version(name):
+    """The current version of a table, 0 if its rows have never changed through the ORM."""
+    from models import db, TableVersion
+    return db.session.execute(db.select(TableVersion.version).where(TableVersion.name == name)).scalar() or 0
+
+def tables_version(names):
+    """The sum of the versions of several tables, which moves on whenever any of them changes."""
+    from models import db, TableVersion
+    return db.session.execute(db.select(db.func.coalesce(db.func.sum(TableVersion.version), 0))
+                              .where(TableVersion.name.in_(names))).scalar()
+
+def _bump_changed_tables(session, flush_context):
+    changed = {_tracked[type(obj)] for obj in (*session.new, *session.dirty, *session.deleted)
+               if type(obj) in _tracked}
+    if changed:
+        connection = session.connection()
+        for name in sorted(changed):
+            bump_table_version(connection, name)
+
+def track_table_versions(*models):
+    """
+    Keep a version for the tables of `models` in the table_versions table,
+    incremented in the same transaction as every flush that inserts, updates
+    or deletes their rows. Bulk statements that bypass the ORM must call
+    bump_table_version() themselves.
+    """
+    _tracked.update({model: model.__tablename__ for model in models})
+    if not event.contains(Session, 'after_flush', _bump_changed_tables):
+        event.listen(Session, 'after_flush', _bump_changed_tables)
@@ -0,0 +1,130 @@
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+from flask import current_app
+from utils.form_engine import compile_form
+from utils.table_versions import tables_version
+
+# Tables the registry is loaded from; a change to any of them moves their table_versions on
+WORKFLOW_TABLES = ('roles', 'request_types', 'approval_workflows', 'approval_steps')
+
+# Read-only copies of the rows, shared by every request of a process
+RoleInfo = namedtuple('RoleInfo', ['id', 'name', 'description'])
+StepInfo = namedtuple('StepInfo', ['id', 'workflow_id', 'step_order', 'name', 'approver_role_id', 'approver_role'])
+WorkflowInfo = namedtuple('WorkflowInfo', ['id', 'request_type_id', 'name', 'steps'])
+# `workflow` is the type's first workflow and `form` its CompiledForm; either may be None
+RequestTypeInfo = namedtuple('RequestTypeInfo', ['id', 'name', 'description', 'form_schema', 'template_doc_path',
+                                                 'workflow', 'form'])
+
+_lock = threading.Lock()
+
+class WorkflowRegistry:
+    """
+    Request types, their workflows and steps, and roles, as loaded at one
+    version of their tables, keyed by id and by name.
+    """
+
+    def __init__(self, version, table_version, roles, request_types, steps):
+        self.version = version
+        self.table_version = table_version
+        self.roles = MappingProxyType({role.id: role for role in roles})
+        self.role_names = MappingProxyType({role.name: role for role in roles})
+        self.request_types = MappingProxyType({request_type.id: request_type for request_type in request_types})
+        self.type_names = MappingProxyType({request_type.name: request_type for request_type in request_types})
+        self.steps = MappingProxyType({step.id: step for step in steps})
+
+    def request_type(self, key):
+        """The RequestTypeInfo with this id (int) or name (str), or None."""
+        return self.request_types.get(key) if isinstance(key, int) else self.type_names.get(key)
+
+    def role(self, key):
+        """The RoleInfo with this id (int) or name (str), or None."""
+        return self.roles.get(key) if isinstance(key, int) else self.role_names.get(key)
+
+    def step(self, step_id):
+        return self.steps.get(step_id)
+
+def _compile(request_type):
+    if not request_type.form_schema:
+        return None
+    try:
+        return compile_form(request_type.form_schema)
+    except (KeyError, ValueError) as e:
+        current_app.logger.warning(f"The form of {request_type.name} cannot be compiled: {e}")
+        return None
+
+def load_workflow_registry(version=0):
+    """Read every role, request type, workflow and step, in four queries, into a WorkflowRegistry."""
+    from models import db, Role, RequestType, ApprovalWorkflow, ApprovalStep
+    table_version = tables_version(WORKFLOW_TABLES)
+    roles = [RoleInfo(role.id, role.name, role.description) for role in db.session.scalars(db.select(Role))]
+    role_ids = {role.id: role for role in roles}
+    steps = [StepInfo(step.id, step.workflow_id, step.step_order, step.name, step.approver_role_id,
+                      role_ids.get(step.approver_role_id))
+             for step in db.session.scalars(db.select(ApprovalStep)
+                                            .order_by(ApprovalStep.workflow_id, ApprovalStep.step_order))]
+    workflows = {}
+    for workflow in db.session.scalars(db.select(ApprovalWorkflow).order_by(ApprovalWorkflow.id)):
+        # A type's first workflow is the one its requests go through
+        workflows.setdefault(workflow.request_type_id, WorkflowInfo(
+            workflow.id, workflow.request_type_id, workflow.name,
+            tuple(step for step in steps if step.workflow_id == workflow.id)))
+    request_types = [RequestTypeInfo(request_type.id, request_type.name, request_type.description,
+                                     request_type.form_schema, request_type.template_doc_path,
+                                     workflows.get(request_type.id), _compile(request_type))
+                     for request_type in db.session.scalars(db.select(RequestType).order_by(RequestType.id))]
+    return WorkflowRegistry(version, table_version, roles, request_types, steps)
+
+def _state():
+    return current_app.extensions.setdefault('workflow_registry', {'version': 0, 'registry': None, 'checked_at': 0})
+
+def workflow_registry():
+    """
+    The WorkflowRegistry of this app.
+
+    Loaded once per process and shared by every request, so looking up a
+    request type, workflow, step or role costs no queries. It is reloaded at
+    once after invalidate_workflows(), and when a check of the workflow
+    tables' versions, made at most every WORKFLOW_CACHE_TTL seconds, finds
+    that another process has changed them.
+    """
+    state = _state()
+    registry = state['registry']
+    if registry is None or registry.version != state['version']:
+        with _lock:
+            registry = state['registry']
+            if registry is None or registry.version != state['version']:
+                registry = _reload(state)
+    elif time.monotonic() - state['checked_at'] > current_app.config['WORKFLOW_CACHE_TTL']:
+        with _lock:
+            state['checked_at'] = time.monotonic()
+            if tables_version(WORKFLOW_TABLES) != registry.table_version:
+                registry = _reload(state)
+    return registry
+
+def _reload(state):
+    registry = state['registry'] = load_workflow_registry(state['version'])
+    state['checked_at'] = time.monotonic()
+    return registry
+
+def _referenced(lookup, key):
+    value = lookup(workflow_registry(), key)
+    if value is None:
+        # Rows point at it, so another process has added it since the registry was loaded
+        invalidate_workflows()
+        value = lookup(workflow_registry(), key)
+    return value
+
+def request_type_of(request_obj):
+    """The RequestTypeInfo of a Request."""
+    return _referenced(WorkflowRegistry.request_type, request_obj.type_id)
+
+def step_of(approval):
+    """The StepInfo of a RequestApproval, with its approver role."""
+    return _referenced(WorkflowRegistry.step, approval.step_id)
+
+def invalidate_workflows():
+    """Make the next lookup reload the registry, after request types, workflows, steps or roles change."""
+    with _lock:
+        _state()['version'] += 1